@@ -14,7 +14,7 @@ from bs4dash_py import (
     value_box_shiny,
 )
 
-# CDNs
+# CDNs (offline: run scripts/vendor_assets.py and pass vendored=True instead)
 ADMINLTE = "https://cdn.jsdelivr.net/npm/admin-lte@3.2/dist/css/adminlte.min.css"
 ADMINLTE_JS = "https://cdn.jsdelivr.net/npm/admin-lte@3.2/dist/js/adminlte.min.js"
 
@@ -0,0 +1,162 @@
+"""Benchmark the client asset's sidebar badge/active handlers in a browser.
+
+Usage:
+    python scripts/bench_client_handlers.py [--items 1000 10000] [--badges 200] [--out bench.html]
+
+Writes a self-contained HTML page that loads `bs4dash_controlbar.js` with a
+stubbed `window.Shiny`, builds a sidebar menu of N items and times:
+
+- "selector": the previous approach, one `querySelector` per badge and a
+  `querySelectorAll` sweep to clear `.active`;
+- "indexed": the asset's handlers, which look links up in an href index.
+
+If Playwright and a browser are installed (`pip install playwright` and
+`playwright install chromium`) the page is run headless and the timings are
+printed; otherwise open the written page in a browser and read the table.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ASSET = (
+    Path(__file__).resolve().parents[1] / "src/bs4dash_py/assets/bs4dash_controlbar.js"
+)
+
+PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>bs4dash handler benchmark</title></head>
+<body>
+<aside class="main-sidebar"><ul class="nav"></ul></aside>
+<table id="results" border="1" cellpadding="4"><tr>
+<th>items</th><th>approach</th><th>badges (ms/update)</th><th>active (ms/update)</th>
+</tr></table>
+<script>
+var handlers = {}, frames = [];
+window.Shiny = {
+  addCustomMessageHandler: function(name, fn){
+    // messages are applied on the next frame: apply them before returning
+    handlers[name] = function(msg){ fn(msg); drainFrames(); };
+  },
+  setInputValue: function(){}
+};
+window.requestAnimationFrame = function(fn){ frames.push(fn); return frames.length; };
+function drainFrames(){
+  while(frames.length) frames.shift()(performance.now());
+}
+</script>
+<script>__ASSET__</script>
+<script>
+var CONFIG = __CONFIG__;
+var nav = document.querySelector('.main-sidebar .nav');
+
+// The previous handlers: a selector query per badge, a sweep for .active
+function selectorBadges(msg){
+  (msg.badges || []).forEach(function(b){
+    var a = nav.querySelector("a.nav-link[href='" + (b.href || '#') + "']");
+    if(!a) return;
+    var existing = a.querySelector('.badge');
+    if(!existing){
+      var span = document.createElement('span');
+      span.className = 'badge badge-info float-right';
+      span.textContent = b.badge;
+      a.appendChild(span);
+    } else {
+      existing.textContent = b.badge;
+    }
+  });
+}
+function selectorActive(msg){
+  nav.querySelectorAll('a.nav-link.active').forEach(function(a){
+    a.classList.remove('active');
+  });
+  var a = nav.querySelector("a.nav-link[href='" + msg.target + "']");
+  if(a) a.classList.add('active');
+}
+
+function time(fn, rounds){
+  var start = performance.now();
+  for(var r = 0; r < rounds; r++) fn(r);
+  return (performance.now() - start) / rounds;
+}
+
+function run(){
+  var results = [];
+  CONFIG.items.forEach(function(n){
+    var items = [];
+    for(var i = 0; i < n; i++) items.push({text: 'Item ' + i, href: '#item' + i});
+    handlers.bs4dash_update_sidebar({items: items});
+    var updates = [];
+    for(var r = 0; r < CONFIG.rounds; r++){
+      var badges = [];
+      for(var k = 0; k < CONFIG.badges; k++){
+        badges.push({href: '#item' + ((k * 7919 + r * 31) % n), badge: String(r)});
+      }
+      updates.push(badges);
+    }
+    var approaches = [
+      ['selector', selectorBadges, selectorActive],
+      ['indexed', handlers.bs4dash_update_sidebar_badges,
+        handlers.bs4dash_update_sidebar_active]
+    ];
+    approaches.forEach(function(ap){
+      var badgesMs = time(function(r){ ap[1]({badges: updates[r]}); }, CONFIG.rounds);
+      var activeMs = time(function(r){ ap[2]({target: '#item' + ((r * 104729) % n)}); },
+        CONFIG.rounds);
+      results.push({items: n, approach: ap[0], badges_ms: badgesMs, active_ms: activeMs});
+      var row = document.createElement('tr');
+      [n, ap[0], badgesMs.toFixed(3), activeMs.toFixed(3)].forEach(function(v){
+        var td = document.createElement('td');
+        td.textContent = v;
+        row.appendChild(td);
+      });
+      document.getElementById('results').appendChild(row);
+    });
+  });
+  window.benchResults = results;
+}
+run();
+</script>
+</body></html>
+"""
+
+
+def build_page(items, badges, rounds) -> str:
+    config = {"items": items, "badges": badges, "rounds": rounds}
+    asset = ASSET.read_text(encoding="utf-8")
+    return PAGE.replace("__ASSET__", asset).replace("__CONFIG__", json.dumps(config))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--badges", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--out", default="bench_client_handlers.html")
+    args = parser.parse_args(argv)
+
+    out = Path(args.out)
+    out.write_text(build_page(args.items, args.badges, args.rounds), encoding="utf-8")
+    try:
+        from playwright.sync_api import sync_playwright
+    except Exception:
+        print(f"Playwright not installed; open {out.resolve()} in a browser.")
+        return 0
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch()
+        page = browser.new_page()
+        page.goto(out.resolve().as_uri())
+        results = page.wait_for_function("() => window.benchResults").json_value()
+        browser.close()
+    print(f"{'items':>7} {'approach':>9} {'badges ms':>10} {'active ms':>10}")
+    for r in results:
+        print(
+            f"{r['items']:>7} {r['approach']:>9} "
+            f"{r['badges_ms']:>10.3f} {r['active_ms']:>10.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
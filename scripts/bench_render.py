@@ -0,0 +1,76 @@
+"""Benchmark building + rendering layouts with the Tag builders and `html_render`.
+
+Usage: python scripts/bench_render.py [items] [cards] [repeat]
+
+Builds a sidebar with `items` menu entries (plain items, badges, icons,
+groups) and a body of `cards` boxes with both backends, renders each to a
+string as Shiny would, checks the output is identical and prints the best
+time of `repeat` runs.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath("src"))
+
+from shiny import ui  # noqa: E402
+
+from bs4dash_py import html_render, icons, shiny_layout  # noqa: E402
+
+
+def _menu(n):
+    menu = []
+    for i in range(n):
+        if i % 50 == 0:
+            menu.append((f"Section {i // 50}",))
+        if i % 10 == 0:
+            group = [(f"Report {i}.{j}", f"#r{i}-{j}") for j in range(3)]
+            menu.append((f"Group {i}", group))
+        elif i % 3 == 0:
+            menu.append((f"Inbox {i}", f"#inbox-{i}", str(i % 7 + 1), "fas fa-inbox"))
+        else:
+            menu.append((f"Page {i}", f"#page-{i}", None, "fas fa-home"))
+    return menu
+
+
+def _page(layout, menu, cards):
+    side = layout.sidebar_shiny("Benchmark", menu=menu)
+    boxes = [
+        layout.box_shiny(
+            [ui.tags.p(f"Body of card {i}"), f"updated {i} min ago"],
+            title=f"Card {i}",
+            status="primary",
+            width=4,
+            id=f"card-{i}",
+        )
+        for i in range(cards)
+    ]
+    return ui.tags.div({"class": "wrapper"}, side, ui.tags.div(*boxes))
+
+
+def _bench(label, layout, menu, cards, repeat):
+    best, html = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        html = str(_page(layout, menu, cards))
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:>6}: {best * 1e3:8.1f} ms ({len(html):,} bytes)")
+    return best, html
+
+
+def main():
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    cards = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    icons.register_icon("solid/home", '<svg viewBox="0 0 576 512"><path/></svg>')
+    menu = _menu(items)
+    print(f"{items} menu items, {cards} cards")
+    before, expected = _bench("tags", shiny_layout, menu, cards, repeat)
+    after, html = _bench("string", html_render, menu, cards, repeat)
+    assert html == expected, "html_render output differs from the Tag builders"
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark `_send_custom_message` sends/sec with and without the cached strategy.
+
+Usage: python scripts/bench_send_custom_message.py [n]
+
+"uncached" re-probes the session's send methods on every call (the behavior
+before the send strategy was cached); "cached" is the normal send path.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath("src"))
+
+from bs4dash_py import server  # noqa: E402
+
+
+class FakeSession:
+    """Session whose only sender takes a single dict, so probing is slow."""
+
+    def __init__(self):
+        self.count = 0
+
+    def send_input_message(self, message):
+        self.count += 1
+
+
+def _uncached(session, name, payload):
+    return server._resolve_and_send(session, name, payload) is not None
+
+
+def _bench(label, send, n):
+    session = FakeSession()
+    payload = {"badges": [{"href": "#about", "badge": "3"}]}
+    start = time.perf_counter()
+    for _ in range(n):
+        send(session, "bs4dash_update_sidebar_badges", payload)
+    elapsed = time.perf_counter() - start
+    assert session.count == n
+    rate = n / elapsed
+    print(f"{label:>9}: {rate:12,.0f} sends/sec ({elapsed * 1e6 / n:.2f} us/send)")
+    return rate
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    before = _bench("uncached", _uncached, n)
+    after = _bench("cached", server._send_custom_message, n)
+    print(f"  speedup: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
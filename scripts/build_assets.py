@@ -0,0 +1,451 @@
+"""Build minified, precompressed bundles of the client assets.
+
+Usage:
+    python scripts/build_assets.py [--only sidebar navs ...] [--out DIR]
+
+Run it before packaging (the publish workflow does). For each asset in
+`src/bs4dash_py/assets` it writes, next to the source by default:
+
+- `bs4dash_controlbar.min.js` / `bs4dash_styles.min.css` and a source map
+  (`.map`) pointing back to the source;
+- `.gz` and `.br` variants of the minified files (brotli needs
+  `pip install brotli`; without it only gzip is written);
+- `build.json`, a manifest with a hash of each source. The runtime serves a
+  minified file only while its source still has that hash, so an edited
+  source is never shadowed by a stale build.
+
+Sections of the JS marked `// @bundle <name>` ... `// @end bundle` hold
+optional handlers; `--only` keeps just the named ones, so an app can ship a
+bundle with only the handlers it uses. Known bundles: see `BUNDLES`.
+
+The minifier is deliberately conservative: it drops comments and
+whitespace, keeps a line break wherever automatic semicolon insertion
+could depend on it, and never renames anything.
+"""
+
+import argparse
+import bisect
+import gzip
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath("src"))
+
+from bs4dash_py.dependencies import (  # noqa: E402
+    ASSETS_DIR,
+    MANIFEST,
+    SCRIPT,
+    STYLESHEET,
+    content_hash,
+    minified_name,
+)
+
+BUNDLES = ("controlbar", "sidebar", "virtual-sidebar", "navs", "content")
+
+_BUNDLE_START = re.compile(r"^\s*// @bundle ([\w-]+)\s*$")
+_BUNDLE_END = re.compile(r"^\s*// @end bundle\s*$")
+
+_IDENT = re.compile(r"[A-Za-z0-9_$]")
+# a `/` after one of these starts a regex literal, not a division
+_REGEX_AFTER = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = {
+    "return",
+    "typeof",
+    "case",
+    "do",
+    "else",
+    "in",
+    "of",
+    "new",
+    "delete",
+    "void",
+    "throw",
+    "instanceof",
+}
+# a line break after one of these can't be a statement end: drop it
+_JOIN_AFTER = set(";{,([")
+
+# CSS punctuation whitespace around is insignificant
+_CSS_PUNCT = "{};,>"
+
+_B64 = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+
+def select_bundles(source, only=None):
+    """Return `source` without the `@bundle` sections not named in `only`.
+
+    Dropped lines are blanked rather than removed, so line numbers (and the
+    source map) still match the source. `only=None` keeps every section.
+    """
+    if only is not None:
+        unknown = sorted(set(only) - set(BUNDLES))
+        if unknown:
+            raise ValueError(
+                f"unknown bundle(s) {', '.join(unknown)}; known: {', '.join(BUNDLES)}"
+            )
+    lines = source.split("\n")
+    current = None
+    for i, line in enumerate(lines):
+        start = _BUNDLE_START.match(line)
+        if start:
+            if current is not None:
+                raise ValueError(f"line {i + 1}: nested @bundle")
+            current = start.group(1)
+            if current not in BUNDLES:
+                raise ValueError(f"line {i + 1}: unknown bundle {current!r}")
+        elif _BUNDLE_END.match(line):
+            if current is None:
+                raise ValueError(f"line {i + 1}: @end bundle without @bundle")
+            current = None
+        elif current is not None and only is not None and current not in only:
+            lines[i] = ""
+    if current is not None:
+        raise ValueError(f"unterminated @bundle {current!r}")
+    return "\n".join(lines)
+
+
+class _Output:
+    """Minified text plus source map segments, built token by token."""
+
+    def __init__(self, source, needs_space):
+        self.source = source
+        self.needs_space = needs_space
+        self.parts = []
+        self.line = 0
+        self.col = 0
+        self.last = ""
+        self.segments = []
+        self._mapped_line = -1
+        self._starts = [0] + [m.end() for m in re.finditer("\n", source)]
+
+    def emit(self, text, pos, space, newline):
+        if self.parts:
+            if newline and self.last not in _JOIN_AFTER:
+                self._write("\n")
+            elif (space or newline) and self.needs_space(self.last, text[0]):
+                self._write(" ")
+        src_line = bisect.bisect_right(self._starts, pos) - 1
+        if src_line != self._mapped_line:
+            # map the first token of each source line
+            src_col = pos - self._starts[src_line]
+            self.segments.append((self.line, self.col, src_line, src_col))
+            self._mapped_line = src_line
+        self._write(text)
+
+    def _write(self, text):
+        self.parts.append(text)
+        lines = text.count("\n")
+        if lines:
+            self.line += lines
+            self.col = len(text) - text.rfind("\n") - 1
+        else:
+            self.col += len(text)
+        self.last = text[-1]
+
+    def text(self):
+        return "".join(self.parts)
+
+
+def _needs_space(a, b):
+    if _IDENT.match(a) and _IDENT.match(b):
+        return True
+    # `a + +b`, `a - -b`, `/ /`: joining would make a different token
+    return (a in "+-" and b in "+-") or (a == "/" and b == "/")
+
+
+def _scan_string(src, i):
+    quote = src[i]
+    j = i + 1
+    while j < len(src):
+        c = src[j]
+        if c == "\\":
+            j += 2
+            continue
+        if c == quote:
+            return j + 1
+        if c == "\n" and quote != "`":
+            raise ValueError(f"unterminated string at offset {i}")
+        if quote == "`" and src.startswith("${", j):
+            j = _scan_braces(src, j + 1)
+            continue
+        j += 1
+    raise ValueError(f"unterminated string at offset {i}")
+
+
+def _scan_braces(src, i):
+    # `src[i]` is `{`: return the offset after its matching `}`
+    depth = 0
+    j = i
+    while j < len(src):
+        c = src[j]
+        if c in "'\"`":
+            j = _scan_string(src, j)
+            continue
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return j + 1
+        j += 1
+    raise ValueError(f"unbalanced braces at offset {i}")
+
+
+def _scan_regex(src, i):
+    j = i + 1
+    in_class = False
+    while j < len(src):
+        c = src[j]
+        if c == "\\":
+            j += 2
+            continue
+        if c == "\n":
+            raise ValueError(f"unterminated regex at offset {i}")
+        if c == "[":
+            in_class = True
+        elif c == "]":
+            in_class = False
+        elif c == "/" and not in_class:
+            j += 1
+            while j < len(src) and _IDENT.match(src[j]):
+                j += 1
+            return j
+        j += 1
+    raise ValueError(f"unterminated regex at offset {i}")
+
+
+def js_tokens(source):
+    """Yield (token, offset, space_before, newline_before) for JS `source`.
+
+    Comments and whitespace are skipped; a comment spanning lines counts as
+    a line break.
+    """
+    i, n = 0, len(source)
+    space = newline = False
+    last = word = ""
+    while i < n:
+        c = source[i]
+        if c in " \t\r\f\v":
+            space = True
+            i += 1
+        elif c == "\n":
+            newline = True
+            i += 1
+        elif source.startswith("//", i):
+            end = source.find("\n", i)
+            i = n if end < 0 else end
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            if end < 0:
+                raise ValueError(f"unterminated comment at offset {i}")
+            if "\n" in source[i:end]:
+                newline = True
+            else:
+                space = True
+            i = end + 2
+        else:
+            if c in "'\"`":
+                j = _scan_string(source, i)
+            elif c == "/" and (
+                not last or last[-1] in _REGEX_AFTER or word in _REGEX_KEYWORDS
+            ):
+                j = _scan_regex(source, i)
+            elif _IDENT.match(c):
+                j = i + 1
+                while j < n and _IDENT.match(source[j]):
+                    j += 1
+            else:
+                j = i + 1
+            last = source[i:j]
+            word = last if _IDENT.match(c) else ""
+            yield last, i, space, newline
+            space = newline = False
+            i = j
+
+
+def minify_js(source):
+    """Return (minified JS, source map segments) for `source`.
+
+    Segments are (out_line, out_col, src_line, src_col), zero-based, one per
+    source line that produced output.
+    """
+    out = _Output(source, _needs_space)
+    for token, pos, space, newline in js_tokens(source):
+        out.emit(token, pos, space, newline)
+    return out.text(), out.segments
+
+
+def minify_css(source):
+    """Return (minified CSS, source map segments) for `source`."""
+    out = _Output(source, lambda a, b: True)
+    i, n = 0, len(source)
+    space = False
+    semicolon = None
+    while i < n:
+        c = source[i]
+        if c.isspace():
+            space = True
+            i += 1
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            if end < 0:
+                raise ValueError(f"unterminated comment at offset {i}")
+            space = True
+            i = end + 2
+        else:
+            if c in "'\"":
+                j = _scan_string(source, i)
+            elif c in _CSS_PUNCT:
+                j = i + 1
+            else:
+                j = i + 1
+                while j < n and not source[j].isspace():
+                    if source[j] in _CSS_PUNCT or source[j] in "'\"":
+                        break
+                    if source.startswith("/*", j):
+                        break
+                    j += 1
+            token = source[i:j]
+            # a `;` is held back, so the last one in a block can be dropped
+            if semicolon is not None and token != "}":
+                out.emit(";", semicolon, False, False)
+            semicolon = None
+            if token == ";":
+                semicolon = i
+            else:
+                keep = space and token not in _CSS_PUNCT and out.last not in "{};,>:"
+                out.emit(token, i, keep, False)
+            space = False
+            i = j
+    if semicolon is not None:
+        out.emit(";", semicolon, False, False)
+    return out.text(), out.segments
+
+
+def _vlq(value):
+    value = (-value << 1) | 1 if value < 0 else value << 1
+    chars = []
+    while True:
+        digit = value & 31
+        value >>= 5
+        if value:
+            digit |= 32
+        chars.append(_B64[digit])
+        if not value:
+            return "".join(chars)
+
+
+def source_map(segments, file, source_name, source):
+    """Return a v3 source map (as a dict) for `segments` of one source."""
+    lines = []
+    prev_src_line = prev_src_col = 0
+    by_line = {}
+    for out_line, out_col, src_line, src_col in segments:
+        by_line.setdefault(out_line, []).append((out_col, src_line, src_col))
+    for out_line in range(max(by_line, default=-1) + 1):
+        prev_col = 0
+        fields = []
+        for out_col, src_line, src_col in by_line.get(out_line, []):
+            fields.append(
+                _vlq(out_col - prev_col)
+                + _vlq(0)
+                + _vlq(src_line - prev_src_line)
+                + _vlq(src_col - prev_src_col)
+            )
+            prev_col, prev_src_line, prev_src_col = out_col, src_line, src_col
+        lines.append(",".join(fields))
+    return {
+        "version": 3,
+        "file": file,
+        "sources": [source_name],
+        "sourcesContent": [source],
+        "names": [],
+        "mappings": ";".join(lines),
+    }
+
+
+def _compress(path):
+    data = path.read_bytes()
+    written = []
+    with open(f"{path}.gz", "wb") as f:
+        with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=9, mtime=0) as gz:
+            gz.write(data)
+    written.append("gz")
+    try:
+        import brotli
+    except ImportError:
+        print("brotli not installed; skipping .br variants", file=sys.stderr)
+    else:
+        Path(f"{path}.br").write_bytes(brotli.compress(data, quality=11))
+        written.append("br")
+    return written
+
+
+def build(src_dir=ASSETS_DIR, out_dir=None, only=None):
+    """Build the bundles of the assets in `src_dir` into `out_dir`.
+
+    Returns the manifest written to `out_dir / build.json`.
+    """
+    src_dir = Path(src_dir)
+    out_dir = Path(out_dir or src_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    for name in (SCRIPT, STYLESHEET):
+        source = (src_dir / name).read_text(encoding="utf-8")
+        if name.endswith(".js"):
+            code, segments = minify_js(select_bundles(source, only))
+            comment = "//# sourceMappingURL={}.map\n"
+        else:
+            code, segments = minify_css(source)
+            comment = "/*# sourceMappingURL={}.map */\n"
+        target = minified_name(name)
+        smap = source_map(segments, target, name, source)
+        (out_dir / f"{target}.map").write_text(
+            json.dumps(smap, separators=(",", ":")), encoding="utf-8"
+        )
+        (out_dir / target).write_text(
+            code + "\n" + comment.format(target), encoding="utf-8"
+        )
+        if out_dir != src_dir:
+            # the manifest is checked against the source next to the bundle
+            (out_dir / name).write_text(source, encoding="utf-8")
+        manifest[name] = {
+            "source": content_hash(source),
+            "file": target,
+            "encodings": _compress(out_dir / target),
+        }
+        if only is not None and name.endswith(".js"):
+            manifest[name]["bundles"] = sorted(only)
+    (out_dir / MANIFEST).write_text(
+        json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+    )
+    return manifest
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument(
+        "--only",
+        nargs="+",
+        metavar="BUNDLE",
+        help=f"keep only these optional JS sections ({', '.join(BUNDLES)})",
+    )
+    p.add_argument("--out", default=None, help="output directory (default: assets)")
+    args = p.parse_args(argv)
+    manifest = build(out_dir=args.out, only=args.only)
+    out_dir = Path(args.out or ASSETS_DIR)
+    for name, entry in manifest.items():
+        size = (ASSETS_DIR / name).stat().st_size
+        sizes = [f"{entry['file']} {(out_dir / entry['file']).stat().st_size}"]
+        sizes += [
+            f"{enc} {(out_dir / (entry['file'] + '.' + enc)).stat().st_size}"
+            for enc in entry["encodings"]
+        ]
+        print(f"{name} {size} -> " + ", ".join(sizes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Export a dashboard's static shell to a directory, for `shell_app`.
+
+Usage:
+    python scripts/export_shell.py myapp.ui:page shell/
+
+`myapp.ui:page` names the page: a tag (e.g. the result of
+`dashboard_page_shiny`) or a function returning one, called without
+arguments. The directory gets `index.html`, the page's assets under
+`assets/<name>-<hash>/` and a `shell.json` manifest; a previous export there
+is replaced. Run it at build or deploy time, after `build_assets.py`.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath("src"))
+
+from bs4dash_py.shell import export_shell  # noqa: E402
+
+
+def load_page(spec):
+    """Return the page named by "module:attr", calling it if it's a function."""
+    module, _, attr = spec.partition(":")
+    if not attr:
+        raise SystemExit(f"expected module:attr, got {spec!r}")
+    sys.path.insert(0, os.getcwd())
+    page = getattr(importlib.import_module(module), attr)
+    return page() if callable(page) else page
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("page", help="module:attr of the page (a tag or a function)")
+    p.add_argument("out", help="output directory")
+    args = p.parse_args(argv)
+    manifest = export_shell(load_page(args.page), args.out)
+    print(f"{args.out}/index.html, assets: {', '.join(manifest['assets']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+"""Vendor AdminLTE, Bootstrap and Font Awesome, subsetted, for offline use.
+
+Usage:
+    python scripts/vendor_assets.py --download [--scan myapp/] [--keep 'fa-*']
+    python scripts/vendor_assets.py --from DIR [--scan myapp/] [--lock]
+
+The upstream files are listed, with pinned versions, in
+`scripts/vendor_sources.json`. They are taken from DIR (laid out as
+`DIR/<package>/<path>`, e.g. `DIR/admin-lte/dist/css/adminlte.min.css`, for
+an air-gapped machine) or, with `--download`, fetched from the listed URLs.
+A `sha256` map in the sources file is checked when present; `--lock` records
+the hashes of the files used.
+
+The output, `src/bs4dash_py/assets/vendor` by default, is not committed:
+
+- stylesheets keep only rules whose classes appear in the package's
+  builders, the vendored scripts, the `--scan`ned app code or a `--keep`
+  pattern; `@import`s of remote URLs are dropped;
+- fonts are only kept in the formats listed, and icon fonts are cut down
+  to the glyphs the kept rules use (needs `pip install fonttools brotli`;
+  without it they are copied whole);
+- every file is named after a hash of its contents, and `vendor.json`
+  lists them for `bs4dash_py.dependencies.vendor_dependency`.
+
+Build with `dashboard_page_shiny(vendored=True)` to serve the result.
+"""
+
+import argparse
+import fnmatch
+import functools
+import hashlib
+import io
+import json
+import os
+import posixpath
+import re
+import sys
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath("src"))
+
+from bs4dash_py.dependencies import (  # noqa: E402
+    ASSETS_DIR,
+    VENDOR_DIR,
+    VENDOR_MANIFEST,
+)
+
+SOURCES = Path(__file__).parent / "vendor_sources.json"
+
+# Code scanned for class names besides the vendored scripts
+PACKAGE_DIR = ASSETS_DIR.parent
+
+_WORD = re.compile(r"[A-Za-z_][\w-]*")
+# `f"bg-{color}"` or `'badge-' + x`: any class with the prefix may be emitted
+_PREFIX = re.compile(r"([A-Za-z][\w-]*-)(?:\{|[\"']\s*\+)")
+_CLASS = re.compile(r"\.((?:[\w-]|\\.)+)")
+_URL = re.compile(r"url\(\s*([\"']?)([^\"')]+)\1\s*\)")
+_CONTENT = re.compile(r"content\s*:\s*[\"']\\([0-9a-fA-F]{2,6})[\"']")
+
+_GROUP_RULES = ("@media", "@supports", "@document", "@layer")
+_SCANNED = {".py", ".js", ".html", ".htm", ".md", ".R"}
+
+
+class UsedClasses:
+    """Class names (and class name prefixes) found in scanned code."""
+
+    def __init__(self, keep=()):
+        self.words = set()
+        self.prefixes = set()
+        self.patterns = list(keep)
+
+    def scan(self, text):
+        self.words.update(_WORD.findall(text))
+        self.prefixes.update(_PREFIX.findall(text))
+
+    def scan_path(self, path):
+        path = Path(path)
+        files = path.rglob("*") if path.is_dir() else [path]
+        for f in files:
+            if f.is_file() and f.suffix in _SCANNED:
+                self.scan(f.read_text(encoding="utf-8", errors="replace"))
+
+    def __contains__(self, cls):
+        return (
+            cls in self.words
+            or any(cls.startswith(p) for p in self.prefixes)
+            or any(fnmatch.fnmatchcase(cls, p) for p in self.patterns)
+        )
+
+
+def _skip_string(css, i):
+    quote = css[i]
+    j = i + 1
+    while j < len(css) and css[j] != quote:
+        j += 2 if css[j] == "\\" else 1
+    return j + 1
+
+
+def _split(text, sep):
+    # split on `sep` outside strings, parentheses and brackets
+    parts, depth, start, i = [], 0, 0, 0
+    while i < len(text):
+        c = text[i]
+        if c in "'\"":
+            i = _skip_string(text, i)
+            continue
+        if c in "([":
+            depth += 1
+        elif c in ")]":
+            depth -= 1
+        elif c == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+        i += 1
+    parts.append(text[start:])
+    return parts
+
+
+def css_rules(css):
+    """Yield (prelude, body) per top-level rule; body is None for statements."""
+    i, n, start = 0, len(css), 0
+    while i < n:
+        c = css[i]
+        if css.startswith("/*", i):
+            end = css.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            if css[start:i].strip().startswith("/*"):
+                start = i
+        elif c in "'\"":
+            i = _skip_string(css, i)
+        elif c == ";":
+            yield css[start:i].strip(), None
+            i = start = i + 1
+        elif c == "{":
+            depth, j = 1, i + 1
+            while j < n and depth:
+                if css[j] in "'\"":
+                    j = _skip_string(css, j)
+                    continue
+                if css.startswith("/*", j):
+                    end = css.find("*/", j + 2)
+                    j = n if end < 0 else end + 2
+                    continue
+                depth += {"{": 1, "}": -1}.get(css[j], 0)
+                j += 1
+            yield css[start:i].strip(), css[i + 1 : j - 1]
+            i = start = j
+        else:
+            i += 1
+
+
+def _selector_used(selector, used):
+    # classes inside :not() don't have to exist for the selector to match
+    selector = re.sub(r":not\([^)]*\)", "", selector)
+    selector = re.sub(r"\[[^\]]*\]", "", selector)
+    return all(c.replace("\\", "") in used for c in _CLASS.findall(selector))
+
+
+def subset_css(css, used):
+    """Return `css` without the rules for classes not in `used`."""
+    out = []
+    for prelude, body in css_rules(css):
+        if body is None:
+            if prelude.lower().startswith("@import") and re.search(
+                r"(https?:)?//", prelude
+            ):
+                # remote imports can't load offline
+                continue
+            if prelude:
+                out.append(prelude + ";")
+            continue
+        if prelude.startswith(_GROUP_RULES):
+            inner = subset_css(body, used)
+            if inner:
+                out.append(f"{prelude}{{{inner}}}")
+        elif prelude.startswith("@"):
+            out.append(f"{prelude}{{{body}}}")
+        else:
+            selectors = [s.strip() for s in _split(prelude, ",")]
+            kept = [s for s in selectors if _selector_used(s, used)]
+            if kept:
+                out.append(f"{','.join(kept)}{{{body}}}")
+    return "".join(out)
+
+
+def _hashed(name, data):
+    stem, dot, ext = name.rpartition(".")
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    return f"{stem}.{digest}.{ext}" if dot else f"{name}.{digest}"
+
+
+@functools.lru_cache(maxsize=None)
+def _fonttools():
+    try:
+        from fontTools import subset
+    except ImportError:
+        print("fonttools not installed; copying icon fonts whole", file=sys.stderr)
+        return None
+    return subset
+
+
+def _subset_font(data, codepoints):
+    subset = _fonttools()
+    if subset is None:
+        return data
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = ["*"]
+    font = subset.load_font(io.BytesIO(data), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    out = io.BytesIO()
+    subset.save_font(font, out, options)
+    return out.getvalue()
+
+
+class Vendor:
+    """Collects the files of one build and writes them with hashed names."""
+
+    def __init__(self, out_dir):
+        self.out_dir = Path(out_dir)
+        self.written = {}
+
+    def write(self, name, data, source):
+        target = _hashed(name, data)
+        (self.out_dir / target).write_bytes(data)
+        self.written[target] = {
+            "source": source,
+            "sha256": hashlib.sha256(data).hexdigest(),
+        }
+        return target
+
+
+def _fetch(package, spec, path, from_dir, download):
+    if from_dir is not None:
+        local = Path(from_dir) / package / path
+        if local.exists():
+            return local.read_bytes()
+    if not download:
+        return None
+    with urllib.request.urlopen(spec["url"] + path) as response:
+        return response.read()
+
+
+def _font_face(body, resolve):
+    # keep only the `src` entries whose files are available
+    decls = []
+    for decl in _split(body, ";"):
+        prop, _, value = decl.partition(":")
+        if prop.strip().lower() == "src":
+            entries = [
+                e
+                for e in _split(value, ",")
+                if all(resolve(u) for _, u in _URL.findall(e))
+            ]
+            if not entries:
+                continue
+            decl = f"{prop}:{','.join(e.strip() for e in entries)}"
+        if decl.strip():
+            decls.append(decl.strip())
+    return ";".join(decls)
+
+
+def _rewrite_css(css, css_path, files, vendor, package):
+    """Point the url()s in `css` at the vendored, hash-named files."""
+    codepoints = {int(cp, 16) for cp in _CONTENT.findall(css)}
+    targets = {}
+
+    def resolve(url):
+        if url.startswith("data:"):
+            return url
+        path = posixpath.normpath(
+            posixpath.join(posixpath.dirname(css_path), url.split("?")[0].split("#")[0])
+        )
+        if path not in files:
+            return None
+        if path not in targets:
+            data = files[path]
+            if codepoints and path.endswith(".woff2"):
+                data = _subset_font(data, codepoints)
+            targets[path] = vendor.write(
+                posixpath.basename(path), data, f"{package}/{path}"
+            )
+        return targets[path]
+
+    out = []
+    for prelude, body in css_rules(css):
+        if body is not None and prelude.lower() == "@font-face":
+            body = _font_face(body, resolve)
+            if not _URL.search(body):
+                continue
+        out.append(prelude + ";" if body is None else f"{prelude}{{{body}}}")
+    css = "".join(out)
+    return _URL.sub(
+        lambda m: (
+            f"url({resolve(m.group(2)) or m.group(2)})"
+            if not m.group(2).startswith(("data:", "http:", "https:", "//"))
+            else m.group(0)
+        ),
+        css,
+    )
+
+
+def _clean(out_dir):
+    # remove the files of a previous build (only those it listed)
+    try:
+        previous = json.loads((out_dir / VENDOR_MANIFEST).read_text("utf-8"))
+    except (OSError, ValueError):
+        return
+    for name in previous.get("files", {}):
+        (out_dir / name).unlink(missing_ok=True)
+
+
+def build(
+    sources=None,
+    from_dir=None,
+    out_dir=VENDOR_DIR,
+    scan=(),
+    keep=(),
+    download=False,
+    lock=False,
+):
+    """Vendor the packages in `sources` into `out_dir`; return the manifest."""
+    sources_path = Path(sources or SOURCES)
+    spec_all = json.loads(sources_path.read_text(encoding="utf-8"))
+    fetched = {}
+    for package, spec in spec_all.items():
+        paths = (
+            spec.get("stylesheets", [])
+            + spec.get("scripts", [])
+            + spec.get("files", [])
+        )
+        pins = spec.get("sha256", {})
+        for path in paths:
+            data = _fetch(package, spec, path, from_dir, download)
+            if data is None:
+                raise FileNotFoundError(
+                    f"{package}/{path} not found; pass --from DIR or --download"
+                )
+            digest = hashlib.sha256(data).hexdigest()
+            if path in pins and pins[path] != digest:
+                raise ValueError(f"{package}/{path}: sha256 {digest} != pinned")
+            if lock:
+                spec.setdefault("sha256", {})[path] = digest
+            fetched[package, path] = data
+    if lock:
+        sources_path.write_text(json.dumps(spec_all, indent=2) + "\n", encoding="utf-8")
+
+    used = UsedClasses(keep)
+    used.scan_path(PACKAGE_DIR)
+    for path in scan:
+        used.scan_path(path)
+    for (package, path), data in fetched.items():
+        if path.endswith(".js"):
+            used.scan(data.decode("utf-8", errors="replace"))
+
+    out_dir = Path(out_dir)
+    _clean(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    vendor = Vendor(out_dir)
+    manifest = {"packages": {}, "stylesheets": [], "scripts": []}
+    for package, spec in spec_all.items():
+        manifest["packages"][package] = spec["version"]
+        files = {p: d for (pkg, p), d in fetched.items() if pkg == package}
+        for path in spec.get("stylesheets", []):
+            css = subset_css(files[path].decode("utf-8"), used)
+            css = _rewrite_css(css, path, files, vendor, package)
+            manifest["stylesheets"].append(
+                vendor.write(
+                    posixpath.basename(path), css.encode("utf-8"), f"{package}/{path}"
+                )
+            )
+        for path in spec.get("scripts", []):
+            manifest["scripts"].append(
+                vendor.write(posixpath.basename(path), files[path], f"{package}/{path}")
+            )
+    manifest["files"] = vendor.written
+    (out_dir / VENDOR_MANIFEST).write_text(
+        json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+    )
+    return manifest
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--from", dest="from_dir", help="directory of upstream files")
+    p.add_argument("--download", action="store_true", help="fetch missing files")
+    p.add_argument("--scan", nargs="+", default=[], help="app code to scan")
+    p.add_argument(
+        "--keep", nargs="+", default=[], help="class patterns to keep, e.g. 'fa-*'"
+    )
+    p.add_argument("--out", default=VENDOR_DIR, help="output directory")
+    p.add_argument("--sources", default=SOURCES, help="sources manifest")
+    p.add_argument("--lock", action="store_true", help="pin sha256 of the inputs")
+    args = p.parse_args(argv)
+    manifest = build(
+        args.sources,
+        args.from_dir,
+        args.out,
+        args.scan,
+        args.keep,
+        args.download,
+        args.lock,
+    )
+    for name in sorted(manifest["files"]):
+        size = (Path(args.out) / name).stat().st_size
+        print(f"{name} {size} <- {manifest['files'][name]['source']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -119,6 +119,18 @@ def toggle_controlbar(*args, **kwargs):
     return _lazy_import("toggle_controlbar", "server")(*args, **kwargs)
 
 
+def update_sidebar(*args, **kwargs):
+    return _lazy_import("update_sidebar", "server")(*args, **kwargs)
+
+
+def update_virtual_sidebar(*args, **kwargs):
+    return _lazy_import("update_virtual_sidebar", "server")(*args, **kwargs)
+
+
+def update_navbar_tabs(*args, **kwargs):
+    return _lazy_import("update_navbar_tabs", "server")(*args, **kwargs)
+
+
 def update_sidebar_badges(*args, **kwargs):
     return _lazy_import("update_sidebar_badges", "server")(*args, **kwargs)
 
@@ -135,6 +147,259 @@ def update_tab_content(*args, **kwargs):
     return _lazy_import("update_tab_content", "server")(*args, **kwargs)
 
 
+def batch(*args, **kwargs):
+    return _lazy_import("batch", "server")(*args, **kwargs)
+
+
+async def aupdate_sidebar(*args, **kwargs):
+    return await _lazy_import("aupdate_sidebar", "server")(*args, **kwargs)
+
+
+async def aupdate_virtual_sidebar(*args, **kwargs):
+    return await _lazy_import("aupdate_virtual_sidebar", "server")(*args, **kwargs)
+
+
+async def aupdate_navbar_tabs(*args, **kwargs):
+    return await _lazy_import("aupdate_navbar_tabs", "server")(*args, **kwargs)
+
+
+async def ashow_controlbar(*args, **kwargs):
+    return await _lazy_import("ashow_controlbar", "server")(*args, **kwargs)
+
+
+async def ahide_controlbar(*args, **kwargs):
+    return await _lazy_import("ahide_controlbar", "server")(*args, **kwargs)
+
+
+async def atoggle_controlbar(*args, **kwargs):
+    return await _lazy_import("atoggle_controlbar", "server")(*args, **kwargs)
+
+
+async def aupdate_sidebar_badges(*args, **kwargs):
+    return await _lazy_import("aupdate_sidebar_badges", "server")(*args, **kwargs)
+
+
+async def aupdate_sidebar_active(*args, **kwargs):
+    return await _lazy_import("aupdate_sidebar_active", "server")(*args, **kwargs)
+
+
+async def aupdate_navbar_items(*args, **kwargs):
+    return await _lazy_import("aupdate_navbar_items", "server")(*args, **kwargs)
+
+
+async def aupdate_tab_content(*args, **kwargs):
+    return await _lazy_import("aupdate_tab_content", "server")(*args, **kwargs)
+
+
+def enable_shadow_state(*args, **kwargs):
+    return _lazy_import("enable_shadow_state", "server")(*args, **kwargs)
+
+
+def disable_shadow_state(*args, **kwargs):
+    return _lazy_import("disable_shadow_state", "server")(*args, **kwargs)
+
+
+def reset_shadow_state(*args, **kwargs):
+    return _lazy_import("reset_shadow_state", "server")(*args, **kwargs)
+
+
+# Cross-thread delivery dispatcher
+def attach_dispatcher(*args, **kwargs):
+    return _lazy_import("attach_dispatcher", "dispatch")(*args, **kwargs)
+
+
+def get_dispatcher(*args, **kwargs):
+    return _lazy_import("get_dispatcher", "dispatch")(*args, **kwargs)
+
+
+def detach_dispatcher(*args, **kwargs):
+    return _lazy_import("detach_dispatcher", "dispatch")(*args, **kwargs)
+
+
+# Throttle / debounce policies
+def throttle(*args, **kwargs):
+    return _lazy_import("throttle", "ratelimit")(*args, **kwargs)
+
+
+def debounce(*args, **kwargs):
+    return _lazy_import("debounce", "ratelimit")(*args, **kwargs)
+
+
+def set_rate_limits(*args, **kwargs):
+    return _lazy_import("set_rate_limits", "ratelimit")(*args, **kwargs)
+
+
+def clear_rate_limits(*args, **kwargs):
+    return _lazy_import("clear_rate_limits", "ratelimit")(*args, **kwargs)
+
+
+def flush_rate_limits(*args, **kwargs):
+    return _lazy_import("flush_rate_limits", "ratelimit")(*args, **kwargs)
+
+
+# Delivery metrics
+def enable_metrics(*args, **kwargs):
+    return _lazy_import("enable_metrics", "metrics")(*args, **kwargs)
+
+
+def disable_metrics(*args, **kwargs):
+    return _lazy_import("disable_metrics", "metrics")(*args, **kwargs)
+
+
+def get_metrics(*args, **kwargs):
+    return _lazy_import("get_metrics", "metrics")(*args, **kwargs)
+
+
+def metrics_snapshot(*args, **kwargs):
+    return _lazy_import("metrics_snapshot", "metrics")(*args, **kwargs)
+
+
+def prometheus_text(*args, **kwargs):
+    return _lazy_import("prometheus_text", "metrics")(*args, **kwargs)
+
+
+# Client acknowledgements
+def enable_acks(*args, **kwargs):
+    return _lazy_import("enable_acks", "acks")(*args, **kwargs)
+
+
+def disable_acks(*args, **kwargs):
+    return _lazy_import("disable_acks", "acks")(*args, **kwargs)
+
+
+def ack_stats(*args, **kwargs):
+    return _lazy_import("ack_stats", "acks")(*args, **kwargs)
+
+
+async def wait_for_ack(*args, **kwargs):
+    return await _lazy_import("wait_for_ack", "acks")(*args, **kwargs)
+
+
+# Content-addressed client cache for tab content
+def enable_content_cache(*args, **kwargs):
+    return _lazy_import("enable_content_cache", "content_cache")(*args, **kwargs)
+
+
+def disable_content_cache(*args, **kwargs):
+    return _lazy_import("disable_content_cache", "content_cache")(*args, **kwargs)
+
+
+def handle_cache_miss(*args, **kwargs):
+    return _lazy_import("handle_cache_miss", "content_cache")(*args, **kwargs)
+
+
+# Broadcasting to many sessions
+def register_session(*args, **kwargs):
+    return _lazy_import("register_session", "broadcast")(*args, **kwargs)
+
+
+def unregister_session(*args, **kwargs):
+    return _lazy_import("unregister_session", "broadcast")(*args, **kwargs)
+
+
+def registered_sessions(*args, **kwargs):
+    return _lazy_import("registered_sessions", "broadcast")(*args, **kwargs)
+
+
+def broadcast(*args, **kwargs):
+    return _lazy_import("broadcast", "broadcast")(*args, **kwargs)
+
+
+async def abroadcast(*args, **kwargs):
+    return await _lazy_import("abroadcast", "broadcast")(*args, **kwargs)
+
+
+async def abroadcast_message(*args, **kwargs):
+    return await _lazy_import("abroadcast_message", "broadcast")(*args, **kwargs)
+
+
+# Lazily rendered tab panes
+def lazy_tabs(*args, **kwargs):
+    return _lazy_import("lazy_tabs", "lazy")(*args, **kwargs)
+
+
+def handle_lazy_tab(*args, **kwargs):
+    return _lazy_import("handle_lazy_tab", "lazy")(*args, **kwargs)
+
+
+def lazy_boxes(*args, **kwargs):
+    return _lazy_import("lazy_boxes", "lazy")(*args, **kwargs)
+
+
+def handle_lazy_box(*args, **kwargs):
+    return _lazy_import("handle_lazy_box", "lazy")(*args, **kwargs)
+
+
+# Container visibility and output suspension
+def is_visible(*args, **kwargs):
+    return _lazy_import("is_visible", "visibility")(*args, **kwargs)
+
+
+def suspend_when_hidden(*args, **kwargs):
+    return _lazy_import("suspend_when_hidden", "visibility")(*args, **kwargs)
+
+
+# Hold messages while the page is hidden
+def enable_background_hold(*args, **kwargs):
+    return _lazy_import("enable_background_hold", "background")(*args, **kwargs)
+
+
+def disable_background_hold(*args, **kwargs):
+    return _lazy_import("disable_background_hold", "background")(*args, **kwargs)
+
+
+def set_page_visible(*args, **kwargs):
+    return _lazy_import("set_page_visible", "background")(*args, **kwargs)
+
+
+# Versioned, cacheable client assets
+def with_asset_cache(*args, **kwargs):
+    return _lazy_import("with_asset_cache", "dependencies")(*args, **kwargs)
+
+
+# Inline SVG icon sprite
+def register_icon(*args, **kwargs):
+    return _lazy_import("register_icon", "icons")(*args, **kwargs)
+
+
+def register_icons(*args, **kwargs):
+    return _lazy_import("register_icons", "icons")(*args, **kwargs)
+
+
+def icon_shiny(*args, **kwargs):
+    return _lazy_import("icon_shiny", "icons")(*args, **kwargs)
+
+
+# Cross-session layout fragment cache
+def cache_fragment(*args, **kwargs):
+    return _lazy_import("cache_fragment", "fragment_cache")(*args, **kwargs)
+
+
+def cached_builder(*args, **kwargs):
+    return _lazy_import("cached_builder", "fragment_cache")(*args, **kwargs)
+
+
+def set_fragment_cache_limits(*args, **kwargs):
+    return _lazy_import("set_fragment_cache_limits", "fragment_cache")(*args, **kwargs)
+
+
+def clear_fragment_cache(*args, **kwargs):
+    return _lazy_import("clear_fragment_cache", "fragment_cache")(*args, **kwargs)
+
+
+def fragment_cache_stats(*args, **kwargs):
+    return _lazy_import("fragment_cache_stats", "fragment_cache")(*args, **kwargs)
+
+
+# Static shell export
+def export_shell(*args, **kwargs):
+    return _lazy_import("export_shell", "shell")(*args, **kwargs)
+
+
+def shell_app(*args, **kwargs):
+    return _lazy_import("shell_app", "shell")(*args, **kwargs)
+
+
 __all__ = [
     "dashboard_page",
     "navbar",
@@ -163,9 +428,70 @@ __all__ = [
     "hide_controlbar",
     "toggle_controlbar",
     "update_sidebar",
+    "update_virtual_sidebar",
     "update_navbar_tabs",
     "update_sidebar_badges",
     "update_sidebar_active",
     "update_navbar_items",
     "update_tab_content",
+    "batch",
+    "aupdate_sidebar",
+    "aupdate_virtual_sidebar",
+    "aupdate_navbar_tabs",
+    "ashow_controlbar",
+    "ahide_controlbar",
+    "atoggle_controlbar",
+    "aupdate_sidebar_badges",
+    "aupdate_sidebar_active",
+    "aupdate_navbar_items",
+    "aupdate_tab_content",
+    "enable_shadow_state",
+    "disable_shadow_state",
+    "reset_shadow_state",
+    "attach_dispatcher",
+    "get_dispatcher",
+    "detach_dispatcher",
+    "throttle",
+    "debounce",
+    "set_rate_limits",
+    "clear_rate_limits",
+    "flush_rate_limits",
+    "enable_metrics",
+    "disable_metrics",
+    "get_metrics",
+    "metrics_snapshot",
+    "prometheus_text",
+    "enable_acks",
+    "disable_acks",
+    "ack_stats",
+    "wait_for_ack",
+    "enable_content_cache",
+    "disable_content_cache",
+    "handle_cache_miss",
+    "register_session",
+    "unregister_session",
+    "registered_sessions",
+    "broadcast",
+    "abroadcast",
+    "abroadcast_message",
+    "lazy_tabs",
+    "handle_lazy_tab",
+    "lazy_boxes",
+    "handle_lazy_box",
+    "is_visible",
+    "suspend_when_hidden",
+    "enable_background_hold",
+    "disable_background_hold",
+    "set_page_visible",
+    "with_asset_cache",
+    "register_icon",
+    "register_icons",
+    "icon_shiny",
+    "cache_fragment",
+    "cached_builder",
+    "set_fragment_cache_limits",
+    "clear_fragment_cache",
+    "fragment_cache_stats",
+    "export_shell",
+    "shell_app",
 ]
@@ -0,0 +1,279 @@
+"""Client acknowledgements and end-to-end apply latency.
+
+With ack mode enabled for a session, every message sent to it carries a
+sequence id (`_seq`). After applying a message, the client asset reports the
+highest applied sequence id to an ack route registered on the session
+(`session.dynamic_route`). The route is served outside Shiny's reactive
+graph, so an effect awaiting `wait_for_ack` gets its ack while it holds up
+the reactive flush; an input could only arrive after that flush. The server
+records send-to-apply latency per message type (batched messages count for
+each message they contain) and resolves any `wait_for_ack` awaiting it.
+
+Acks are cumulative: an ack for sequence id `n` covers every earlier
+message, as the client applies messages in order. Latency is measured on the
+server from send to ack receipt, so it includes the return trip.
+
+    from bs4dash_py import ack_stats, aupdate_tab_content, enable_acks, wait_for_ack
+
+    def server(input, output, session):
+        enable_acks(session)
+
+        @reactive.effect
+        async def _():
+            await aupdate_tab_content(session, "kpi", render_kpis())
+            latency = await wait_for_ack(session, timeout=2.0)
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Optional
+
+from . import server
+
+# Input the client reports applied sequence ids on without an ack route
+ACK_INPUT = "bs4dash_ack"
+# Dynamic route the client reports applied sequence ids to, and the message
+# telling the client its URL
+ACK_ROUTE = "bs4dash_ack"
+ACK_ROUTE_MESSAGE = "bs4dash_ack_route"
+
+
+def _percentile(ordered: list, q: float) -> float:
+    """Return the `q`-th percentile (0-100) of sorted samples, nearest-rank."""
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class AckTracker:
+    """Sequence ids, pending acks and apply latencies for one session.
+
+    - window: number of latency samples kept per message type
+    - max_pending: unacknowledged messages tracked before the oldest are
+      forgotten (e.g., when the client asset is an old version)
+    """
+
+    def __init__(self, window: int = 1024, max_pending: int = 10000):
+        self.lock = threading.Lock()
+        self.window = window
+        self.max_pending = max_pending
+        self.seq = 0
+        self.acked = 0
+        self.pending: "OrderedDict[int, tuple]" = OrderedDict()
+        self.samples: dict = {}
+        self.recent: "OrderedDict[int, float]" = OrderedDict()
+        self.waiters: list = []
+        self.unacked = 0
+        self.apply_ms = None
+
+    def stamp(self, name: str, payload: dict) -> dict:
+        """Return a copy of `payload` carrying the next sequence id."""
+        if name == server.BATCH_MESSAGE:
+            names = [m.get("type") for m in (payload or {}).get("messages", [])]
+        else:
+            names = [name]
+        with self.lock:
+            self.seq += 1
+            seq = self.seq
+            self.pending[seq] = (names, time.monotonic())
+            while len(self.pending) > self.max_pending:
+                self.pending.popitem(last=False)
+                self.unacked += 1
+        return dict(payload or {}, _seq=seq)
+
+    def receive(self, ack: Any) -> None:
+        """Record a client ack: {"seq": n, "apply_ms": ms} (or just n)."""
+        if isinstance(ack, dict):
+            seq, apply_ms = ack.get("seq"), ack.get("apply_ms")
+        else:
+            seq, apply_ms = ack, None
+        try:
+            seq = int(seq)
+        except (TypeError, ValueError):
+            return
+        now = time.monotonic()
+        with self.lock:
+            if apply_ms is not None:
+                self.apply_ms = apply_ms
+            while self.pending:
+                first = next(iter(self.pending))
+                if first > seq:
+                    break
+                names, sent_at = self.pending.pop(first)
+                latency = now - sent_at
+                for n in names:
+                    samples = self.samples.get(n)
+                    if samples is None:
+                        samples = self.samples[n] = deque(maxlen=self.window)
+                    samples.append(latency)
+                self.recent[first] = latency
+                if len(self.recent) > 256:
+                    self.recent.popitem(last=False)
+            self.acked = max(self.acked, seq)
+            ready = [
+                (loop, future, self.recent.get(wseq))
+                for wseq, loop, future in self.waiters
+                if wseq <= seq
+            ]
+            self.waiters = [w for w in self.waiters if w[0] > seq]
+        for loop, future, latency in ready:
+            self._resolve(loop, future, latency)
+
+    @staticmethod
+    def _resolve(loop, future, value) -> None:
+        def _set():
+            if not future.done():
+                future.set_result(value)
+
+        try:
+            if getattr(loop, "_thread_id", None) == threading.get_ident():
+                _set()
+            else:
+                loop.call_soon_threadsafe(_set)
+        except RuntimeError:
+            pass
+
+    async def wait(self, seq: Optional[int] = None, timeout: Optional[float] = None):
+        """Wait for the ack of `seq` (default: the last message sent)."""
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if seq is None:
+                seq = self.seq
+            if seq <= self.acked:
+                return self.recent.get(seq)
+            future = loop.create_future()
+            entry = (seq, loop, future)
+            self.waiters.append(entry)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            with self.lock:
+                if entry in self.waiters:
+                    self.waiters.remove(entry)
+
+    def stats(self, percentiles=(50, 90, 99)) -> dict:
+        """Return apply latency percentiles (seconds) per message type."""
+        with self.lock:
+            out = {}
+            for name, samples in self.samples.items():
+                ordered = sorted(samples)
+                if not ordered:
+                    continue
+                entry = {"count": len(ordered), "max": ordered[-1]}
+                for q in percentiles:
+                    entry[f"p{q:g}"] = _percentile(ordered, q)
+                out[name] = entry
+            return out
+
+
+def enable_acks(session: Any, **options) -> AckTracker:
+    """Number messages sent to `session` and track the client's acks.
+
+    Call it from the server function: acks are received on a dynamic route
+    of the session, or through the ack input (observed with a Shiny
+    reactive effect) when the session has no dynamic routes. Without Shiny,
+    feed acks to the returned tracker's `receive`. Options are those of
+    `AckTracker`.
+    """
+    state = server._session_state(session)
+    with state.lock:
+        tracker = state.acks
+        if tracker is None:
+            tracker = state.acks = AckTracker(**options)
+        else:
+            return tracker
+    if not _register_route(session, tracker):
+        _observe_input(session, tracker)
+    return tracker
+
+
+def _register_route(session: Any, tracker: AckTracker) -> bool:
+    """Receive acks for `tracker` on a dynamic route of a Shiny session.
+
+    Returns False when the session has no dynamic routes.
+    """
+    root = getattr(session, "_root_session", session)
+    dynamic_route = getattr(root, "dynamic_route", None)
+    if not callable(dynamic_route):
+        return False
+    try:
+        from starlette.responses import Response
+    except Exception:
+        return False
+
+    def _receive_ack(request):
+        params = request.query_params
+        try:
+            apply_ms = float(params.get("apply_ms"))
+        except (TypeError, ValueError):
+            apply_ms = None
+        tracker.receive({"seq": params.get("seq"), "apply_ms": apply_ms})
+        return Response(status_code=204)
+
+    try:
+        url = dynamic_route(ACK_ROUTE, _receive_ack)
+    except Exception:
+        return False
+    server._send_custom_message(session, ACK_ROUTE_MESSAGE, {"url": url})
+    return True
+
+
+def _observe_input(session: Any, tracker: AckTracker) -> None:
+    """Feed the `bs4dash_ack` input of a Shiny session to `tracker`."""
+    root = getattr(session, "_root_session", session)
+    inputs = getattr(root, "input", None)
+    if inputs is None:
+        return
+    try:
+        from shiny import reactive
+    except Exception:
+        return
+    try:
+
+        @reactive.effect
+        @reactive.event(inputs[ACK_INPUT], ignore_init=True)
+        def _receive_ack():
+            tracker.receive(inputs[ACK_INPUT]())
+
+    except Exception:
+        # not in a session context: acks must be fed to `tracker.receive`
+        pass
+
+
+def disable_acks(session: Any) -> None:
+    """Stop numbering messages for `session`."""
+    server._session_state(session).acks = None
+
+
+def get_ack_tracker(session: Any) -> Optional[AckTracker]:
+    """Return the session's `AckTracker`, or None when acks are disabled."""
+    return server._session_state(session).acks
+
+
+def ack_stats(session: Any, percentiles=(50, 90, 99)) -> dict:
+    """Return apply latency percentiles per message type for `session`.
+
+    Example: {"bs4dash_update_tab_content": {"count": 120, "max": 0.41,
+    "p50": 0.03, "p90": 0.09, "p99": 0.32}} (seconds).
+    """
+    tracker = server._session_state(session).acks
+    return {} if tracker is None else tracker.stats(percentiles)
+
+
+async def wait_for_ack(
+    session: Any, seq: Optional[int] = None, timeout: Optional[float] = None
+):
+    """Wait until the client has applied message `seq` (default: the last one).
+
+    Messages queued for the current reactive flush are sent first, so the
+    wait covers them. Returns the send-to-apply latency in seconds (None if
+    it is no longer known). Raises `asyncio.TimeoutError` after `timeout`
+    seconds and `RuntimeError` when acks are not enabled for `session`.
+    """
+    tracker = server._session_state(session).acks
+    if tracker is None:
+        raise RuntimeError("acks are not enabled; call enable_acks(session)")
+    await server._aship_auto_batch(session)
+    return await tracker.wait(seq, timeout)
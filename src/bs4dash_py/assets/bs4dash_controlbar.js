@@ -1,3 +1,5 @@
+// Sections between `// @bundle <name>` and `// @end bundle` are optional:
+// `scripts/build_assets.py --only <names>` builds a bundle without the others.
 (function(){
     function handle(msg){
         var action = msg && msg.action ? msg.action : 'toggle';
@@ -7,152 +9,791 @@
         else if(action === 'hide') body.classList.remove('control-sidebar-open');
         else body.classList.toggle('control-sidebar-open');
     }
-    if(window.Shiny && Shiny.addCustomMessageHandler){
-        Shiny.addCustomMessageHandler('bs4dash_controlbar', handle);
-
-        // Update sidebar menu: payload {items: [{text: 'Home', href: '#'}]}
-        Shiny.addCustomMessageHandler('bs4dash_update_sidebar', function(msg){
-            try{
-                var items = (msg && msg.items) ? msg.items : [];
-                var nav = document.querySelector('.main-sidebar .nav');
-                if(!nav) return;
-                nav.innerHTML = '';
-                items.forEach(function(it){
-                    var li = document.createElement('li');
-                    li.className = 'nav-item';
-                    var a = document.createElement('a');
-                    a.className = 'nav-link';
-                    a.href = it.href || '#';
-                    a.textContent = it.text || '';
-                    li.appendChild(a);
-                    nav.appendChild(li);
-                });
-            }catch(e){console.error(e);}
+    // Build a sidebar menu <li> for {text, href}
+    function sidebarItem(it){
+        var li = document.createElement('li');
+        li.className = 'nav-item';
+        var a = document.createElement('a');
+        a.className = 'nav-link';
+        a.href = it.href || '#';
+        a.textContent = it.text || '';
+        li.appendChild(a);
+        return li;
+    }
+    // Update a sidebar <li> in place, keeping its badge
+    function renderSidebarItem(li, it){
+        var a = li.querySelector('a');
+        if(a) setLinkText(a, it.text || '');
+    }
+    // @bundle navs
+    // Build a navbar <li> for {title, href, badge}
+    function navItem(it){
+        var li = document.createElement('li');
+        li.className = 'nav-item';
+        var a = document.createElement('a');
+        a.className = 'nav-link';
+        a.href = it.href || '#';
+        a.textContent = it.title || '';
+        if(it.badge){
+            var span = document.createElement('span');
+            span.className = 'badge badge-info float-right';
+            span.textContent = it.badge;
+            a.appendChild(span);
+        }
+        li.appendChild(a);
+        return li;
+    }
+    function renderNavItem(li, it){
+        var a = li.querySelector('a');
+        if(!a) return;
+        setLinkText(a, it.title || '');
+        var badge = a.querySelector('.badge');
+        if(it.badge){
+            if(!badge){
+                badge = document.createElement('span');
+                badge.className = 'badge badge-info float-right';
+                a.appendChild(badge);
+            }
+            badge.textContent = it.badge;
+        } else if(badge){
+            badge.remove();
+        }
+    }
+    // Build a navbar tab <li> for {id, title, href, active}
+    function navTab(t){
+        var li = document.createElement('li');
+        li.className = 'nav-item';
+        var a = document.createElement('a');
+        a.className = 'nav-link' + (t.active ? ' active' : '');
+        a.href = t.href || '#';
+        a.textContent = t.title || '';
+        li.appendChild(a);
+        return li;
+    }
+    function renderNavTab(li, t){
+        var a = li.querySelector('a');
+        if(!a) return;
+        setLinkText(a, t.title || '');
+        a.classList.toggle('active', !!t.active);
+    }
+    // @end bundle
+    // Replace the first text node of a link, leaving child elements alone
+    function setLinkText(a, text){
+        for(var n = a.firstChild; n; n = n.nextSibling){
+            if(n.nodeType === 3){ n.nodeValue = text; return; }
+        }
+        a.insertBefore(document.createTextNode(text), a.firstChild);
+    }
+    // Key of a menu <li>: the href of its link
+    function itemKey(li){
+        var a = li.querySelector('a');
+        return a ? (a.getAttribute('href') || '#') : null;
+    }
+    // Indexes in `seq` forming a longest increasing subsequence
+    function lis(seq){
+        var tails = [], prev = new Array(seq.length);
+        for(var i = 0; i < seq.length; i++){
+            var lo = 0, hi = tails.length;
+            while(lo < hi){
+                var mid = (lo + hi) >> 1;
+                if(seq[tails[mid]] < seq[i]) lo = mid + 1; else hi = mid;
+            }
+            prev[i] = lo > 0 ? tails[lo - 1] : -1;
+            tails[lo] = i;
+        }
+        var out = new Set();
+        for(var k = tails.length ? tails[tails.length - 1] : -1; k >= 0; k = prev[k]) out.add(k);
+        return out;
+    }
+    // Make the <li> children of `ul` match `items`, keyed by href: existing
+    // nodes are updated in place with `render` (keeping badges, focus and
+    // open treeviews), only nodes out of order are moved, and new nodes are
+    // built off-document and inserted as one DocumentFragment per run.
+    function reconcile(ul, items, build, render){
+        var old = new Map(), oldIndex = new Map(), n = 0;
+        for(var li = ul.firstElementChild; li; li = li.nextElementSibling){
+            var key = itemKey(li);
+            if(key !== null && !old.has(key)){
+                old.set(key, li);
+                oldIndex.set(li, n++);
+            }
+        }
+        var nodes = new Array(items.length), kept = [], keptAt = [];
+        items.forEach(function(it, j){
+            var key = (it && it.href) || '#';
+            var li = old.get(key);
+            if(li){
+                old.delete(key);
+                render(li, it);
+                nodes[j] = li;
+                kept.push(oldIndex.get(li));
+                keptAt.push(j);
+            }
         });
-
-        // Update nav tabs: payload {nav_id: 'some-id', tabs: [{id, title, href, active}]}
-        Shiny.addCustomMessageHandler('bs4dash_update_navs', function(msg){
-            try{
-                var nav = document.getElementById(msg.nav_id);
-                if(!nav) return;
-                var tabs = msg.tabs || [];
-                // replace inner ul of nav
-                var ul = nav.querySelector('ul');
-                if(!ul) return;
-                ul.innerHTML = '';
-                tabs.forEach(function(t){
-                    var li = document.createElement('li');
-                    li.className = 'nav-item';
-                    var a = document.createElement('a');
-                    a.className = 'nav-link' + (t.active ? ' active' : '');
-                    a.href = t.href || '#';
-                    a.textContent = t.title || '';
-                    li.appendChild(a);
-                    ul.appendChild(li);
-                });
-            }catch(e){console.error(e);}
+        // drop stale nodes (and duplicates) first, so they don't anchor moves
+        var reused = new Set(nodes);
+        Array.prototype.slice.call(ul.children).forEach(function(li){
+            if(!reused.has(li)) li.remove();
         });
-
-        // Update sidebar badges: payload {badges: [{href: '#about', badge: '3'}]}
-        Shiny.addCustomMessageHandler('bs4dash_update_sidebar_badges', function(msg){
-            try{
-                var badges = msg.badges || [];
-                var nav = document.querySelector('.main-sidebar .nav');
-                if(!nav) return;
-                badges.forEach(function(b){
-                    // find link by href
-                    var sel = "a.nav-link[href='" + (b.href || "#") + "']";
-                    var a = nav.querySelector(sel);
-                    if(!a) return;
-                    // find existing badge
-                    var existing = a.querySelector('.badge');
-                    if(b.badge === null || b.badge === undefined || b.badge === ''){
-                        if(existing) existing.remove();
-                        return;
-                    }
-                    if(!existing){
-                        var span = document.createElement('span');
-                        span.className = 'badge badge-info float-right';
-                        span.textContent = b.badge;
-                        a.appendChild(span);
-                    } else {
-                        existing.textContent = b.badge;
-                    }
-                });
-            }catch(e){console.error(e);}
+        var stable = new Set();
+        lis(kept).forEach(function(i){ stable.add(nodes[keptAt[i]]); });
+        // place from the end, so each node's successor is already in place
+        var after = null, run = [];
+        function flush(){
+            if(!run.length) return;
+            var frag = document.createDocumentFragment();
+            for(var r = run.length - 1; r >= 0; r--) frag.appendChild(run[r]);
+            ul.insertBefore(frag, after);
+            after = run[run.length - 1];
+            run = [];
+        }
+        for(var j = items.length - 1; j >= 0; j--){
+            var node = nodes[j];
+            if(!node){
+                run.push(build(items[j] || {}));
+                continue;
+            }
+            flush();
+            if(!stable.has(node)) ul.insertBefore(node, after);
+            after = node;
+        }
+        flush();
+    }
+    // Apply keyed ops from the server's shadow state to the <li> children of
+    // `ul`: [{op: remove|update|insert|move, key, item, before}]
+    function applyOps(ul, ops, build, render){
+        var byKey = {};
+        Array.prototype.forEach.call(ul.children, function(li){
+            var a = li.querySelector('a');
+            if(a) byKey[a.getAttribute('href') || '#'] = li;
         });
-
-        // Update active sidebar link: payload {target: '#about' or selector}
-        Shiny.addCustomMessageHandler('bs4dash_update_sidebar_active', function(msg){
-            try{
-                var target = msg && msg.target ? msg.target : null;
-                if(!target) return;
-                var nav = document.querySelector('.main-sidebar .nav');
-                if(!nav) return;
-                // Remove existing active classes
-                var actives = nav.querySelectorAll('a.nav-link.active');
-                actives.forEach(function(a){ a.classList.remove('active'); });
-
-                // Determine target anchor
-                var a = null;
-                try{
-                    if(target.indexOf('a.') === 0 || target.indexOf('#') === 0 || target.indexOf('.') === 0){
-                        // treat as selector
-                        a = nav.querySelector(target);
-                    }
-                }catch(e){ a = null; }
-                if(!a){
-                    // treat as href
-                    var sel = "a.nav-link[href='" + target + "']";
-                    a = nav.querySelector(sel);
-                }
-                if(a){
-                    a.classList.add('active');
-                    // Ensure parent list item gets focus/aria if needed
-                    var li = a.closest('li');
-                    if(li) li.classList.add('menu-open');
+        ops.forEach(function(op){
+            var li = byKey[op.key];
+            if(op.op === 'remove'){
+                if(li){ li.remove(); delete byKey[op.key]; }
+                return;
+            }
+            if(op.op === 'update'){
+                if(li) render(li, op.item || {});
+                return;
+            }
+            if(op.op === 'insert'){
+                li = build(op.item || {});
+                byKey[op.key] = li;
+            }
+            if(!li) return;
+            var anchor = (op.before !== null && op.before !== undefined) ? (byKey[op.before] || null) : null;
+            ul.insertBefore(li, anchor);
+        });
+    }
+    // Index of sidebar links by href, built once and rebuilt when the menu
+    // is replaced or patched, so badge and active updates don't run a
+    // selector query per item. Holds the first link per href, like
+    // querySelector.
+    var linkIndex = {nav: null, byHref: null};
+    // Links that may be active: found active when the index is built, made
+    // active by an update or shown as a tab. Other code may move the
+    // `active` class, so an active update re-checks each of them rather
+    // than trusting the set, and never sweeps the whole menu.
+    var activeLinks = new Set();
+    if(window.jQuery){
+        jQuery(document).on('shown.bs.tab', function(ev){
+            if(ev.target && ev.target.classList) activeLinks.add(ev.target);
+        });
+    }
+    function indexLinks(nav){
+        var byHref = new Map();
+        var links = nav.querySelectorAll('a.nav-link');
+        for(var i = 0; i < links.length; i++){
+            var href = links[i].getAttribute('href') || '#';
+            if(!byHref.has(href)) byHref.set(href, links[i]);
+            if(links[i].classList.contains('active')) activeLinks.add(links[i]);
+        }
+        linkIndex.nav = nav;
+        linkIndex.byHref = byHref;
+        return linkIndex;
+    }
+    function invalidateLinks(){
+        linkIndex.nav = null;
+        linkIndex.byHref = null;
+    }
+    // Return a lookup href -> sidebar link for one handler call. A stale or
+    // missing entry (the menu was changed by other code) triggers at most
+    // one rebuild per call.
+    function linkFinder(nav){
+        var rebuilt = linkIndex.nav !== nav;
+        if(rebuilt) indexLinks(nav);
+        return function(href){
+            var a = linkIndex.byHref.get(href);
+            if(a && nav.contains(a) && (a.getAttribute('href') || '#') === href) return a;
+            if(rebuilt) return null;
+            rebuilt = true;
+            return indexLinks(nav).byHref.get(href) || null;
+        };
+    }
+    // Content cache: LRU of tab content fragments keyed by hash, mirrored
+    // by the server (a Map iterates in insertion order, oldest first)
+    var fragments = {
+        map: new Map(),
+        max: 32,
+        put: function(hash, content, max){
+            if(max) this.max = max;
+            this.map.delete(hash);
+            this.map.set(hash, content);
+            while(this.map.size > this.max){
+                this.map.delete(this.map.keys().next().value);
+            }
+        },
+        get: function(hash){
+            if(!this.map.has(hash)) return null;
+            var content = this.map.get(hash);
+            this.map.delete(hash);
+            this.map.set(hash, content);
+            return content;
+        }
+    };
+    // Misses are reported together, once per tick
+    var misses = [];
+    function reportMiss(tabId, hash){
+        misses.push({tab_id: tabId, hash: hash});
+        if(misses.length > 1 || !Shiny.setInputValue) return;
+        setTimeout(function(){
+            var report = {misses: misses};
+            misses = [];
+            Shiny.setInputValue('bs4dash_cache_miss', report, {priority: 'event'});
+        }, 0);
+    }
+    // @bundle virtual-sidebar
+    // Virtualized sidebar (`sidebar_shiny(virtual=True)`): the menu arrives
+    // as compact data and only the rows in view, plus `overscan` rows either
+    // side, exist in the DOM. Rows have a fixed height and are positioned
+    // absolutely in a list sized for all rows, so scrolling stays native.
+    // Group children are expanded into row models in idle-time slices, so
+    // the first paint only pays for the top level.
+    var idle = window.requestIdleCallback ? function(fn){
+        return requestIdleCallback(fn, {timeout: 1000});
+    } : function(fn){
+        return setTimeout(function(){
+            var end = now() + 8;
+            fn({didTimeout: false, timeRemaining: function(){ return Math.max(0, end - now()); }});
+        }, 1);
+    };
+    // Group children expanded per idle slice step
+    var GROUP_SLICE = 500;
+    // Row model for one compact entry: an item ["text", "#href", badge?,
+    // icon?] or {text, href, badge, icon}, a group ["title", [items]], a
+    // header ["title"] or a divider "-"
+    function virtualRow(e, depth){
+        if(e === '-') return depth ? null : {kind: 'divider'};
+        if(Array.isArray(e)){
+            if(e.length === 1) return depth ? null : {kind: 'header', text: String(e[0])};
+            if(Array.isArray(e[1])){
+                if(depth) return null;
+                return {kind: 'group', text: String(e[0]), items: e[1], children: [], built: 0, open: false};
+            }
+            return {kind: 'item', text: e[0] || '', href: e[1] || '#',
+                badge: e[2] == null ? null : e[2], icon: e[3] || null, depth: depth};
+        }
+        if(e && typeof e === 'object'){
+            return {kind: 'item', text: e.text || '', href: e.href || '#',
+                badge: e.badge == null ? null : e.badge,
+                icon: typeof e.icon === 'string' ? e.icon : null, depth: depth};
+        }
+        return null;
+    }
+    // Icon element for a class string, or for "@name classes": a reference
+    // to the registered SVG icon `name` in the page's sprite (icons.py)
+    var SVG_NS = 'http://www.w3.org/2000/svg';
+    function iconNode(icon){
+        if(icon.charAt(0) !== '@'){
+            var i = document.createElement('i');
+            i.className = icon;
+            return i;
+        }
+        var parts = icon.split(' ');
+        var svg = document.createElementNS(SVG_NS, 'svg');
+        svg.setAttribute('class', ['bs4dash-icon'].concat(parts.slice(1)).join(' '));
+        svg.setAttribute('aria-hidden', 'true');
+        svg.setAttribute('focusable', 'false');
+        var use = document.createElementNS(SVG_NS, 'use');
+        // mirrors icons.symbol_id
+        use.setAttribute('href', '#bs4i-' + parts[0].slice(1).replace(/[^\w-]/g, '-'));
+        svg.appendChild(use);
+        return svg;
+    }
+    // [text, class] for a badge given as text, [text, class] or {text, class, color}
+    function badgeParts(b){
+        if(b === null || b === undefined || b === '') return null;
+        if(Array.isArray(b)) return [String(b[0]), b[1] || 'badge badge-info'];
+        if(typeof b === 'object'){
+            var text = b.text != null ? b.text : b.badge;
+            if(text == null) return null;
+            return [String(text), b['class'] || (b.color ? 'badge badge-' + b.color : 'badge badge-info')];
+        }
+        return [String(b), 'badge badge-info'];
+    }
+    function VirtualSidebar(scroller){
+        var self = this;
+        this.scroller = scroller;
+        this.ul = scroller.querySelector('ul');
+        this.rowHeight = parseInt(scroller.getAttribute('data-row-height'), 10) || 40;
+        var overscan = parseInt(scroller.getAttribute('data-overscan'), 10);
+        this.overscan = isNaN(overscan) ? 10 : overscan;
+        this.nodes = new Map();
+        this.pool = [];
+        this.frame = null;
+        this.building = false;
+        this.ul.style.position = 'relative';
+        scroller.addEventListener('scroll', function(){ self.schedule(); }, {passive: true});
+        window.addEventListener('resize', function(){ self.schedule(); });
+        this.ul.addEventListener('click', function(ev){
+            var li = ev.target.closest ? ev.target.closest('li') : null;
+            var row = li && li.bs4dashRow;
+            if(row && row.kind === 'group'){
+                ev.preventDefault();
+                self.toggle(row);
+            }
+        });
+        var data = null, el = scroller.querySelector('script.bs4dash-sidebar-data');
+        try{ data = el ? JSON.parse(el.textContent) : null; }catch(e){ console.error(e); }
+        this.setMenu(data || {menu: []});
+    }
+    // Replace the menu. With `keepBadges`, items without a badge keep the
+    // one shown for the same href, like the reconciled (non-virtual) menu.
+    VirtualSidebar.prototype.setMenu = function(data, keepBadges){
+        var old = keepBadges ? this.byHref : null;
+        this.top = [];
+        this.groups = [];
+        this.active = null;
+        var self = this;
+        (data.menu || []).forEach(function(e){
+            var row = virtualRow(e, 0);
+            if(!row) return;
+            if(old && row.kind === 'item' && row.badge === null && old.has(row.href)){
+                row.badge = old.get(row.href).badge;
+            }
+            self.top.push(row);
+            if(row.kind === 'group') self.groups.push(row);
+        });
+        this.reindex();
+        if(data.active) this.setActive(data.active, true);
+        this.layout();
+    };
+    VirtualSidebar.prototype.reindex = function(){
+        var byHref = this.byHref = new Map();
+        this.top.forEach(function(row){
+            if(row.kind === 'item' && !byHref.has(row.href)) byHref.set(row.href, row);
+        });
+        this.groups.forEach(function(g){
+            g.children.forEach(function(row){
+                if(!byHref.has(row.href)) byHref.set(row.href, row);
+            });
+        });
+        this.pending = this.groups.filter(function(g){ return g.built < g.items.length; });
+        this.buildIdle();
+    };
+    // Expand up to `count` more children of group `g` into row models
+    VirtualSidebar.prototype.expand = function(g, count){
+        var end = count === undefined ? g.items.length : Math.min(g.items.length, g.built + count);
+        for(; g.built < end; g.built++){
+            var row = virtualRow(g.items[g.built], 1);
+            if(!row) continue;
+            row.group = g;
+            g.children.push(row);
+            if(!this.byHref.has(row.href)) this.byHref.set(row.href, row);
+        }
+        return g.built >= g.items.length;
+    };
+    VirtualSidebar.prototype.buildIdle = function(){
+        if(this.building || !this.pending.length) return;
+        this.building = true;
+        var self = this;
+        idle(function step(deadline){
+            do{
+                var g = self.pending[0];
+                if(!g) break;
+                if(self.expand(g, GROUP_SLICE)) self.pending.shift();
+            }while(deadline.didTimeout || deadline.timeRemaining() > 1);
+            if(self.pending.length) idle(step);
+            else self.building = false;
+        });
+    };
+    // Row for `href`; expands pending groups if it isn't indexed yet
+    VirtualSidebar.prototype.find = function(href){
+        var row = this.byHref.get(href);
+        while(!row && this.pending.length){
+            this.expand(this.pending.shift());
+            row = this.byHref.get(href);
+        }
+        return row || null;
+    };
+    VirtualSidebar.prototype.layout = function(){
+        var rows = [];
+        var self = this;
+        this.top.forEach(function(row){
+            rows.push(row);
+            if(row.kind === 'group' && row.open){
+                self.expand(row);
+                Array.prototype.push.apply(rows, row.children);
+            }
+        });
+        this.rows = rows;
+        this.ul.style.height = (rows.length * this.rowHeight) + 'px';
+        this.render();
+    };
+    VirtualSidebar.prototype.schedule = function(){
+        if(this.frame !== null) return;
+        var self = this;
+        var run = function(){ self.frame = null; self.render(); };
+        this.frame = (window.requestAnimationFrame && !document.hidden)
+            ? requestAnimationFrame(run) : setTimeout(run, 0);
+    };
+    // Show the rows in view: nodes leaving the window are recycled for rows
+    // entering it, and only rows that changed are re-rendered
+    VirtualSidebar.prototype.render = function(){
+        var h = this.rowHeight, rows = this.rows;
+        // read phase
+        var scrollTop = this.scroller.scrollTop || 0;
+        var view = this.scroller.clientHeight || window.innerHeight || 0;
+        var offset = this.ul.getBoundingClientRect().top -
+            this.scroller.getBoundingClientRect().top + scrollTop;
+        var top = Math.max(0, scrollTop - offset);
+        var first = Math.max(0, Math.floor(top / h) - this.overscan);
+        var last = Math.min(rows.length, Math.ceil((top + view) / h) + this.overscan);
+        // write phase
+        var want = new Set(rows.slice(first, last));
+        var nodes = this.nodes, pool = this.pool;
+        nodes.forEach(function(li, row){
+            if(want.has(row)) return;
+            nodes.delete(row);
+            li.remove();
+            pool.push(li);
+        });
+        for(var i = first; i < last; i++){
+            var row = rows[i];
+            var li = nodes.get(row);
+            if(!li){
+                li = pool.pop() || document.createElement('li');
+                li.style.position = 'absolute';
+                li.style.left = '0';
+                li.style.right = '0';
+                li.style.height = h + 'px';
+                nodes.set(row, li);
+                this.renderRow(li, row);
+                this.ul.appendChild(li);
+            }else if(row.dirty){
+                this.renderRow(li, row);
+            }
+            row.dirty = false;
+            li.style.top = (i * h) + 'px';
+        }
+    };
+    VirtualSidebar.prototype.renderRow = function(li, row){
+        li.bs4dashRow = row;
+        while(li.firstChild) li.removeChild(li.firstChild);
+        if(row.kind === 'divider'){
+            li.className = 'nav-item bs4dash-virtual-divider';
+            var hr = document.createElement('hr');
+            hr.className = 'sidebar-divider mt-2 mb-2';
+            li.appendChild(hr);
+            return;
+        }
+        if(row.kind === 'header'){
+            li.className = 'nav-header';
+            li.textContent = row.text;
+            return;
+        }
+        var a = document.createElement('a');
+        if(row.kind === 'group'){
+            li.className = 'nav-item has-treeview' + (row.open ? ' menu-open' : '');
+            a.className = 'nav-link';
+            a.href = '#';
+            var p = document.createElement('p');
+            p.textContent = row.text;
+            a.appendChild(p);
+            li.appendChild(a);
+            return;
+        }
+        li.className = 'nav-item';
+        a.className = 'nav-link' + (row === this.active ? ' active' : '');
+        a.href = row.href;
+        if(row.depth) a.style.paddingLeft = '2rem';
+        if(row.icon) a.appendChild(iconNode(row.icon));
+        a.appendChild(document.createTextNode(row.text));
+        var badge = badgeParts(row.badge);
+        if(badge){
+            var span = document.createElement('span');
+            span.className = badge[1] + ' float-right';
+            span.textContent = badge[0];
+            a.appendChild(span);
+        }
+        li.appendChild(a);
+    };
+    VirtualSidebar.prototype.toggle = function(group){
+        group.open = !group.open;
+        group.dirty = true;
+        this.layout();
+    };
+    // Badges: [{href, badge}]; an empty badge removes it
+    VirtualSidebar.prototype.setBadges = function(badges){
+        var self = this;
+        badges.forEach(function(b){
+            var row = self.find(b.href || '#');
+            if(!row) return;
+            row.badge = (b.badge === '' || b.badge == null) ? null : b.badge;
+            row.dirty = true;
+        });
+        this.render();
+    };
+    // Mark the item for `target` (an href, or a selector naming one) active,
+    // opening its group; `quiet` leaves rendering to the caller
+    VirtualSidebar.prototype.setActive = function(target, quiet){
+        var m = /href=['"]?([^'"\]]+)/.exec(target);
+        var row = this.find(m ? m[1] : target);
+        if(!row) return;
+        if(this.active) this.active.dirty = true;
+        this.active = row;
+        row.dirty = true;
+        if(row.group && !row.group.open){
+            row.group.open = true;
+            row.group.dirty = true;
+            if(!quiet) this.layout();
+        }else if(!quiet){
+            this.render();
+        }
+    };
+    // Keyed ops on top-level items from the server's shadow state
+    VirtualSidebar.prototype.applyOps = function(ops){
+        var top = this.top;
+        function pos(key){
+            for(var i = 0; i < top.length; i++){
+                if(top[i].kind === 'item' && top[i].href === key) return i;
+            }
+            return -1;
+        }
+        ops.forEach(function(op){
+            var i = pos(op.key), row = i < 0 ? null : top[i];
+            if(op.op === 'remove'){
+                if(row) top.splice(i, 1);
+                return;
+            }
+            if(op.op === 'update'){
+                if(row){
+                    row.text = (op.item || {}).text || '';
+                    row.dirty = true;
                 }
-            }catch(e){console.error(e);}
+                return;
+            }
+            if(op.op === 'insert'){
+                row = virtualRow(op.item || {}, 0);
+            }else if(row){
+                top.splice(i, 1);
+            }
+            if(!row) return;
+            var at = (op.before !== null && op.before !== undefined) ? pos(op.before) : -1;
+            if(at < 0) top.push(row); else top.splice(at, 0, row);
         });
-
-        // Update nav items (replace) with optional badges: payload {nav_id: 'demo', items: [{title, href, badge}]}
-        Shiny.addCustomMessageHandler('bs4dash_update_nav_items', function(msg){
-            try{
-                var nav = document.getElementById(msg.nav_id);
-                if(!nav) return;
-                var items = msg.items || [];
-                var ul = nav.querySelector('ul');
-                if(!ul) return;
-                ul.innerHTML = '';
-                items.forEach(function(it){
-                    var li = document.createElement('li');
-                    li.className = 'nav-item';
-                    var a = document.createElement('a');
-                    a.className = 'nav-link';
-                    a.href = it.href || '#';
-                    a.textContent = it.title || '';
-                    if(it.badge){
-                        var span = document.createElement('span');
-                        span.className = 'badge badge-info float-right';
-                        span.textContent = it.badge;
-                        a.appendChild(span);
-                    }
-                    li.appendChild(a);
-                    ul.appendChild(li);
-                });
-            }catch(e){console.error(e);}
+        if(this.active && top.indexOf(this.active) < 0 && !this.active.group) this.active = null;
+        this.reindex();
+        this.layout();
+    };
+    // @end bundle
+    var virtual = null;
+    // The page's virtualized sidebar, or null
+    function virtualSidebar(){
+        if(virtual === null){
+            var el = document.querySelector ? document.querySelector('.main-sidebar [data-bs4dash-virtual]') : null;
+            // typeof: bundles built without virtual-sidebar lack the class
+            if(el && typeof VirtualSidebar === 'function') virtual = new VirtualSidebar(el);
+            else if(document.readyState !== 'loading') virtual = false;
+        }
+        return virtual || null;
+    }
+    // Lazy tabs (`tabs_shiny(lazy=True)`): panes marked `data-bs4dash-lazy`
+    // ("pending", "loading" or "loaded") start empty. The first time a
+    // pending pane becomes active it is reported on the `bs4dash_lazy_tab`
+    // input and the server sends its content; hiding a loaded pane is
+    // reported too, so the server can unload it. Panes are watched for their
+    // `active` class, whatever switches the tabs.
+    function reportPane(pane, event){
+        if(!window.Shiny || !Shiny.setInputValue) return;
+        var tabs = pane.closest('[data-bs4dash-lazy-tabs]');
+        Shiny.setInputValue('bs4dash_lazy_tab', {
+            tabs: tabs ? tabs.id : null,
+            key: tabs ? tabs.getAttribute('data-bs4dash-lazy-tabs') : null,
+            tab: pane.id, event: event
+        }, {priority: 'event'});
+    }
+    function lazyPaneChanged(pane){
+        var active = pane.classList.contains('active');
+        if(active === pane.bs4dashActive) return;
+        pane.bs4dashActive = active;
+        var state = pane.getAttribute('data-bs4dash-lazy');
+        if(active && state === 'pending'){
+            pane.setAttribute('data-bs4dash-lazy', 'loading');
+            reportPane(pane, 'activate');
+        }else if(!active && state !== 'pending'){
+            reportPane(pane, 'hide');
+        }
+    }
+    function watchLazyTabs(){
+        if(!window.MutationObserver || !document.querySelectorAll) return;
+        var panes = document.querySelectorAll('[data-bs4dash-lazy-tabs] [data-bs4dash-lazy]');
+        if(!panes.length) return;
+        var observer = new MutationObserver(function(records){
+            records.forEach(function(r){ lazyPaneChanged(r.target); });
         });
-
-        // Update tab content: payload {tab_id: 't1', content: '<p>…</p>'}
-        Shiny.addCustomMessageHandler('bs4dash_update_tab_content', function(msg){
-            try{
-                var el = document.getElementById(msg.tab_id);
-                if(!el) return;
-                el.innerHTML = msg.content || '';
-            }catch(e){console.error(e);}
+        Array.prototype.forEach.call(panes, function(pane){
+            pane.bs4dashActive = pane.classList.contains('active');
+            observer.observe(pane, {attributes: true, attributeFilter: ['class']});
         });
-
-        // Pushmenu toggle: click handler toggles `sidebar-collapse` on <body>
+    }
+    // Lazy boxes (`box_shiny(lazy=True)`): bodies marked `data-bs4dash-defer`
+    // show a skeleton until they near the viewport. The ids of all boxes seen
+    // so far are reported on the `bs4dash_lazy_box` input; the list is
+    // cumulative, so no report is lost when input values coalesce, and it is
+    // sent again once Shiny connects.
+    var seenBoxes = [], seenBoxKeys = [];
+    function sendBoxes(){
+        if(!seenBoxes.length || !window.Shiny || !Shiny.setInputValue) return;
+        Shiny.setInputValue('bs4dash_lazy_box',
+            {boxes: seenBoxes.slice(), keys: seenBoxKeys.slice()});
+    }
+    function reportBoxes(bodies){
+        bodies.forEach(function(body){
+            if(body.getAttribute('data-bs4dash-defer') !== 'pending') return;
+            body.setAttribute('data-bs4dash-defer', 'loading');
+            seenBoxes.push(body.getAttribute('data-bs4dash-box'));
+            seenBoxKeys.push(body.getAttribute('data-bs4dash-box-key'));
+        });
+        sendBoxes();
+    }
+    function watchLazyBoxes(){
+        if(!document.querySelectorAll) return;
+        var bodies = Array.prototype.slice.call(
+            document.querySelectorAll('[data-bs4dash-defer="pending"]'));
+        if(!bodies.length) return;
+        if(window.jQuery) jQuery(document).on('shiny:connected', sendBoxes);
+        if(!window.IntersectionObserver){
+            reportBoxes(bodies);
+            return;
+        }
+        var observer = new IntersectionObserver(function(entries){
+            var near = [];
+            entries.forEach(function(e){
+                if(!e.isIntersecting) return;
+                observer.unobserve(e.target);
+                near.push(e.target);
+            });
+            if(near.length) reportBoxes(near);
+        }, {rootMargin: '200px 0px'});
+        bodies.forEach(function(body){ observer.observe(body); });
+    }
+    // Visibility of tab panes, cards and the controlbar that have an id,
+    // published on the `bs4dash_visible` input as {id: true|false}: a pane
+    // is shown when active, a card when not collapsed, the controlbar when
+    // open, each only if the containers around it are shown too. Changes are
+    // picked up from class mutations, once per frame, and Shiny is asked to
+    // recheck which outputs are hidden in the containers that changed.
+    var CONTAINERS = '.tab-pane, .card, .control-sidebar';
+    var visibleSent = null, visibilityFrame = null;
+    function ownVisible(el){
+        var cl = el.classList;
+        if(cl.contains('tab-pane')) return cl.contains('active');
+        if(cl.contains('card')) return !cl.contains('collapsed-card');
+        if(cl.contains('control-sidebar')){
+            var body = document.body.classList;
+            return body.contains('control-sidebar-open') || body.contains('control-sidebar-slide-open');
+        }
+        return true;
+    }
+    function containerVisible(el){
+        for(var c = el; c; c = c.parentElement ? c.parentElement.closest(CONTAINERS) : null){
+            if(!ownVisible(c)) return false;
+        }
+        return true;
+    }
+    function publishVisibility(){
+        visibilityFrame = null;
+        var map = {}, changed = [];
+        var els = document.querySelectorAll('.tab-pane[id], .card[id], .control-sidebar[id]');
+        Array.prototype.forEach.call(els, function(el){
+            var visible = containerVisible(el);
+            map[el.id] = visible;
+            if(visibleSent && visibleSent[el.id] !== visible) changed.push([el, visible]);
+        });
+        var same = visibleSent && Object.keys(map).length === Object.keys(visibleSent).length &&
+            !changed.length;
+        visibleSent = map;
+        if(window.jQuery){
+            changed.forEach(function(c){ jQuery(c[0]).trigger(c[1] ? 'shown' : 'hidden'); });
+        }
+        if(!same) sendVisibility();
+    }
+    function sendVisibility(){
+        if(visibleSent && window.Shiny && Shiny.setInputValue){
+            Shiny.setInputValue('bs4dash_visible', visibleSent);
+        }
+    }
+    function scheduleVisibility(){
+        if(visibilityFrame !== null) return;
+        visibilityFrame = (window.requestAnimationFrame && !document.hidden)
+            ? requestAnimationFrame(publishVisibility) : setTimeout(publishVisibility, 0);
+    }
+    function watchVisibility(){
+        if(!window.MutationObserver || !document.querySelectorAll || !document.body) return;
+        var observer = new MutationObserver(function(records){
+            for(var i = 0; i < records.length; i++){
+                var t = records[i].target;
+                if(t === document.body || (t.matches && t.matches(CONTAINERS))){
+                    scheduleVisibility();
+                    return;
+                }
+            }
+        });
+        observer.observe(document.body, {attributes: true, attributeFilter: ['class'], subtree: true});
+        if(window.jQuery) jQuery(document).on('shiny:connected', sendVisibility);
+        publishVisibility();
+    }
+    // Page visibility, reported on the `bs4dash_page_visibility` input so
+    // the server can hold messages while the page is in the background
+    function sendPageVisibility(){
+        if(window.Shiny && Shiny.setInputValue){
+            Shiny.setInputValue('bs4dash_page_visibility', document.visibilityState || 'visible');
+        }
+    }
+    function watchPageVisibility(){
+        document.addEventListener('visibilitychange', sendPageVisibility);
+        if(window.jQuery) jQuery(document).on('shiny:connected', sendPageVisibility);
+        sendPageVisibility();
+    }
+    // Replace a pane's content, unbinding the Shiny inputs and outputs it
+    // held and binding those it now holds. HTML dependencies of the content
+    // (`deps`, as rendered by Shiny) are loaded before it is inserted.
+    function setPaneContent(el, html, deps){
+        var seq = el.bs4dashContentSeq = (el.bs4dashContentSeq || 0) + 1;
+        var load = window.Shiny && (Shiny.renderDependenciesAsync || Shiny.renderDependencies);
+        if(!deps || !deps.length || !load){
+            replacePaneContent(el, html);
+            return;
+        }
+        Promise.resolve().then(function(){ return load(deps); }).catch(function(e){
+            console.error(e);
+        }).then(function(){
+            // superseded while the dependencies loaded
+            if(el.bs4dashContentSeq === seq) replacePaneContent(el, html);
+        });
+    }
+    function replacePaneContent(el, html){
+        try{ if(window.Shiny && Shiny.unbindAll) Shiny.unbindAll(el); }catch(e){ console.error(e); }
+        el.innerHTML = html;
+        try{ if(window.Shiny && Shiny.bindAll) Shiny.bindAll(el); }catch(e){ console.error(e); }
+        // the content may hold containers to report visibility for
+        if(visibleSent) scheduleVisibility();
+    }
+    // Pushmenu and controlbar toggles: clicks toggle classes on <body>.
+    // Bound once the document is parsed, as the script may load in <head>.
+    function bindToggles(){
         try{
             var pm = document.getElementById('pushmenu-toggle');
             if(pm){
@@ -162,8 +803,6 @@
                 });
             }
         }catch(e){console.error(e);}
-
-        // Controlbar toggle click handler: toggle control sidebar visibility
         try{
             var cb = document.getElementById('controlbar-toggle');
             if(cb){
@@ -174,4 +813,363 @@
             }
         }catch(e){console.error(e);}
     }
+    function ready(){
+        bindToggles();
+        virtualSidebar();
+        watchLazyTabs();
+        watchLazyBoxes();
+        watchVisibility();
+        watchPageVisibility();
+    }
+    if(document.readyState === 'loading'){
+        document.addEventListener('DOMContentLoaded', ready);
+    }else{
+        ready();
+    }
+    // Handlers by message name: {read(msg) -> ctx, write(msg, ctx)}
+    var handlers = {};
+    function now(){
+        return (window.performance && performance.now) ? performance.now() : Date.now();
+    }
+    // Ack mode: messages carrying a sequence id (`_seq`) are acknowledged
+    // once applied. Acks are cumulative, so only the latest one matters.
+    // Acks go to the session's ack route when the server sent one: an input
+    // would wait for the server's reactive flush, which an effect awaiting
+    // the ack holds up.
+    var ackUrl = null;
+    function acked(seq, started){
+        if(seq === null) return;
+        var ms = now() - started;
+        if(ackUrl && window.fetch){
+            fetch(ackUrl + (ackUrl.indexOf('?') < 0 ? '?' : '&') + 'seq=' + seq +
+                '&apply_ms=' + ms.toFixed(2), {cache: 'no-store'}).catch(function(){});
+            return;
+        }
+        if(!Shiny.setInputValue) return;
+        Shiny.setInputValue('bs4dash_ack', {seq: seq, apply_ms: ms}, {priority: 'event'});
+    }
+    // Target a message updates, mirroring the server's coalescing keys: a
+    // queued message is superseded by a later one for the same target.
+    // `null` means the message is never collapsed (toggle, patches).
+    function collapseKey(name, msg){
+        switch(name){
+            case 'bs4dash_update_sidebar':
+            case 'bs4dash_update_sidebar_virtual':
+            case 'bs4dash_update_sidebar_active':
+            case 'bs4dash_update_sidebar_badges':
+                return name;
+            case 'bs4dash_update_navs':
+            case 'bs4dash_update_nav_items':
+                return name + '|' + msg.nav_id;
+            case 'bs4dash_update_tab_content':
+            case 'bs4dash_unload_tab':
+                return name + '|' + msg.tab_id;
+            case 'bs4dash_controlbar':
+                return (msg.action === 'show' || msg.action === 'hide') ? name : null;
+        }
+        return null;
+    }
+    // Targets a never-collapsed message acts on: a queued update for one of
+    // them stays before it, so a later update for that target is queued
+    // after it instead of collapsing into the earlier slot.
+    var SIDEBAR_KEYS = ['bs4dash_update_sidebar', 'bs4dash_update_sidebar_virtual',
+        'bs4dash_update_sidebar_active', 'bs4dash_update_sidebar_badges'];
+    function barrierKeys(name, msg){
+        switch(name){
+            case 'bs4dash_controlbar':
+                return [name];
+            case 'bs4dash_patch_sidebar':
+                return SIDEBAR_KEYS;
+            case 'bs4dash_patch_nav_items':
+                return ['bs4dash_update_navs|' + msg.nav_id,
+                    'bs4dash_update_nav_items|' + msg.nav_id];
+        }
+        return [];
+    }
+    function mergeBadges(older, newer){
+        var merged = new Map();
+        (older || []).concat(newer || []).forEach(function(b){
+            merged.delete(b.href);
+            merged.set(b.href, b);
+        });
+        return Array.from(merged.values());
+    }
+    // Frame scheduling: messages are queued as they arrive and applied
+    // together once per animation frame. All handlers first run their read
+    // phase (container lookups), then their write phase (DOM mutations), so
+    // a burst of messages costs one style/layout pass.
+    // barriers: number of queued never-collapsed messages, by target key
+    var queue = [], queued = new Map(), barriers = {}, ackSeq = null;
+    var frame = null, frameIsRaf = false;
+    function schedule(){
+        if(frame !== null) return;
+        if(window.requestAnimationFrame && !document.hidden){
+            frameIsRaf = true;
+            frame = requestAnimationFrame(flush);
+        }else{
+            // hidden pages get no frames; apply without waiting for one
+            frameIsRaf = false;
+            frame = setTimeout(flush, 0);
+        }
+    }
+    function enqueue(name, msg){
+        msg = msg || {};
+        if(msg._seq != null) ackSeq = msg._seq;
+        if(name === 'bs4dash_batch'){
+            (msg.messages || []).forEach(function(m){
+                if(m) enqueue(m.type, m.data);
+            });
+            return;
+        }
+        var h = handlers[name];
+        if(!h) return;
+        if(h.prepare){
+            // runs in arrival order, e.g. to keep the content cache in step
+            msg = h.prepare(msg);
+            if(!msg) return;
+        }
+        var key = collapseKey(name, msg);
+        if(key === null){
+            barrierKeys(name, msg).forEach(function(k){
+                barriers[k] = (barriers[k] || 0) + 1;
+            });
+        }
+        var count = key === null ? 0 : (barriers[key] || 0);
+        var prev = key === null ? null : queued.get(key);
+        if(prev){
+            if(name === 'bs4dash_update_sidebar_badges'){
+                msg = {badges: mergeBadges(prev.msg.badges, msg.badges)};
+            }
+            if(prev.count === count){
+                // updated in place, keeping its order relative to the others
+                prev.msg = msg;
+                schedule();
+                return;
+            }
+            // e.g. show, toggle, hide, or update, patch, update: the
+            // later update must stay after the message in between
+            prev.dropped = true;
+        }
+        var entry = {name: name, msg: msg, dropped: false, count: count};
+        queue.push(entry);
+        if(key !== null) queued.set(key, entry);
+        schedule();
+    }
+    function flush(){
+        frame = null;
+        var started = now();
+        var entries = queue.filter(function(e){ return !e.dropped; });
+        var seq = ackSeq;
+        queue = [];
+        queued = new Map();
+        barriers = {};
+        ackSeq = null;
+        var contexts = entries.map(function(e){
+            var h = handlers[e.name];
+            try{ return h.read ? h.read(e.msg) : null; }
+            catch(err){ console.error(err); return null; }
+        });
+        entries.forEach(function(e, i){
+            var h = handlers[e.name], ctx = contexts[i];
+            try{
+                // an earlier write may have created or replaced the target
+                if(h.read && !(ctx && ctx.isConnected !== false)) ctx = h.read(e.msg);
+                h.write(e.msg, ctx);
+            }catch(err){ console.error(err); }
+        });
+        acked(seq, started);
+    }
+    document.addEventListener('visibilitychange', function(){
+        // a frame requested before the page was hidden won't run until shown
+        if(document.hidden && frame !== null && frameIsRaf){
+            cancelAnimationFrame(frame);
+            frame = null;
+            schedule();
+        }
+    });
+    function register(name, write, read, prepare){
+        handlers[name] = {write: write, read: read, prepare: prepare};
+        Shiny.addCustomMessageHandler(name, function(msg){ enqueue(name, msg); });
+    }
+    function sidebarNav(){
+        return document.querySelector('.main-sidebar .nav');
+    }
+    function navList(msg){
+        var nav = document.getElementById(msg.nav_id);
+        return nav ? nav.querySelector('ul') : null;
+    }
+    if(window.Shiny && Shiny.addCustomMessageHandler){
+        // @bundle controlbar
+        register('bs4dash_controlbar', handle);
+        // @end bundle
+
+        // Queued messages shipped together: payload {messages: [{type, data}]}
+        Shiny.addCustomMessageHandler('bs4dash_batch', function(msg){
+            enqueue('bs4dash_batch', msg);
+        });
+
+        // Where to report acks: payload {url: 'session/.../dynamic_route/...'}
+        register('bs4dash_ack_route', function(msg){
+            ackUrl = msg.url || null;
+        });
+
+        // @bundle sidebar
+        // Update sidebar menu: payload {items: [{text: 'Home', href: '#'}]}
+        register('bs4dash_update_sidebar', function(msg, nav){
+            var vs = virtualSidebar();
+            if(vs){ vs.setMenu({menu: msg.items || []}, true); return; }
+            if(!nav) return;
+            reconcile(nav, msg.items || [], sidebarItem, renderSidebarItem);
+            invalidateLinks();
+        }, sidebarNav);
+
+        // Patch sidebar menu: payload {ops: [{op, key, item, before}]}
+        register('bs4dash_patch_sidebar', function(msg, nav){
+            var vs = virtualSidebar();
+            if(vs){ vs.applyOps(msg.ops || []); return; }
+            if(!nav) return;
+            applyOps(nav, msg.ops || [], sidebarItem, renderSidebarItem);
+            invalidateLinks();
+        }, sidebarNav);
+        // @end bundle
+
+        // @bundle virtual-sidebar
+        // Replace a virtualized sidebar's menu: payload {menu: [compact entries], active}
+        register('bs4dash_update_sidebar_virtual', function(msg){
+            var vs = virtualSidebar();
+            if(vs) vs.setMenu(msg);
+        });
+        // @end bundle
+
+        // @bundle navs
+        // Update nav tabs: payload {nav_id: 'some-id', tabs: [{id, title, href, active}]}
+        register('bs4dash_update_navs', function(msg, ul){
+            if(!ul) return;
+            reconcile(ul, msg.tabs || [], navTab, renderNavTab);
+        }, navList);
+        // @end bundle
+
+        // @bundle sidebar
+        // Update sidebar badges: payload {badges: [{href: '#about', badge: '3'}]}
+        register('bs4dash_update_sidebar_badges', function(msg, nav){
+            var vs = virtualSidebar();
+            if(vs){ vs.setBadges(msg.badges || []); return; }
+            if(!nav) return;
+            var find = linkFinder(nav);
+            (msg.badges || []).forEach(function(b){
+                var a = find(b.href || '#');
+                if(!a) return;
+                // find existing badge
+                var existing = a.querySelector('.badge');
+                if(b.badge === null || b.badge === undefined || b.badge === ''){
+                    if(existing) existing.remove();
+                    return;
+                }
+                if(!existing){
+                    var span = document.createElement('span');
+                    span.className = 'badge badge-info float-right';
+                    span.textContent = b.badge;
+                    a.appendChild(span);
+                } else {
+                    existing.textContent = b.badge;
+                }
+            });
+        }, sidebarNav);
+
+        // Update active sidebar link: payload {target: '#about' or selector}
+        register('bs4dash_update_sidebar_active', function(msg, nav){
+            var target = msg.target || null;
+            var vs = virtualSidebar();
+            if(target && vs){ vs.setActive(target); return; }
+            if(!target || !nav) return;
+            var find = linkFinder(nav);
+            // Remove the active classes still set on known active links
+            activeLinks.forEach(function(link){
+                if(link.classList.contains('active') && link.classList.contains('nav-link') &&
+                    nav.contains(link)) link.classList.remove('active');
+            });
+            activeLinks.clear();
+
+            // Determine target anchor
+            var a = null;
+            try{
+                if(target.indexOf('a.') === 0 || target.indexOf('#') === 0 || target.indexOf('.') === 0){
+                    // treat as selector
+                    a = nav.querySelector(target);
+                }
+            }catch(e){ a = null; }
+            if(!a){
+                // treat as href
+                a = find(target);
+            }
+            if(a){
+                a.classList.add('active');
+                activeLinks.add(a);
+                // Ensure parent list item gets focus/aria if needed
+                var li = a.closest('li');
+                if(li) li.classList.add('menu-open');
+            }
+        }, sidebarNav);
+        // @end bundle
+
+        // @bundle navs
+        // Update nav items (replace) with optional badges: payload {nav_id: 'demo', items: [{title, href, badge}]}
+        register('bs4dash_update_nav_items', function(msg, ul){
+            if(!ul) return;
+            reconcile(ul, msg.items || [], navItem, renderNavItem);
+        }, navList);
+
+        // Patch nav items: payload {nav_id: 'demo', ops: [{op, key, item, before}]}
+        register('bs4dash_patch_nav_items', function(msg, ul){
+            if(!ul) return;
+            applyOps(ul, msg.ops || [], navItem, renderNavItem);
+        }, navList);
+        // @end bundle
+
+        // @bundle content
+        // Update tab content (or a box body): payload {tab_id: 't1', content: '<p>…</p>'},
+        // plus {deps: [...]} when the content needs HTML dependencies.
+        // With the content cache, full payloads also carry {hash, cache}
+        // and repeated content arrives as {tab_id, hash} only; the cache is
+        // updated on arrival so it stays in step with the server's mirror
+        // even when the message is superseded before it is applied.
+        register('bs4dash_update_tab_content', function(msg, el){
+            if(!el) return;
+            setPaneContent(el, msg.content || '', msg.deps);
+            if(el.hasAttribute('data-bs4dash-lazy')) el.setAttribute('data-bs4dash-lazy', 'loaded');
+            if(el.hasAttribute('data-bs4dash-defer')){
+                el.setAttribute('data-bs4dash-defer', 'loaded');
+                el.removeAttribute('aria-busy');
+            }
+        }, function(msg){
+            return document.getElementById(msg.tab_id);
+        }, function(msg){
+            if(!msg.hash) return msg;
+            if(msg.content != null){
+                fragments.put(msg.hash, msg.content, msg.cache);
+                return msg;
+            }
+            var content = fragments.get(msg.hash);
+            if(content == null){
+                reportMiss(msg.tab_id, msg.hash);
+                return null;
+            }
+            return {tab_id: msg.tab_id, content: content};
+        });
+
+        // Unload a lazy tab pane: payload {tab_id: 't1'}. A pane shown again
+        // before the unload arrived is reported for loading right away.
+        register('bs4dash_unload_tab', function(msg, el){
+            if(!el || !el.hasAttribute('data-bs4dash-lazy')) return;
+            setPaneContent(el, '');
+            el.setAttribute('data-bs4dash-lazy', 'pending');
+            if(el.classList.contains('active')){
+                el.setAttribute('data-bs4dash-lazy', 'loading');
+                reportPane(el, 'activate');
+            }
+        }, function(msg){
+            return document.getElementById(msg.tab_id);
+        });
+        // @end bundle
+    }
 })();
@@ -0,0 +1,105 @@
+"""Hold helper messages while the client's page is hidden.
+
+The client asset reports `document.visibilityState` through the
+`bs4dash_page_visibility` input. With background hold enabled for a
+session, helper messages sent while the page is hidden are not sent:
+they are kept in a buffer holding the latest message per target (badge
+updates are merged per href, controlbar toggles are kept in order). When
+the page becomes visible again, the buffer is sent as one `bs4dash_batch`
+snapshot.
+
+    from bs4dash_py import enable_background_hold
+
+    def server(input, output, session):
+        enable_background_hold(session)
+"""
+
+from typing import Any
+
+from . import server
+
+# Input the client reports `document.visibilityState` on
+PAGE_VISIBILITY_INPUT = "bs4dash_page_visibility"
+
+
+def set_page_visible(session: Any, visible: bool) -> bool:
+    """Record whether the client's page is visible.
+
+    Hiding starts buffering; showing sends the buffer as one snapshot.
+    Returns the result of that send (True when nothing was held).
+    """
+    state = server._session_state(session)
+    with state.lock:
+        if not state.background_hold:
+            return True
+        if not visible:
+            if state.hidden is None:
+                state.hidden = server._Batch()
+            return True
+        buffer, state.hidden = state.hidden, None
+    if buffer is None:
+        return True
+    messages = buffer.messages()
+    if not messages:
+        return True
+    if len(messages) == 1:
+        message = messages[0]["type"], messages[0]["data"]
+    else:
+        message = server.BATCH_MESSAGE, {"messages": messages}
+    return server._deliver(session, *message, state)
+
+
+def page_hidden(session: Any) -> bool:
+    """Return True while messages to `session` are held for a hidden page."""
+    return server._session_state(session).hidden is not None
+
+
+def held_messages(session: Any) -> int:
+    """Return the number of messages held for `session` (after coalescing)."""
+    buffer = server._session_state(session).hidden
+    return 0 if buffer is None else len(buffer.entries)
+
+
+def enable_background_hold(session: Any) -> None:
+    """Hold messages to `session` while its page is hidden.
+
+    Call it from the server function: the page visibility input is observed
+    with a Shiny reactive effect. Without Shiny, report visibility changes
+    with `set_page_visible`.
+    """
+    state = server._session_state(session)
+    with state.lock:
+        if state.background_hold:
+            return
+        state.background_hold = True
+    _observe_input(session)
+
+
+def _observe_input(session: Any) -> None:
+    root = getattr(session, "_root_session", session)
+    inputs = getattr(root, "input", None)
+    if inputs is None:
+        return
+    try:
+        from shiny import reactive
+    except Exception:
+        return
+    try:
+
+        @reactive.effect
+        @reactive.event(inputs[PAGE_VISIBILITY_INPUT])
+        def _page_visibility():
+            set_page_visible(session, inputs[PAGE_VISIBILITY_INPUT]() != "hidden")
+
+    except Exception:
+        # not in a session context: visibility must go through set_page_visible
+        pass
+
+
+def disable_background_hold(session: Any) -> bool:
+    """Stop holding messages for `session`, sending any held ones now."""
+    state = server._session_state(session)
+    result = set_page_visible(session, True)
+    with state.lock:
+        state.background_hold = False
+    return result
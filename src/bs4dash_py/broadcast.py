@@ -0,0 +1,177 @@
+"""Fan out one helper update to many sessions.
+
+Sessions are registered with `register_session` (typically from the server
+function) and optionally grouped (e.g., per wallboard). A broadcast builds
+the message once by running a server helper against a recorder and delivers
+it to every target session concurrently:
+
+    from bs4dash_py import broadcast, register_session, update_sidebar_badges
+
+    def server(input, output, session):
+        register_session(session, group="wallboard")
+
+    # elsewhere, e.g. in a worker thread
+    result = broadcast(update_sidebar_badges, badges, group="wallboard")
+    # -> {"delivered": 398, "failed": 2, "errors": [(session, exc), ...]}
+
+Each session's delivery is isolated: a failing or slow session (see
+`timeout`) is counted in `failed` without affecting the others. Deliveries
+run on each session's own event loop and go through the session's send
+pipeline like the awaitable helpers: hidden-page holds, rate limits, open
+batches, shadow state and the content cache all apply, so an update pending
+for the same target is replaced instead of overwriting the broadcast later.
+"""
+
+import asyncio
+import inspect
+import threading
+import weakref
+from typing import Any, Callable, Iterable, Optional
+
+from . import server
+
+_registry_lock = threading.Lock()
+# group -> WeakSet of sessions; every session is also in group None
+_groups: dict = {}
+# session -> loop the session runs on (None when registered off-loop)
+_loops: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+
+
+def register_session(session: Any, group: Optional[str] = None) -> None:
+    """Register `session` for broadcasts, optionally in a named `group`.
+
+    Call it from the server function so the session's event loop is known.
+    Sessions are held weakly and unregistered when they end (if the session
+    supports `on_ended`).
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    with _registry_lock:
+        _groups.setdefault(None, weakref.WeakSet()).add(session)
+        if group is not None:
+            _groups.setdefault(group, weakref.WeakSet()).add(session)
+        _loops[session] = loop
+    on_ended = getattr(session, "on_ended", None)
+    if callable(on_ended):
+        try:
+            on_ended(lambda: unregister_session(session))
+        except Exception:
+            pass
+
+
+def unregister_session(session: Any) -> None:
+    """Remove `session` from every broadcast group."""
+    with _registry_lock:
+        for members in _groups.values():
+            members.discard(session)
+        _loops.pop(session, None)
+
+
+def registered_sessions(group: Optional[str] = None) -> list:
+    """Return the registered sessions (all of them, or those in `group`)."""
+    with _registry_lock:
+        return list(_groups.get(group, ()))
+
+
+def _capture(helper: Callable, *args) -> tuple:
+    """Return the (name, payload) `helper(session, *args)` would send."""
+    if inspect.iscoroutinefunction(helper):
+        raise TypeError(
+            "broadcast() takes a sync helper (e.g., update_sidebar_badges), "
+            f"not {getattr(helper, '__name__', helper)!r}"
+        )
+    recorder = server._Capture()
+    helper(recorder, *args)
+    if len(recorder.messages) != 1:
+        raise ValueError(f"{helper!r} did not send exactly one message")
+    return recorder.messages[0]
+
+
+async def _deliver_one(session: Any, name: str, payload: dict) -> bool:
+    """Send through the session's own pipeline (hold, limits, batch, caches).
+
+    A held, rate-limited or batched update for the same target is replaced
+    rather than sent after the broadcast and overwriting it.
+    """
+    return await server._asend_custom_message(session, name, payload)
+
+
+async def abroadcast_message(
+    name: str,
+    payload: dict,
+    sessions: Optional[Iterable] = None,
+    group: Optional[str] = None,
+    timeout: Optional[float] = None,
+    concurrency: int = 100,
+) -> dict:
+    """Send one custom message to many sessions concurrently.
+
+    - sessions: explicit sessions (default: the registered ones in `group`)
+    - timeout: seconds allowed per session before it counts as failed
+    - concurrency: maximum number of deliveries in flight
+
+    Returns {"delivered": int, "failed": int, "errors": [(session, exc)]}.
+    """
+    targets = list(sessions) if sessions is not None else registered_sessions(group)
+    here = asyncio.get_running_loop()
+    limit = asyncio.Semaphore(max(1, concurrency))
+    result = {"delivered": 0, "failed": 0, "errors": []}
+
+    async def one(session):
+        loop = _loops.get(session)
+        async with limit:
+            # scheduled only once a slot is free, so `concurrency` and the
+            # timeout also hold for sessions on other loops
+            coro = _deliver_one(session, name, payload)
+            if loop is not None and loop is not here and loop.is_running():
+                future = asyncio.run_coroutine_threadsafe(coro, loop)
+                coro = asyncio.wrap_future(future)
+            try:
+                ok = await asyncio.wait_for(coro, timeout)
+            except Exception as e:
+                result["failed"] += 1
+                result["errors"].append((session, e))
+                return
+        if ok:
+            result["delivered"] += 1
+        else:
+            result["failed"] += 1
+            result["errors"].append((session, RuntimeError("no send method")))
+
+    await asyncio.gather(*(one(s) for s in targets))
+    return result
+
+
+async def abroadcast(helper: Callable, *args, **options) -> dict:
+    """Broadcast what `helper(session, *args)` sends to many sessions.
+
+    `helper` is a sync server helper such as `update_sidebar_badges`; the
+    keyword options are those of `abroadcast_message`.
+
+    Example:
+        await abroadcast(update_tab_content, "kpi", html, group="wallboard")
+    """
+    name, payload = _capture(helper, *args)
+    return await abroadcast_message(name, payload, **options)
+
+
+def broadcast(helper: Callable, *args, **options) -> dict:
+    """Blocking counterpart of `abroadcast`, for threads without a running loop.
+
+    Waits until every session's delivery completed or failed and returns
+    {"delivered": int, "failed": int, "errors": [(session, exc)]}. From a
+    coroutine or a running loop's thread, use `await abroadcast(...)`.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        raise RuntimeError(
+            "broadcast() would block the running event loop; "
+            "use `await abroadcast(...)` instead"
+        )
+    name, payload = _capture(helper, *args)
+    return server._run_on_shared_loop(abroadcast_message(name, payload, **options))
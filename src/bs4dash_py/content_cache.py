@@ -0,0 +1,164 @@
+"""Content-addressed client cache for `update_tab_content`.
+
+Dashboards that flip between a few report variants resend the same HTML
+over and over. With the content cache enabled for a session, tab content is
+hashed and the client asset keeps a bounded LRU of recently received
+fragments keyed by hash. The server mirrors that LRU, so when the client
+already holds a fragment only its hash is sent:
+
+- full:   {"tab_id": "t1", "content": "<p>…</p>", "hash": "…", "cache": 32}
+- cached: {"tab_id": "t1", "hash": "…"}
+
+If the client misses anyway (e.g., a message was lost), it reports the miss
+through the `bs4dash_cache_miss` input and the server resends the content in
+full. Content smaller than `min_bytes` is always sent as-is.
+
+    from bs4dash_py import enable_content_cache
+
+    def server(input, output, session):
+        enable_content_cache(session, size=32)
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+from . import server
+
+# Input the client reports cache misses on
+MISS_INPUT = "bs4dash_cache_miss"
+
+TAB_CONTENT = "bs4dash_update_tab_content"
+
+
+def content_hash(content: str) -> str:
+    """Return the hash identifying `content` in the client cache."""
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=10).hexdigest()
+
+
+class ContentCache:
+    """Server-side mirror of one client's fragment LRU.
+
+    - size: number of fragments the client keeps
+    - min_bytes: content shorter than this is sent without caching
+    """
+
+    def __init__(self, size: int = 32, min_bytes: int = 256):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.size = size
+        self.min_bytes = min_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget what the client holds, so the next contents are sent in full."""
+        with self.lock:
+            self.fragments: "OrderedDict[str, str]" = OrderedDict()
+            self.latest: dict = {}
+
+    def reduce(self, name: str, payload: dict):
+        """Return the (name, payload) to send for a tab content message."""
+        if name != TAB_CONTENT:
+            return name, payload
+        content = payload.get("content")
+        if not isinstance(content, str) or len(content) < self.min_bytes:
+            return name, payload
+        if payload.get("deps"):
+            # sent in full, so the client loads the dependencies with it
+            return name, payload
+        digest = content_hash(content)
+        tab_id = payload.get("tab_id")
+        with self.lock:
+            self.latest[tab_id] = digest
+            if digest in self.fragments:
+                # the client moves it to the most recent end too
+                self.fragments.move_to_end(digest)
+                self.hits += 1
+                return name, {"tab_id": tab_id, "hash": digest}
+            self.fragments[digest] = content
+            while len(self.fragments) > self.size:
+                self.fragments.popitem(last=False)
+        return name, dict(payload, hash=digest, cache=self.size)
+
+    def take_miss(self, tab_id: Any, digest: str) -> Optional[str]:
+        """Handle a client miss; return the content to resend, if still current.
+
+        Content is only resent when `digest` is still the latest content sent
+        to `tab_id`, so a late miss can't overwrite a newer update.
+        """
+        with self.lock:
+            self.misses += 1
+            content = self.fragments.pop(digest, None)
+            if content is None or self.latest.get(tab_id) != digest:
+                return None
+            return content
+
+
+def _resend_misses(session: Any, cache: ContentCache, report: Any) -> None:
+    """Resend the content for each miss in a `bs4dash_cache_miss` report."""
+    misses = report.get("misses", []) if isinstance(report, dict) else []
+    for miss in misses:
+        if not isinstance(miss, dict):
+            continue
+        content = cache.take_miss(miss.get("tab_id"), miss.get("hash"))
+        if content is not None:
+            server.update_tab_content(session, miss.get("tab_id"), content)
+
+
+def enable_content_cache(
+    session: Any, size: int = 32, min_bytes: int = 256
+) -> ContentCache:
+    """Send tab content the client already holds as a hash.
+
+    Call it from the server function: cache misses are observed with a Shiny
+    reactive effect on the `bs4dash_cache_miss` input. Without Shiny, pass
+    miss reports to `handle_cache_miss`.
+
+    - size: fragments kept by the client's LRU
+    - min_bytes: content shorter than this is always sent in full
+    """
+    state = server._session_state(session)
+    with state.lock:
+        cache = state.content_cache
+        if cache is not None:
+            return cache
+        cache = state.content_cache = ContentCache(size=size, min_bytes=min_bytes)
+    _observe_misses(session, cache)
+    return cache
+
+
+def _observe_misses(session: Any, cache: ContentCache) -> None:
+    root = getattr(session, "_root_session", session)
+    inputs = getattr(root, "input", None)
+    if inputs is None:
+        return
+    try:
+        from shiny import reactive
+    except Exception:
+        return
+    try:
+
+        @reactive.effect
+        @reactive.event(inputs[MISS_INPUT], ignore_init=True)
+        def _resend():
+            _resend_misses(session, cache, inputs[MISS_INPUT]())
+
+    except Exception:
+        # not in a session context: misses must go through handle_cache_miss
+        pass
+
+
+def handle_cache_miss(session: Any, report: Any) -> None:
+    """Resend content the client reported missing: {"misses": [{tab_id, hash}]}."""
+    cache = server._session_state(session).content_cache
+    if cache is not None:
+        _resend_misses(session, cache, report)
+
+
+def disable_content_cache(session: Any) -> None:
+    """Send tab content in full again for `session`."""
+    server._session_state(session).content_cache = None
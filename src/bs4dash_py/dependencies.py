@@ -0,0 +1,283 @@
+"""Client assets (`bs4dash_controlbar.js`, `bs4dash_styles.css`) as an HTML dependency.
+
+The assets are read once per process and registered as one htmltools
+`HTMLDependency` whose version carries a hash of their contents, so Shiny
+serves them from a content-addressed URL like
+`lib/bs4dash-py-0.0.1+3f2a9c1e07b4/bs4dash_controlbar.js`. A changed asset
+gets a new URL, so the URLs can be cached by browsers indefinitely; wrap the
+app with `with_asset_cache` to send long-lived `Cache-Control` headers for
+them and `Link` preload headers with HTML pages.
+
+When `scripts/build_assets.py` has been run (packaging does), the minified
+bundles it writes are served instead of the sources, and `with_asset_cache`
+answers asset requests with the precompressed `.br` or `.gz` variant the
+client accepts. `build.json` records a hash of each source; a bundle whose
+source has changed since is ignored.
+
+    from shiny import App
+    from bs4dash_py import with_asset_cache
+
+    app = with_asset_cache(App(app_ui, server))
+"""
+
+import functools
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+from . import __version__
+
+ASSETS_DIR = Path(__file__).parent / "assets"
+
+SCRIPT = "bs4dash_controlbar.js"
+STYLESHEET = "bs4dash_styles.css"
+
+DEPENDENCY_NAME = "bs4dash-py"
+
+# Written by scripts/build_assets.py next to the assets
+MANIFEST = "build.json"
+
+# Written by scripts/vendor_assets.py: AdminLTE, Bootstrap and Font Awesome
+VENDOR_DIR = ASSETS_DIR / "vendor"
+VENDOR_MANIFEST = "vendor.json"
+VENDOR_NAME = "bs4dash-vendor"
+
+# Content-Encoding -> suffix of the precompressed files, preferred first
+ENCODINGS = {"br": "br", "gzip": "gz"}
+
+_CONTENT_TYPES = {
+    ".js": b"text/javascript; charset=utf-8",
+    ".css": b"text/css; charset=utf-8",
+}
+
+# one year: asset URLs change whenever their contents do
+MAX_AGE = 31536000
+
+
+@functools.lru_cache(maxsize=None)
+def read_asset(name: str) -> str:
+    """Return the contents of asset `name`, read once per process."""
+    return (ASSETS_DIR / name).read_text(encoding="utf-8")
+
+
+def content_hash(text: str) -> str:
+    """Return the hash `build.json` records for an asset source."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def minified_name(name: str) -> str:
+    """Return the file name of the minified bundle for asset `name`."""
+    stem, _, ext = name.rpartition(".")
+    return f"{stem}.min.{ext}"
+
+
+@functools.lru_cache(maxsize=None)
+def _manifest() -> dict:
+    try:
+        return json.loads((ASSETS_DIR / MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+@functools.lru_cache(maxsize=None)
+def served_name(name: str) -> str:
+    """Return the file served for asset `name`: its bundle if built and current."""
+    entry = _manifest().get(name)
+    if (
+        entry
+        and entry.get("source") == content_hash(read_asset(name))
+        and (ASSETS_DIR / entry["file"]).exists()
+    ):
+        return entry["file"]
+    return name
+
+
+def _encodings(served: str) -> list:
+    # precompressed variants built for the served file
+    for entry in _manifest().values():
+        if entry.get("file") == served:
+            return [
+                e for e, suffix in ENCODINGS.items() if suffix in entry["encodings"]
+            ]
+    return []
+
+
+@functools.lru_cache(maxsize=None)
+def asset_version() -> str:
+    """Return the dependency version: the package version plus a content hash."""
+    digest = hashlib.blake2b(digest_size=6)
+    for name in (SCRIPT, STYLESHEET):
+        digest.update(read_asset(served_name(name)).encode("utf-8"))
+    return f"{__version__}+{digest.hexdigest()}"
+
+
+def asset_path(name: str) -> str:
+    """Return the URL path asset `name` is served at, relative to the app root."""
+    return f"lib/{DEPENDENCY_NAME}-{asset_version()}/{served_name(name)}"
+
+
+@functools.lru_cache(maxsize=None)
+def asset_dependency():
+    """Return the `HTMLDependency` for the client assets (built once)."""
+    from htmltools import HTMLDependency
+
+    return HTMLDependency(
+        DEPENDENCY_NAME,
+        asset_version(),
+        source={"package": "bs4dash_py", "subdir": "assets"},
+        script={"src": served_name(SCRIPT)},
+        stylesheet={"href": served_name(STYLESHEET)},
+        # source maps and precompressed variants are served alongside
+        all_files=True,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def vendor_dependency():
+    """Return the `HTMLDependency` for the vendored third-party assets.
+
+    Returns None when `scripts/vendor_assets.py` hasn't been run. The files
+    are named after their contents, so the version is a hash of the list.
+    """
+    try:
+        manifest = json.loads((VENDOR_DIR / VENDOR_MANIFEST).read_text("utf-8"))
+    except (OSError, ValueError):
+        return None
+    from htmltools import HTMLDependency
+
+    files = manifest["stylesheets"] + manifest["scripts"]
+    digest = hashlib.blake2b("\n".join(files).encode("utf-8"), digest_size=6)
+    return HTMLDependency(
+        VENDOR_NAME,
+        f"{__version__}+{digest.hexdigest()}",
+        source={"package": "bs4dash_py", "subdir": "assets/vendor"},
+        script=[{"src": name} for name in manifest["scripts"]],
+        stylesheet=[{"href": name} for name in manifest["stylesheets"]],
+        all_files=True,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def preload_hints():
+    """Return `<link rel=preload>` hints for the assets, rendered into <head>.
+
+    Place them before the dependency so the hints come first in <head>.
+    """
+    from htmltools import head_content, tags
+
+    return head_content(
+        tags.link(rel="preload", href=asset_path(STYLESHEET), **{"as": "style"}),
+        tags.link(rel="preload", href=asset_path(SCRIPT), **{"as": "script"}),
+    )
+
+
+def _link_header(root: str) -> bytes:
+    return ", ".join(
+        f"<{root}/{asset_path(name)}>; rel=preload; as={kind}"
+        for name, kind in ((STYLESHEET, "style"), (SCRIPT, "script"))
+    ).encode("latin-1")
+
+
+def _accepted(scope: Any) -> set:
+    accepted = set()
+    for k, v in scope.get("headers", []):
+        if k.lower() != b"accept-encoding":
+            continue
+        for part in v.decode("latin-1").split(","):
+            coding, _, params = part.strip().partition(";")
+            if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                accepted.add(coding.strip().lower())
+    return accepted
+
+
+@functools.lru_cache(maxsize=None)
+def _precompressed(served: str, encoding: str) -> bytes:
+    return (ASSETS_DIR / f"{served}.{ENCODINGS[encoding]}").read_bytes()
+
+
+def with_asset_cache(app: Any, max_age: int = MAX_AGE) -> Any:
+    """Wrap an ASGI app to send cache and preload headers for the assets.
+
+    - responses for the versioned asset URLs (and the vendored assets) get
+      `Cache-Control: public, max-age=<max_age>, immutable`
+    - built bundles are answered with their precompressed `.br` or `.gz`
+      variant when the request's `Accept-Encoding` allows it
+    - HTML responses get a `Link` header preloading the assets
+    """
+    prefix = f"/lib/{DEPENDENCY_NAME}-{asset_version()}/"
+    vendor = vendor_dependency()
+    vendor_prefix = f"/lib/{VENDOR_NAME}-{vendor.version}/" if vendor else None
+    cache_control = f"public, max-age={max_age}, immutable".encode("latin-1")
+    served = {served_name(SCRIPT), served_name(STYLESHEET)}
+
+    async def wrapped(scope, receive, send):
+        if scope.get("type") != "http":
+            return await app(scope, receive, send)
+        root = scope.get("root_path", "")
+        path = scope.get("path", "")
+        if root and path.startswith(root + "/lib/"):
+            path = path[len(root) :]
+        is_asset = path.startswith(prefix) or bool(
+            vendor_prefix and path.startswith(vendor_prefix)
+        )
+
+        name = path[len(prefix) :] if path.startswith(prefix) else None
+        if name in served and scope.get("method", "GET") in ("GET", "HEAD"):
+            accepted = _accepted(scope)
+            for encoding in _encodings(name):
+                if encoding in accepted:
+                    body = _precompressed(name, encoding)
+                    ext = name[name.rfind(".") :]
+                    await send(
+                        {
+                            "type": "http.response.start",
+                            "status": 200,
+                            "headers": [
+                                (b"content-type", _CONTENT_TYPES[ext]),
+                                (b"content-encoding", encoding.encode("latin-1")),
+                                (b"content-length", str(len(body)).encode("latin-1")),
+                                (b"vary", b"accept-encoding"),
+                                (b"cache-control", cache_control),
+                            ],
+                        }
+                    )
+                    if scope.get("method", "GET") == "HEAD":
+                        body = b""
+                    await send({"type": "http.response.body", "body": body})
+                    return None
+
+        async def _send(message):
+            if message.get("type") == "http.response.start":
+                headers = list(message.get("headers", []))
+                if is_asset and message.get("status") in (200, 304):
+                    headers = [h for h in headers if h[0].lower() != b"cache-control"]
+                    headers.append((b"cache-control", cache_control))
+                    if name in served and _encodings(name):
+                        headers.append((b"vary", b"accept-encoding"))
+                elif any(
+                    k.lower() == b"content-type" and v.startswith(b"text/html")
+                    for k, v in headers
+                ):
+                    headers.append((b"link", _link_header(root)))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        return await app(scope, receive, _send)
+
+    return wrapped
+
+
+def _clear_caches() -> None:
+    # after the assets or their build change on disk (tests, development)
+    for fn in (
+        read_asset,
+        _manifest,
+        served_name,
+        asset_version,
+        asset_dependency,
+        vendor_dependency,
+        preload_hints,
+        _precompressed,
+    ):
+        fn.cache_clear()
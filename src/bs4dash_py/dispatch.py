@@ -0,0 +1,279 @@
+"""Cross-thread delivery of server helper messages.
+
+Worker threads calling the helpers in `bs4dash_py.server` would otherwise
+schedule every message on the session's loop separately, with nothing
+bounding how many are in flight or ordering them. A `Dispatcher` attached to
+a session replaces that with a bounded queue drained on the session's loop:
+
+- messages are placed in priority lanes, so user-visible updates (active
+  item, tab content, controlbar) overtake background badge refreshes;
+- when the queue is full, the overflow policy decides what happens:
+  `"block"` waits for space, `"drop_oldest"` drops the oldest message of the
+  lowest-priority lane at or below the new message's priority, and
+  `"coalesce"` replaces a queued message for the same target in place (and
+  drops the oldest when there is none);
+- queue depth and delivered/dropped/coalesced/failed counters are exposed by
+  `Dispatcher.stats()`.
+
+Messages sent from the loop's own thread bypass the dispatcher.
+"""
+
+import asyncio
+import threading
+import weakref
+from collections import deque
+from typing import Any, Optional
+
+from . import server
+
+# Lanes: lower value = higher priority
+INTERACTIVE = 0
+BACKGROUND = 1
+
+DEFAULT_LANES = {
+    "bs4dash_controlbar": INTERACTIVE,
+    "bs4dash_update_sidebar": INTERACTIVE,
+    "bs4dash_update_sidebar_active": INTERACTIVE,
+    "bs4dash_update_navs": INTERACTIVE,
+    "bs4dash_update_nav_items": INTERACTIVE,
+    "bs4dash_update_tab_content": INTERACTIVE,
+    "bs4dash_update_sidebar_badges": BACKGROUND,
+}
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "coalesce")
+
+
+class Dispatcher:
+    """Bounded, prioritized queue of messages drained on the session's loop.
+
+    - session: the Shiny session messages are delivered to (held weakly)
+    - loop: the session's event loop (default: the running loop)
+    - maxsize: maximum number of queued messages across all lanes
+    - overflow: one of "block", "drop_oldest" or "coalesce"
+    - lanes: mapping of message name -> lane (0 is the highest priority);
+      names not listed go to the `BACKGROUND` lane
+    - block_timeout: with overflow="block", seconds to wait for space before
+      dropping the message (None waits indefinitely)
+    """
+
+    def __init__(
+        self,
+        session: Any,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        maxsize: int = 1000,
+        overflow: str = "block",
+        lanes: Optional[dict] = None,
+        block_timeout: Optional[float] = None,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}"
+            )
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        # weak: the dispatcher is kept in the session's weakly keyed state
+        self._session = weakref.ref(session)
+        self.loop = loop or asyncio.get_running_loop()
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.lanes = dict(DEFAULT_LANES if lanes is None else lanes)
+        self.block_timeout = block_timeout
+        self._queues: dict = {}
+        self._by_key: dict = {}
+        self._depth = 0
+        self._draining = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.failed = 0
+
+    @property
+    def session(self) -> Any:
+        """The session messages are delivered to (None once it is gone)."""
+        return self._session()
+
+    # -- submission (any thread) ---------------------------------------------
+    def accepts_from_current_thread(self) -> bool:
+        """Return True when messages sent from this thread should be queued."""
+        if self._closed:
+            return False
+        return getattr(self.loop, "_thread_id", None) != threading.get_ident()
+
+    def lane_for(self, name: str, payload: dict) -> int:
+        """Return the lane for a message; batches take their highest priority."""
+        if name == server.BATCH_MESSAGE:
+            inner = [m.get("type") for m in (payload or {}).get("messages", [])]
+            return min((self.lanes.get(n, BACKGROUND) for n in inner), default=0)
+        return self.lanes.get(name, BACKGROUND)
+
+    def submit(self, name: str, payload: dict) -> bool:
+        """Queue a message for delivery. Returns False when it was dropped."""
+        ok = self._submit(name, payload)
+        metrics = server._metrics
+        if not ok and metrics is not None:
+            metrics.record_failure(self.session, name, "dropped")
+        return ok
+
+    def _submit(self, name: str, payload: dict) -> bool:
+        lane = self.lane_for(name, payload)
+        key = server._coalesce_key(name, payload)
+        on_loop_thread = not self.accepts_from_current_thread()
+        with self._cond:
+            if self.overflow == "coalesce" and key is not None:
+                entry = self._by_key.get(key)
+                if entry is not None:
+                    entry[2] = server._merge_payloads(name, entry[2], payload)
+                    self.coalesced += 1
+                    return True
+            if self._depth >= self.maxsize:
+                if self.overflow == "block" and not on_loop_thread:
+                    # never block the loop that drains the queue
+                    if (
+                        not self._cond.wait_for(
+                            lambda: self._depth < self.maxsize or self._closed,
+                            timeout=self.block_timeout,
+                        )
+                        or self._closed
+                    ):
+                        self.dropped += 1
+                        return False
+                elif not self._drop_oldest(lane):
+                    self.dropped += 1
+                    return False
+            entry = [lane, name, payload, key]
+            self._queues.setdefault(lane, deque()).append(entry)
+            if key is not None:
+                self._by_key[key] = entry
+            self._depth += 1
+            start = not self._draining
+            self._draining = True
+        if start:
+            try:
+                self.loop.call_soon_threadsafe(self._start_drain)
+            except RuntimeError:
+                # loop closed: nothing will drain the queue
+                with self._cond:
+                    self._draining = False
+                return False
+        return True
+
+    def _drop_oldest(self, lane: int) -> bool:
+        """Drop the oldest message at or below `lane`'s priority (lock held)."""
+        for candidate in sorted(self._queues, reverse=True):
+            if candidate < lane:
+                break
+            q = self._queues[candidate]
+            if q:
+                self._forget(q.popleft())
+                self.dropped += 1
+                return True
+        return False
+
+    def _forget(self, entry) -> None:
+        self._depth -= 1
+        key = entry[3]
+        if key is not None and self._by_key.get(key) is entry:
+            del self._by_key[key]
+        self._cond.notify_all()
+
+    # -- draining (session loop) -----------------------------------------------
+    def _start_drain(self) -> None:
+        self.loop.create_task(self._drain())
+
+    def _pop(self):
+        with self._cond:
+            for lane in sorted(self._queues):
+                q = self._queues[lane]
+                if q:
+                    entry = q.popleft()
+                    self._forget(entry)
+                    return entry
+            self._draining = False
+            return None
+
+    async def _drain(self) -> None:
+        while True:
+            entry = self._pop()
+            if entry is None:
+                return
+            _, name, payload, _ = entry
+            session = self.session
+            try:
+                ok = session is not None and await server._adispatch_custom_message(
+                    session, name, payload
+                )
+            except Exception:
+                ok = False
+            with self._cond:
+                if ok:
+                    self.delivered += 1
+                else:
+                    self.failed += 1
+
+    # -- inspection ----------------------------------------------------------
+    @property
+    def depth(self) -> int:
+        """Number of messages currently queued."""
+        return self._depth
+
+    def stats(self) -> dict:
+        """Return queue depth (total and per lane) and delivery counters."""
+        with self._cond:
+            return {
+                "depth": self._depth,
+                "depth_by_lane": {
+                    lane: len(q) for lane, q in sorted(self._queues.items())
+                },
+                "maxsize": self.maxsize,
+                "overflow": self.overflow,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+                "failed": self.failed,
+            }
+
+    def close(self) -> None:
+        """Stop accepting messages; blocked submitters are released."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+def attach_dispatcher(session: Any, loop=None, **options) -> Dispatcher:
+    """Attach a `Dispatcher` to `session` and return it.
+
+    Call it from the server function (so the running loop is the session's
+    loop) or pass `loop`. Helper calls made from other threads are then
+    queued on the dispatcher; see `Dispatcher` for the options. Replaces any
+    dispatcher already attached. The dispatcher is closed when the session
+    ends, if the session supports `on_ended`.
+    """
+    dispatcher = Dispatcher(session, loop=loop, **options)
+    state = server._session_state(session)
+    with state.lock:
+        previous, state.dispatcher = state.dispatcher, dispatcher
+    if previous is not None:
+        previous.close()
+    on_ended = getattr(session, "on_ended", None)
+    if callable(on_ended):
+        try:
+            on_ended(dispatcher.close)
+        except Exception:
+            pass
+    return dispatcher
+
+
+def get_dispatcher(session: Any) -> Optional[Dispatcher]:
+    """Return the dispatcher attached to `session`, if any."""
+    return server._session_state(session).dispatcher
+
+
+def detach_dispatcher(session: Any) -> None:
+    """Detach and close the session's dispatcher; queued messages still drain."""
+    state = server._session_state(session)
+    with state.lock:
+        dispatcher, state.dispatcher = state.dispatcher, None
+    if dispatcher is not None:
+        dispatcher.close()
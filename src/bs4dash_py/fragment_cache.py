@@ -0,0 +1,232 @@
+"""Cross-session cache for layout subtrees that don't change between sessions.
+
+With a function-style UI every new session builds the page again, although
+the navbar, sidebar, footer and brand are usually the same for everyone
+with a given role or locale. Cache them: the first session builds and
+renders a subtree, later ones reuse the rendered HTML.
+
+    from bs4dash_py import cache_fragment, cached_builder, navbar_shiny
+
+    navbar = cached_builder(navbar_shiny)  # key derived from the arguments
+
+    def app_ui(request):
+        role, locale = user_role(request), user_locale(request)
+        return dashboard_page_shiny(
+            header=navbar(t("Dashboard", locale), right_ui=items_for(role)),
+            sidebar=cache_fragment(
+                ("sidebar", role, locale), lambda: sidebar_shiny(menu=menu_for(role))
+            ),
+            body=session_body(request),
+        )
+
+The cache is shared by all sessions of the process and bounded by the
+number of entries and the memory held by their rendered HTML; the least
+recently used entries are evicted first. Cached subtrees keep their HTML
+dependencies and registered icons. Anything that differs between sessions
+(selected items, user names) must be part of the key.
+"""
+
+import functools
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+# defaults for the shared cache
+MAX_ENTRIES = 256
+MAX_BYTES = 32 * 1024 * 1024
+
+
+class _Renderer:
+    """Renders a cached subtree once per (indent, eol) and accounts for it."""
+
+    def __init__(self, cache: "FragmentCache", key: Any, tree: Any):
+        self.cache = cache
+        self.key = key
+        self.tree = tree
+        self.html: dict = {}
+        self.size = 0
+
+    def __call__(self, indent: int, eol: str) -> str:
+        html = self.html.get((indent, eol))
+        if html is None:
+            html = self.html[(indent, eol)] = self.tree.get_html_string(indent, eol)
+            self.cache._grow(self, sys.getsizeof(html))
+        return html
+
+
+class FragmentCache:
+    """LRU of rendered subtrees shared across sessions.
+
+    - max_entries: number of subtrees kept
+    - max_bytes: memory held by their rendered HTML
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries and max_bytes must be at least 1")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self.lock:
+            self.entries: "OrderedDict[Any, Any]" = OrderedDict()
+            # key -> lock held while the subtree is built, so concurrent
+            # sessions wait for one build instead of each running their own
+            self.building: dict = {}
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def get(self, key: Any, build: Callable) -> Any:
+        """Return the cached subtree for `key`, calling `build()` on a miss."""
+        with self.lock:
+            fragment = self._lookup(key)
+            if fragment is not None:
+                return fragment
+            pending = self.building.setdefault(key, threading.Lock())
+        with pending:
+            with self.lock:
+                fragment = self._lookup(key)
+                if fragment is not None:
+                    return fragment
+                self.misses += 1
+            try:
+                fragment = self._fragment(key, build())
+            finally:
+                with self.lock:
+                    self.building.pop(key, None)
+            with self.lock:
+                self.entries[key] = fragment
+                self._evict()
+        return fragment
+
+    def _lookup(self, key: Any) -> Any:
+        fragment = self.entries.get(key)
+        if fragment is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return fragment
+
+    def _fragment(self, key: Any, tree: Any) -> Any:
+        from htmltools import Tag, TagifiedTag
+
+        from .html_render import Fragment
+        from .icons import used_icons
+
+        if not isinstance(tree, (Tag, TagifiedTag)):
+            raise TypeError(
+                f"fragment {key!r}: expected a tag, got {type(tree).__name__}"
+            )
+        tree = tree.tagify()
+        render = _Renderer(self, key, tree)
+        fragment = Fragment(
+            tree.name, render, tree.get_dependencies(), used_icons(tree)
+        )
+        fragment.add_ws = tree.add_ws
+        return fragment
+
+    def _grow(self, render: _Renderer, size: int) -> None:
+        with self.lock:
+            fragment = self.entries.get(render.key)
+            if fragment is None or fragment._render is not render:
+                # already evicted; whoever holds it can still render it
+                return
+            render.size += size
+            self.bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        while self.entries and (
+            len(self.entries) > self.max_entries or self.bytes > self.max_bytes
+        ):
+            _, fragment = self.entries.popitem(last=False)
+            self.bytes -= fragment._render.size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """Return {"entries", "bytes", "hits", "misses", "evictions"}."""
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_cache = FragmentCache()
+
+
+def cache_fragment(key: Any, build: Callable, cache: Optional[FragmentCache] = None):
+    """Return the subtree cached under `key`, building it with `build()` once.
+
+    - key: any hashable value identifying the subtree, e.g. ("sidebar", role)
+    - build: returns the subtree (a single tag)
+    - cache: a `FragmentCache`; the shared one by default
+    """
+    return (cache or _cache).get(key, build)
+
+
+def _key_part(value: Any) -> Any:
+    from htmltools import HTML, Tag, TagifiedTag, TagList
+
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (bool, int, float)):
+        # 1, 1.0 and True are equal as keys but render differently
+        return (type(value).__name__, value)
+    if isinstance(value, HTML):
+        return ("HTML", str(value))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_key_part(v) for v in value))
+    if isinstance(value, dict):
+        return ("dict", tuple((k, _key_part(v)) for k, v in value.items()))
+    if isinstance(value, (Tag, TagifiedTag, TagList)):
+        return ("tag", str(value))
+    raise TypeError(
+        f"can't derive a cache key from {type(value).__name__}: use cache_fragment"
+    )
+
+
+def cached_builder(builder: Callable, cache: Optional[FragmentCache] = None):
+    """Wrap a builder so its result is cached under a key made of its arguments.
+
+    Arguments may be text, numbers, lists, tuples, dicts and tags; for other
+    arguments (callables, objects) use `cache_fragment` with an explicit key.
+    """
+    name = (builder.__module__, builder.__qualname__)
+
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs):
+        key = (name, _key_part(args), _key_part(kwargs))
+        return cache_fragment(key, lambda: builder(*args, **kwargs), cache)
+
+    return wrapper
+
+
+def set_fragment_cache_limits(
+    max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES
+) -> None:
+    """Set the limits of the shared cache, evicting entries beyond them."""
+    if max_entries < 1 or max_bytes < 1:
+        raise ValueError("max_entries and max_bytes must be at least 1")
+    with _cache.lock:
+        _cache.max_entries = max_entries
+        _cache.max_bytes = max_bytes
+        _cache._evict()
+
+
+def clear_fragment_cache() -> None:
+    """Drop every subtree from the shared cache, e.g. after a deploy."""
+    _cache.clear()
+
+
+def fragment_cache_stats() -> dict:
+    """Return the shared cache's entry count, size and hit/miss counters."""
+    return _cache.stats()
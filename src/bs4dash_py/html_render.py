@@ -0,0 +1,511 @@
+"""Direct-to-string rendering for the layout builders.
+
+The builders here take the same arguments as their `shiny_layout`
+namesakes and produce the same HTML, byte for byte, but write it from
+precompiled templates of the fixed AdminLTE structures instead of building
+a `ui.tags` tree that Shiny then walks again to serialise. Use them for the
+large, regular parts of a page, such as sidebars with thousands of items or
+pages of cards:
+
+    from bs4dash_py import html_render as layout
+
+    side = layout.sidebar_shiny("App", menu=entries)
+    cards = [layout.box_shiny(body, title=t) for t, body in reports]
+
+They return `Fragment`s, which go wherever a tag goes. Arguments that are
+tags rather than text (a card's body, a tag as an item's title) are
+rendered by htmltools inside the template, and keep their dependencies.
+The other builders are re-exported from `shiny_layout`, so the module can
+stand in for it.
+"""
+
+import functools
+from typing import Any, Callable
+
+from htmltools import HTML, MetadataNode, TagifiedTag, TagList, html_escape
+
+from .icons import resolve_icon, symbol_id
+from .shiny_layout import (  # noqa: F401  (re-exported)
+    _box_skeleton,
+    _normalize_badge,
+    body_shiny,
+    breadcrumb_shiny,
+    controlbar_shiny,
+    dashboard_brand_shiny,
+    dashboard_page_shiny,
+    footer_shiny,
+)
+from .shiny_layout import menu_group_shiny as _menu_group_tag
+from .shiny_layout import menu_item_shiny as _menu_item_tag
+from .shiny_layout import navbar_item_shiny as _navbar_item_tag
+from .shiny_layout import (  # noqa: F401  (re-exported)
+    navbar_shiny,
+    navbar_user_menu_shiny,
+)
+from .shiny_layout import sidebar_shiny as _sidebar_tag
+from .shiny_layout import (  # noqa: F401  (re-exported)
+    tab_item_shiny,
+    tabs_shiny,
+)
+from .shiny_layout import value_box_shiny as _value_box_tag
+
+# Templates: {p} is the indentation of the outer element, {n} the line end,
+# {0}, {1}, ... the values. Indentation depends on where a fragment lands in
+# the page, so each is compiled per (indent, eol) on first use.
+_ITEM = '{p}<li class="nav-item">{n}{p}  {0}{n}{p}</li>'
+_GROUP = (
+    '{p}<li class="nav-item has-treeview">{n}'
+    '{p}  <a class="nav-link">{p}    <p>{0}</p></a>{n}'
+    "{1}{n}"
+    "{p}</li>"
+)
+_HEADER = '{p}<li class="nav-header">{0}</li>'
+_DIVIDER = '{p}<hr class="sidebar-divider mt-2 mb-2"/>'
+_SIDEBAR = (
+    '{p}<aside class="main-sidebar sidebar-dark-primary elevation-4"{0}>{n}'
+    "{1}{n}"
+    '{p}  <div class="sidebar">{n}'
+    '{p}    <nav class="mt-2">{n}'
+    "{2}{n}"
+    "{p}    </nav>{n}"
+    "{p}  </div>{n}"
+    "{p}</aside>"
+)
+_BRAND = (
+    '{p}<a class="brand-link">'
+    '<span class="brand-text font-weight-light">{0}</span></a>'
+)
+_CARD = '{p}<div class="{0}">{n}{p}  <div{1}>{n}{2}{n}{p}  </div>{n}{p}</div>'
+_CARD_HEADER = (
+    '{p}<div class="card-header">{n}'
+    '{p}  <h3 class="card-title">{0}</h3>{n}'
+    "{p}</div>"
+)
+
+_SMALL_BOX = (
+    '{p}<div class="{0}">{n}'
+    '{p}  <div class="{1}">{n}'
+    '{p}    <div class="inner">{n}'
+    "{2}{n}"
+    "{p}    </div>{3}{n}"
+    "{p}  </div>{n}"
+    "{p}</div>"
+)
+_INFO_BOX = (
+    '{p}<div class="{0}">{n}'
+    '{p}  <div class="info-box">{n}'
+    "{1}"
+    '{p}    <div class="info-box-content">{n}'
+    "{2}{n}"
+    "{p}    </div>{n}"
+    "{p}  </div>{n}"
+    "{p}</div>"
+)
+
+_MENU = '<ul class="nav nav-pills nav-sidebar flex-column" role="menu"'
+_TREE = '<ul class="nav nav-treeview"'
+
+
+@functools.lru_cache(maxsize=512)
+def _compiled(template: str, indent: int, eol: str) -> str:
+    eol = eol.replace("{", "{{").replace("}", "}}")
+    return template.replace("{p}", "  " * indent).replace("{n}", eol)
+
+
+def _fill(template: str, values: tuple, indent: int, eol: str) -> str:
+    return _compiled(template, indent, eol).format(*values)
+
+
+class Fragment(TagifiedTag):
+    """Markup written by a template; goes wherever a tag goes.
+
+    - name: name of the outermost element
+    - render: `render(indent, eol)` returning the markup
+    - children: tags embedded in the markup, kept for their dependencies
+    - icons: registered icons the markup uses, for the page's sprite
+    """
+
+    def __init__(
+        self, name: str, render: Callable, children: Any = (), icons: Any = ()
+    ):
+        attrs = {"data-bs4dash-icons": " ".join(icons)} if icons else {}
+        super().__init__(name, attrs, *children)
+        self._render = render
+
+    def get_html_string(self, indent: int = 0, eol: str = "\n") -> str:
+        return self._render(indent, eol)
+
+
+def _text(value: Any):
+    """Return `value` as an escaped text node, or None if it isn't text."""
+    if isinstance(value, str):
+        return html_escape(value)
+    if isinstance(value, HTML):
+        return value.as_string()
+    if isinstance(value, (int, float)):
+        return html_escape(str(value))
+    return None
+
+
+def _attrs(*pairs: tuple) -> str:
+    """Render attributes as htmltools does: None/False dropped, True empty."""
+    out = []
+    for key, value in pairs:
+        if value is None or value is False:
+            continue
+        if value is True:
+            value = ""
+        if not isinstance(value, HTML):
+            value = html_escape(str(value), attr=True)
+        out.append(f' {key}="{value}"')
+    return "".join(out)
+
+
+def _element(start, name, kids, indent, eol, add_ws=True) -> str:
+    """Finish an element from its start tag, as `Tag.get_html_string` does.
+
+    - start: the indented start tag, without its closing `>`
+    - kids: the element's children, tagified
+    - add_ws: False for inline elements (`<span>`, `<a>`, ...)
+    """
+    shown = [k for k in kids if not isinstance(k, MetadataNode)]
+    if not shown:
+        return f"{start}></{name}>"
+    if len(shown) == 1 and isinstance(shown[0], (str, HTML)):
+        return f"{start}>{_text(shown[0])}</{name}>"
+    inner = kids.get_html_string(indent + 1, eol, add_ws=add_ws)
+    if not add_ws:
+        return f"{start}>{inner}</{name}>"
+    return f"{start}>{eol}{inner}{eol}{'  ' * indent}</{name}>"
+
+
+def _nodes(*kid_lists: Any) -> list:
+    """The tags and dependencies among children, for the fragment to keep."""
+    return [
+        k for kids in kid_lists for k in kids or () if not isinstance(k, (str, HTML))
+    ]
+
+
+def _tag(node: Any, children: list) -> Callable:
+    """Render a tag built by `shiny_layout`; its dependencies join `children`."""
+    node = node.tagify()
+    children.append(node)
+    return node.get_html_string
+
+
+def _icon(icon: str, icons: list) -> str:
+    resolved = resolve_icon(icon)
+    if resolved is None:
+        return f"<i{_attrs(('class', icon))}></i>"
+    name, rest = resolved
+    icons.append(name)
+    attrs = _attrs(
+        ("class", " ".join(["bs4dash-icon", *rest])),
+        ("aria-hidden", "true"),
+        ("focusable", "false"),
+        ("data-bs4dash-icon", name),
+    )
+    # htmltools indents the (block) <use> one level inside the inline <svg>
+    return f"<svg{attrs}>  <use{_attrs(('href', '#' + symbol_id(name)))}></use></svg>"
+
+
+def _link(a_cls, href, text, badge, icon, badge_cls, icons):
+    """Return an item's `<a>` markup, or None if it needs the Tag path."""
+    text_html = _text(text)
+    if text_html is None or (icon and not isinstance(icon, str)):
+        return None
+    parts = [f"<a{_attrs(('class', a_cls), ('href', href))}>"]
+    if icon:
+        parts.append(_icon(icon, icons))
+    parts.append(text_html)
+    btext, bcls = _normalize_badge(badge)
+    if btext is not None:
+        badge_html = _text(btext)
+        if badge_html is None:
+            return None
+        attrs = _attrs(
+            ("class", bcls + badge_cls), ("aria-label", f"{text} badge {btext}")
+        )
+        parts.append(f"<span{attrs}>{badge_html}</span>")
+    parts.append("</a>")
+    return "".join(parts)
+
+
+def _item(text, href, badge, active, icon, children, icons) -> Callable:
+    a_cls = "nav-link active" if active else "nav-link"
+    a = _link(a_cls, href, text, badge, icon, " float-right", icons)
+    if a is None:
+        return _tag(_menu_item_tag(text, href, badge, active, icon), children)
+    return functools.partial(_fill, _ITEM, (a,))
+
+
+def _rows(items: list, start: str, indent: int, eol: str) -> str:
+    """A `<ul>` of rows (all block elements), `start` already indented."""
+    if not items:
+        return f"{start}></ul>"
+    rows = eol.join(item(indent + 1, eol) for item in items)
+    return f"{start}>{eol}{rows}{eol}{'  ' * indent}</ul>"
+
+
+def _group(title, items, children, icons) -> Callable:
+    rows = []
+    for it in items:
+        if isinstance(it, dict):
+            text = it.get("text", "")
+            href = it.get("href", "#")
+            badge = it.get("badge")
+            icon = it.get("icon")
+        else:
+            text, href = it[0], it[1]
+            badge = it[2] if len(it) > 2 else None
+            icon = it[3] if len(it) > 3 else None
+        rows.append(_item(text, href, badge, False, icon, children, icons))
+    title_html = _text(title)
+    if title_html is None:
+        return _tag(_menu_group_tag(title, items), children)
+
+    def render(indent, eol):
+        ul = _rows(rows, "  " * (indent + 1) + _TREE, indent + 1, eol)
+        return _fill(_GROUP, (title_html, ul), indent, eol)
+
+    return render
+
+
+def _header(text, children) -> Callable:
+    from .shiny_layout import sidebar_header_shiny as header_tag
+
+    text_html = _text(text)
+    if text_html is None:
+        return _tag(header_tag(text), children)
+    return functools.partial(_fill, _HEADER, (text_html,))
+
+
+def _fragment(name: str, render: Callable, children: list, icons: list) -> Fragment:
+    return Fragment(name, render, children, dict.fromkeys(icons))
+
+
+def menu_item_shiny(text, href="#", badge=None, active=False, icon=None):
+    """Create a single sidebar menu item (see `shiny_layout.menu_item_shiny`)."""
+    children, icons = [], []
+    render = _item(text, href, badge, active, icon, children, icons)
+    return _fragment("li", render, children, icons)
+
+
+def menu_group_shiny(title, items):
+    """Create a menu group (see `shiny_layout.menu_group_shiny`)."""
+    children, icons = [], []
+    return _fragment("li", _group(title, items, children, icons), children, icons)
+
+
+def navbar_item_shiny(title, href="#", badge=None, icon=None):
+    """Create a navbar item (see `shiny_layout.navbar_item_shiny`)."""
+    children, icons = [], []
+    a = _link("nav-link", href, title, badge, icon, " ml-1", icons)
+    if a is None:
+        render = _tag(_navbar_item_tag(title, href, badge, icon), children)
+    else:
+        render = functools.partial(_fill, _ITEM, (a,))
+    return _fragment("li", render, children, icons)
+
+
+def sidebar_header_shiny(text):
+    """Render a sidebar header (see `shiny_layout.sidebar_header_shiny`)."""
+    children = []
+    return _fragment("li", _header(text, children), children, [])
+
+
+def sidebar_divider_shiny():
+    """Render a sidebar divider (see `shiny_layout.sidebar_divider_shiny`)."""
+    return _fragment("hr", functools.partial(_fill, _DIVIDER, ()), [], [])
+
+
+def sidebar_shiny(
+    brand_title="My app",
+    menu=None,
+    id="main-sidebar",
+    virtual=False,
+    row_height=40,
+    overscan=10,
+):
+    """Create a sidebar (see `shiny_layout.sidebar_shiny`).
+
+    A virtual sidebar is already written as data, so it is built as a tag.
+    """
+    if virtual:
+        return _sidebar_tag(brand_title, menu, id, virtual, row_height, overscan)
+    children, icons, rows = [], [], []
+    for entry in menu or ():
+        # explicit divider marker
+        if isinstance(entry, str) and entry.upper() == "DIVIDE":
+            rows.append(functools.partial(_fill, _DIVIDER, ()))
+            continue
+
+        # header marker (single-element tuple)
+        if isinstance(entry, tuple) and len(entry) == 1:
+            rows.append(_header(entry[0], children))
+            continue
+
+        # group
+        if isinstance(entry, tuple) and isinstance(entry[1], list):
+            rows.append(_group(entry[0], entry[1], children, icons))
+            continue
+
+        # dict
+        if isinstance(entry, dict):
+            text = entry.get("text", "")
+            href = entry.get("href", "#")
+            badge = entry.get("badge")
+            active = entry.get("active", False)
+            icon = entry.get("icon")
+            rows.append(_item(text, href, badge, active, icon, children, icons))
+            continue
+
+        # simple tuple or tuple with badge/icon
+        try:
+            text, href = entry[0], entry[1]
+            badge = entry[2] if len(entry) > 2 else None
+            icon = entry[3] if len(entry) > 3 else None
+            rows.append(_item(text, href, badge, False, icon, children, icons))
+        except Exception:
+            # ignore malformed entries
+            continue
+
+    brand_html = _text(brand_title)
+    if brand_html is None:
+        from shiny import ui
+
+        brand = _tag(
+            ui.tags.a(
+                {"class": "brand-link"},
+                ui.tags.span({"class": "brand-text font-weight-light"}, brand_title),
+            ),
+            children,
+        )
+    else:
+        brand = functools.partial(_fill, _BRAND, (brand_html,))
+    id_attr = _attrs(("id", id))
+
+    def render(indent, eol):
+        menu_ul = _rows(rows, "  " * (indent + 3) + _MENU, indent + 3, eol)
+        return _fill(_SIDEBAR, (id_attr, brand(indent + 1, eol), menu_ul), indent, eol)
+
+    return _fragment("aside", render, children, icons)
+
+
+def box_shiny(children, title=None, status=None, width=12, id=None, lazy=False):
+    """Create a card box (see `shiny_layout.box_shiny`)."""
+    cls = "card"
+    if status:
+        cls += f" card-{status}"
+    card = [("class", cls)]
+    body = [("class", "card-body")]
+    if id is not None:
+        from .lazy import box_body_id
+
+        card.append(("id", id))
+        body.append(("id", box_body_id(id)))
+    if lazy:
+        if id is None:
+            raise ValueError("lazy boxes need an id")
+        from .lazy import register_lazy_box
+
+        body.append(("data-bs4dash-defer", "pending"))
+        body.append(("data-bs4dash-box", id))
+        # the registration key: reports from this page are matched to its body
+        body.append(("data-bs4dash-box-key", register_lazy_box(id, children)))
+        body.append(("aria-busy", "true"))
+        children = _box_skeleton()
+    elif callable(children):
+        children = children()
+
+    kids = TagList(children).tagify()
+    nodes = _nodes(kids)
+    header = None
+    if title:
+        title_html = _text(title)
+        if title_html is None:
+            from shiny import ui
+
+            header = _tag(
+                ui.tags.div(
+                    {"class": "card-header"}, ui.tags.h3({"class": "card-title"}, title)
+                ),
+                nodes,
+            )
+        else:
+            header = functools.partial(_fill, _CARD_HEADER, (title_html,))
+    card_attrs, body_attrs = _attrs(*card), _attrs(*body)
+    col = html_escape(f"col-{width}", attr=True)
+
+    def render(indent, eol):
+        body_html = _element(
+            f"{'  ' * (indent + 2)}<div{body_attrs}", "div", kids, indent + 2, eol
+        )
+        if header is not None:
+            body_html = header(indent + 2, eol) + eol + body_html
+        return _fill(_CARD, (col, card_attrs, body_html), indent, eol)
+
+    return _fragment("div", render, nodes, [])
+
+
+def value_box_shiny(
+    value, title=None, icon=None, color=None, width=3, href=None, id=None, lazy=False
+):
+    """Create a value box (see `shiny_layout.value_box_shiny`).
+
+    A box with an `id` (e.g. a lazy one) or a callable value is built as a tag.
+    """
+    if id is not None or lazy or callable(value):
+        return _value_box_tag(value, title, icon, color, width, href, id, lazy)
+    cl = "small-box"
+    if color:
+        cl += f" bg-{color}"
+    value_kids = TagList(value).tagify()
+    title_kids = TagList(title).tagify() if title else None
+    icon_kids = TagList(icon).tagify() if icon else None
+    footer = ""
+    if href:
+        footer = _attrs(("class", "small-box-footer"), ("href", href))
+        footer = f"<a{footer}>More info</a>"
+    col, cl = html_escape(f"col-{width}", attr=True), html_escape(cl, attr=True)
+
+    def render(indent, eol):
+        p = "  " * (indent + 3)
+        inner = [_element(p + "<h3", "h3", value_kids, indent + 3, eol)]
+        if title_kids is not None:
+            inner.append(_element(p + "<p", "p", title_kids, indent + 3, eol))
+        extra = ""
+        if icon_kids is not None:
+            start = "  " * (indent + 2) + '<div class="icon"'
+            extra += eol + _element(start, "div", icon_kids, indent + 2, eol)
+        if footer:
+            extra += eol + "  " * (indent + 2) + footer
+        return _fill(_SMALL_BOX, (col, cl, eol.join(inner), extra), indent, eol)
+
+    return _fragment("div", render, _nodes(value_kids, title_kids, icon_kids), [])
+
+
+def info_box_shiny(title, value, icon=None, color=None, width=12):
+    """Create an info box (see `shiny_layout.info_box_shiny`)."""
+    title_kids = TagList(title).tagify()
+    value_kids = TagList(value).tagify()
+    icon_kids = TagList(icon).tagify() if icon else None
+    icon_attrs = _attrs(("class", f"info-box-icon bg-{color}"))
+    col = html_escape(f"col-{width}", attr=True)
+
+    def render(indent, eol):
+        icon_html = ""
+        if icon_kids is not None:
+            start = "  " * (indent + 2) + "<span" + icon_attrs
+            icon_html = _element(start, "span", icon_kids, indent + 2, eol, False)
+            icon_html += eol
+        start = "  " * (indent + 3) + '<span class="info-box-text"'
+        title_html = _element(start, "span", title_kids, indent + 3, eol, False)
+        # the second inline <span> follows the first on its line, rendered
+        # by htmltools as if at the top level
+        start = '<span class="info-box-number"'
+        value_html = _element(start, "span", value_kids, 0, "", False)
+        values = (col, icon_html, title_html + value_html)
+        return _fill(_INFO_BOX, values, indent, eol)
+
+    return _fragment("div", render, _nodes(title_kids, value_kids, icon_kids), [])
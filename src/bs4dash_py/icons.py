@@ -0,0 +1,210 @@
+"""Inline SVG icons from one sprite per page, instead of an icon font.
+
+Register SVG icons, by name or from a directory laid out like Font
+Awesome's `svgs/` folder (`solid/home.svg`, `regular/bell.svg`, ...). The
+builders (`menu_item_shiny`, `navbar_item_shiny`, `sidebar_shiny` menus,
+virtual ones included) then render an icon class string naming a
+registered icon, such as `"fas fa-home"`, as an `<svg><use>` reference;
+other icons keep their `<i class="...">` tag. `dashboard_page_shiny`
+collects the icons the page uses and inlines a hidden `<svg>` sprite with
+one `<symbol>` for each, so icons render with the first paint and no icon
+font has to be downloaded.
+
+    from bs4dash_py import register_icons
+
+    register_icons("assets/fontawesome/svgs")
+
+Icons used only in content sent later by the server (tab content updates,
+`update_virtual_sidebar`) are not seen at build time: list them in
+`dashboard_page_shiny(icons=[...])`.
+"""
+
+import re
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+# name -> (viewBox, inner SVG markup)
+_icons: dict = {}
+# directories searched for `<name>.svg`
+_dirs: list = []
+_lock = threading.Lock()
+
+# icon-font style classes -> folder of Font Awesome's svgs/
+_STYLES = {
+    "fa": "solid",
+    "fas": "solid",
+    "fa-solid": "solid",
+    "far": "regular",
+    "fa-regular": "regular",
+    "fab": "brands",
+    "fa-brands": "brands",
+}
+# `fa-` classes that modify an icon rather than name one
+_MODIFIER = re.compile(
+    r"fa-(fw|xs|sm|lg|\d+x|spin|pulse|border|inverse|li|ul|pull-\w+|"
+    r"flip-\w+|rotate-\d+|stack(-\dx)?)$"
+)
+_VIEWBOX = re.compile(r"""viewBox\s*=\s*["']([^"']+)["']""")
+
+SYMBOL_PREFIX = "bs4i-"
+
+
+def register_icon(name: str, svg: str) -> None:
+    """Register an icon from SVG markup (which must have a viewBox).
+
+    - name: e.g. "logo", or "solid/home" to stand for "fas fa-home"
+    - svg: `<svg viewBox="...">...</svg>` markup
+    """
+    _icons[name] = _parse(svg, name)
+
+
+def register_icons(directory: Any) -> None:
+    """Look up icons not registered by name as `<directory>/<name>.svg`.
+
+    Files are read when an icon is first used.
+    """
+    path = Path(directory)
+    if not path.is_dir():
+        raise ValueError(f"not a directory: {directory}")
+    with _lock:
+        if path not in _dirs:
+            _dirs.append(path)
+
+
+def _parse(svg: str, name: str) -> tuple:
+    m = _VIEWBOX.search(svg)
+    start = svg.find(">", svg.find("<svg"))
+    end = svg.rfind("</svg>")
+    if not m or start < 0 or end < 0:
+        raise ValueError(f"icon {name!r}: expected <svg viewBox=...> markup")
+    return m.group(1), svg[start + 1 : end].strip()
+
+
+def _lookup(name: str) -> Optional[tuple]:
+    icon = _icons.get(name)
+    if icon is None and _dirs and ".." not in name:
+        for directory in _dirs:
+            path = directory / f"{name}.svg"
+            if path.is_file():
+                icon = _icons[name] = _parse(path.read_text(encoding="utf-8"), name)
+                break
+    return icon
+
+
+def resolve_icon(icon: Any) -> Optional[tuple]:
+    """Return (name, other classes) if `icon` names a registered icon, else None.
+
+    `icon` is a registered name or an icon-font class string: "fas fa-home"
+    and "fa-solid fa-home" both name "solid/home".
+    """
+    if not isinstance(icon, str) or not icon.strip():
+        return None
+    style, name, rest = None, None, []
+    for token in icon.split():
+        if token in _STYLES:
+            style = _STYLES[token]
+        elif name is None and token.startswith("fa-") and not _MODIFIER.match(token):
+            name = token[3:]
+        else:
+            rest.append(token)
+    if name is not None:
+        name = f"{style or 'solid'}/{name}"
+    elif len(rest) == 1:
+        name, rest = rest[0], []
+    else:
+        return None
+    if _lookup(name) is None:
+        return None
+    return name, rest
+
+
+def symbol_id(name: str) -> str:
+    """Return the id of the sprite `<symbol>` for icon `name`."""
+    return SYMBOL_PREFIX + re.sub(r"[^\w-]", "-", name)
+
+
+def icon_shiny(icon: Any, cls: Optional[str] = None):
+    """Return a tag for `icon`: an SVG sprite reference if it is registered.
+
+    - icon: an icon class string (or registered name); tags are returned as is
+    - cls: extra classes for the icon element
+    """
+    from htmltools import Tag
+    from shiny import ui
+
+    if not isinstance(icon, str):
+        return icon
+    resolved = resolve_icon(icon)
+    if resolved is None:
+        return ui.tags.i({"class": f"{icon} {cls}" if cls else icon})
+    name, rest = resolved
+    classes = " ".join(["bs4dash-icon", *rest, *([cls] if cls else [])])
+    return ui.tags.svg(
+        {
+            "class": classes,
+            "aria-hidden": "true",
+            "focusable": "false",
+            "data-bs4dash-icon": name,
+        },
+        Tag("use", href=f"#{symbol_id(name)}"),
+    )
+
+
+def _collect(node: Any, found: dict) -> None:
+    attrs = getattr(node, "attrs", None)
+    if attrs:
+        for key in ("data-bs4dash-icon", "data-bs4dash-icons"):
+            for name in str(attrs.get(key, "")).split():
+                found.setdefault(name, None)
+    children = getattr(node, "children", None)
+    if children is None and isinstance(node, (list, tuple)):
+        children = node
+    for child in children or ():
+        _collect(child, found)
+
+
+def used_icons(*nodes: Any) -> list:
+    """Return the registered icons referenced in `nodes`, in order of use."""
+    found: dict = {}
+    for node in nodes:
+        _collect(node, found)
+    return list(found)
+
+
+def icon_sprite(*nodes: Any, icons: Any = ()):
+    """Return a hidden `<svg>` sprite for the icons used in `nodes`, or None.
+
+    - icons: more icons to include (names or class strings), e.g. for
+      content the server sends later
+    """
+    from shiny import ui
+
+    names = used_icons(*nodes)
+    for icon in icons:
+        resolved = resolve_icon(icon)
+        if resolved is None:
+            raise ValueError(f"icon {icon!r} is not registered")
+        if resolved[0] not in names:
+            names.append(resolved[0])
+    symbols = []
+    for name in names:
+        icon = _lookup(name)
+        if icon is None:
+            continue
+        view_box, inner = icon
+        symbols.append(
+            f'<symbol id="{symbol_id(name)}" viewBox="{view_box}">{inner}</symbol>'
+        )
+    if not symbols:
+        return None
+    return ui.tags.svg(
+        {
+            "class": "bs4dash-icon-sprite",
+            "xmlns": "http://www.w3.org/2000/svg",
+            "aria-hidden": "true",
+            # not display:none, which can keep symbols from rendering
+            "style": "position:absolute;width:0;height:0;overflow:hidden",
+        },
+        ui.HTML("".join(symbols)),
+    )
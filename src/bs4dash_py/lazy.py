@@ -0,0 +1,375 @@
+"""Lazily rendered tab panes and boxes (`tabs_shiny`/`box_shiny(lazy=True)`).
+
+In lazy mode only the initially active pane is built with the page; the
+other panes are empty placeholders and their content is kept (unbuilt, when
+given as a callable) in a registry. Each UI build registers its panes under
+a key of its own, written into the page, so sessions served pages built per
+request get their page's content; the least recently used registrations are
+dropped past `MAX_REGISTRATIONS`. The first time a placeholder pane becomes
+active, the client asset reports it (with the key) through the
+`bs4dash_lazy_tab` input and the server sends the pane's content with
+`update_tab_content`, with the HTML dependencies (scripts, styles) it
+needs. Output bindings in the content are bound by the client once inserted.
+
+    ui = tabs_shiny(
+        "reports",
+        ("overview", "Overview", overview_ui, True),
+        ("details", "Details", lambda: ui.output_data_frame("details")),
+        lazy=True,
+    )
+
+    def server(input, output, session):
+        lazy_tabs(session, "reports", keep_alive=False)
+
+With `keep_alive=True` (the default) a pane stays loaded once rendered. With
+`keep_alive=False` hiding a pane unloads it: the client empties it, which
+unbinds its outputs, and it is rendered again the next time it is shown.
+
+Boxes work the same way with `box_shiny(..., id="sales", lazy=True)` (or
+`value_box_shiny(..., id="orders", lazy=True)`): the box shows a skeleton until it nears the viewport, which the client detects
+with an `IntersectionObserver` and reports through the `bs4dash_lazy_box`
+input; `lazy_boxes(session)` then sends the box body. The client reports the
+ids (and registration keys) of every box seen so far, so reports made before
+the session connects are not lost.
+"""
+
+import secrets
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Optional
+
+from . import server
+
+# Input the client reports pane activations and hides on
+LAZY_TAB_INPUT = "bs4dash_lazy_tab"
+
+UNLOAD_TAB = "bs4dash_unload_tab"
+
+# Input the client reports boxes nearing the viewport on
+LAZY_BOX_INPUT = "bs4dash_lazy_box"
+
+# Registrations kept before the least recently used are dropped
+MAX_REGISTRATIONS = 4096
+
+# key -> {"kind": "tabs", "id": tabs_id, "panes": {tab_id: content},
+# "active": tab_id} or {"kind": "box", "id": box_id, "content": content},
+# recorded when the UI is built; least recently used first
+_registry: "OrderedDict[str, dict]" = OrderedDict()
+# (kind, id) -> key of its latest registration, for events without a key
+_latest: dict = {}
+_registry_lock = threading.Lock()
+
+
+def _register(kind: str, id: str, entry: dict) -> str:
+    """Record `entry` for the `kind` element `id` under a new key; return the key."""
+    # unguessable, so a client can't load content built for another page
+    key = secrets.token_hex(8)
+    with _registry_lock:
+        _registry[key] = dict(entry, kind=kind, id=id)
+        _latest[kind, id] = key
+        while len(_registry) > MAX_REGISTRATIONS:
+            old_key, old = _registry.popitem(last=False)
+            if _latest.get((old["kind"], old["id"])) == old_key:
+                del _latest[old["kind"], old["id"]]
+    return key
+
+
+def _lookup(kind: str, id: str, key: Any = None) -> Optional[tuple]:
+    """Return (key, entry) registered for `id` under `key` (default: the latest)."""
+    with _registry_lock:
+        if key is None:
+            key = _latest.get((kind, id))
+        entry = _registry.get(key) if isinstance(key, str) else None
+        if entry is None or (entry["kind"], entry["id"]) != (kind, id):
+            return None
+        _registry.move_to_end(key)
+        return key, entry
+
+
+def register_lazy_panes(tabs_id: str, panes: dict, active: Optional[str]) -> str:
+    """Record the content of the lazy panes of `tabs_id` (done by `tabs_shiny`).
+
+    Returns the registration key the page reports its events with.
+    """
+    return _register("tabs", tabs_id, {"panes": dict(panes), "active": active})
+
+
+def register_lazy_box(box_id: str, content: Any) -> str:
+    """Record the body content of the lazy box `box_id` (done by `box_shiny`).
+
+    Returns the registration key the page reports the box with.
+    """
+    return _register("box", box_id, {"content": content})
+
+
+def box_body_id(box_id: str) -> str:
+    """Return the id of the body element of box `box_id`."""
+    return f"{box_id}-body"
+
+
+def render_pane(content: Any, session: Any = None) -> dict:
+    """Return {"html", "deps"} for pane content: a tag, a string or a callable.
+
+    With a Shiny session the content's HTML dependencies are registered with
+    it and returned for the client to load; strings are sent as HTML as is.
+    """
+    if callable(content):
+        content = content()
+    if content is None or isinstance(content, str):
+        return {"html": content or "", "deps": []}
+    process = getattr(session, "_process_ui", None)
+    if process is None:
+        return {"html": str(content), "deps": []}
+    rendered = process(content)
+    return {"html": rendered["html"], "deps": rendered["deps"]}
+
+
+class LazyTabs:
+    """Which lazy panes of one tabs container a session has loaded.
+
+    - tabs_id: id of the `tabs_shiny` container
+    - panes: {tab_id: content}; content is a tag, string or callable
+    - active: the pane built with the page, loaded from the start
+    - keep_alive: keep panes loaded when hidden (else unload them)
+    - overrides: {tab_id: content} taking precedence over registered panes
+    - key: registration key `panes` and `active` come from
+    """
+
+    def __init__(
+        self,
+        session: Any,
+        tabs_id: str,
+        panes: dict,
+        active: Optional[str] = None,
+        keep_alive: bool = True,
+        overrides: Optional[dict] = None,
+        key: Optional[str] = None,
+    ):
+        # weak: the tracker is kept in the session's weakly keyed state
+        self._session = weakref.ref(session)
+        self.tabs_id = tabs_id
+        self.overrides = dict(overrides or {})
+        self.panes = {**panes, **self.overrides}
+        self.keep_alive = keep_alive
+        self.key = key
+        self.lock = threading.Lock()
+        self.loaded = {active} if active is not None else set()
+        self.renders = 0
+
+    @property
+    def session(self) -> Any:
+        """The session panes are sent to (None once it is gone)."""
+        return self._session()
+
+    def use_key(self, key: Any) -> None:
+        """Switch to the panes registered under `key`, the page the client shows."""
+        if key is None or key == self.key:
+            return
+        found = _lookup("tabs", self.tabs_id, key)
+        if found is None:
+            return
+        entry = found[1]
+        with self.lock:
+            self.key = key
+            self.panes = {**entry["panes"], **self.overrides}
+            active = entry["active"]
+            self.loaded = {active} if active is not None else set()
+
+    def activate(self, tab_id: str) -> bool:
+        """Send the content of `tab_id` unless it is already loaded."""
+        session = self.session
+        if session is None:
+            return False
+        with self.lock:
+            if tab_id not in self.panes or tab_id in self.loaded:
+                return False
+            self.loaded.add(tab_id)
+            self.renders += 1
+        try:
+            pane = render_pane(self.panes[tab_id], session)
+        except Exception:
+            with self.lock:
+                self.loaded.discard(tab_id)
+            raise
+        return server.update_tab_content(session, tab_id, pane["html"], pane["deps"])
+
+    def hide(self, tab_id: str) -> bool:
+        """Unload `tab_id` on the client, unless panes are kept alive."""
+        session = self.session
+        if session is None:
+            return False
+        with self.lock:
+            if self.keep_alive or tab_id not in self.loaded:
+                return False
+            self.loaded.discard(tab_id)
+        return server._send_custom_message(session, UNLOAD_TAB, {"tab_id": tab_id})
+
+
+def _handle(session: Any, event: Any) -> None:
+    """Route a `bs4dash_lazy_tab` event {tabs, tab, event} to its `LazyTabs`."""
+    if not isinstance(event, dict):
+        return
+    tabs = (server._session_state(session).lazy_tabs or {}).get(event.get("tabs"))
+    if tabs is None:
+        return
+    tabs.use_key(event.get("key"))
+    if event.get("event") == "activate":
+        tabs.activate(event.get("tab"))
+    elif event.get("event") == "hide":
+        tabs.hide(event.get("tab"))
+
+
+def lazy_tabs(
+    session: Any, id: str, panes: Optional[dict] = None, keep_alive: bool = True
+) -> LazyTabs:
+    """Render the lazy panes of the `tabs_shiny(id, ..., lazy=True)` container on demand.
+
+    Call it from the server function: activations are observed with a Shiny
+    reactive effect on the `bs4dash_lazy_tab` input. Without Shiny, pass
+    events to `handle_lazy_tab`.
+
+    - id: id of the tabs container
+    - panes: {tab_id: content} overriding the content given to `tabs_shiny`
+    - keep_alive: keep rendered panes when hidden; False unloads them
+    """
+    found = _lookup("tabs", id)
+    key, entry = found if found is not None else (None, {"panes": {}, "active": None})
+    tabs = LazyTabs(
+        session, id, entry["panes"], entry["active"], keep_alive, panes, key
+    )
+    state = server._session_state(session)
+    with state.lock:
+        observed = state.lazy_tabs is not None
+        if not observed:
+            state.lazy_tabs = {}
+        state.lazy_tabs[id] = tabs
+    if not observed:
+        _observe_input(session, LAZY_TAB_INPUT, _handle, ignore_init=True)
+    return tabs
+
+
+def _observe_input(session: Any, input_id: str, handle: Any, ignore_init: bool):
+    """Pass the value of input `input_id` to `handle(session, value)`."""
+    root = getattr(session, "_root_session", session)
+    inputs = getattr(root, "input", None)
+    if inputs is None:
+        return
+    try:
+        from shiny import reactive
+    except Exception:
+        return
+    try:
+
+        @reactive.effect
+        @reactive.event(inputs[input_id], ignore_init=ignore_init)
+        def _lazy_input():
+            handle(session, inputs[input_id]())
+
+    except Exception:
+        # not in a session context: events must go through the handle_* helpers
+        pass
+
+
+def handle_lazy_tab(session: Any, event: Any) -> None:
+    """Handle a client pane event: {"tabs": id, "tab": tab_id, "event": "activate"|"hide"}."""
+    _handle(session, event)
+
+
+class LazyBoxes:
+    """Which lazy boxes a session has rendered.
+
+    - boxes: {box_id: content} taking precedence over registered bodies;
+      content is a tag, string or callable
+    """
+
+    def __init__(self, session: Any, boxes: Optional[dict] = None):
+        # weak: the tracker is kept in the session's weakly keyed state
+        self._session = weakref.ref(session)
+        self.boxes = dict(boxes or {})
+        self.lock = threading.Lock()
+        self.loaded: set = set()
+        self.renders = 0
+
+    @property
+    def session(self) -> Any:
+        """The session box bodies are sent to (None once it is gone)."""
+        return self._session()
+
+    def show(self, box_id: str, key: Any = None) -> bool:
+        """Send the body of `box_id` unless it was already sent.
+
+        - key: registration key of the page the box is on (default: the
+          latest registration of `box_id`)
+        """
+        session = self.session
+        if session is None:
+            return False
+        if box_id in self.boxes:
+            content = self.boxes[box_id]
+        else:
+            found = _lookup("box", box_id, key)
+            if found is None and key is not None:
+                found = _lookup("box", box_id)
+            if found is None:
+                return False
+            content = found[1]["content"]
+        with self.lock:
+            if box_id in self.loaded:
+                return False
+            self.loaded.add(box_id)
+            self.renders += 1
+        try:
+            pane = render_pane(content, session)
+        except Exception:
+            with self.lock:
+                self.loaded.discard(box_id)
+            raise
+        return server.update_tab_content(
+            session, box_body_id(box_id), pane["html"], pane["deps"]
+        )
+
+
+def _handle_boxes(session: Any, report: Any) -> None:
+    """Render the boxes in a `bs4dash_lazy_box` report {"boxes": [ids], "keys": [keys]}."""
+    boxes = server._session_state(session).lazy_boxes
+    if boxes is None:
+        return
+    ids = report.get("boxes") if isinstance(report, dict) else report
+    if not isinstance(ids, (list, tuple)):
+        return
+    keys = report.get("keys") if isinstance(report, dict) else None
+    if not isinstance(keys, (list, tuple)) or len(keys) != len(ids):
+        keys = [None] * len(ids)
+    for box_id, key in zip(ids, keys):
+        if isinstance(box_id, str):
+            boxes.show(box_id, key)
+
+
+def lazy_boxes(session: Any, boxes: Optional[dict] = None) -> LazyBoxes:
+    """Render the bodies of `box_shiny(..., lazy=True)` boxes as they near the viewport.
+
+    Call it from the server function: reports are observed with a Shiny
+    reactive effect on the `bs4dash_lazy_box` input, including one made
+    before the session started. Without Shiny, pass reports to
+    `handle_lazy_box`.
+
+    - boxes: {box_id: content} overriding the content given to `box_shiny`
+    """
+    state = server._session_state(session)
+    with state.lock:
+        tracker = state.lazy_boxes
+        if tracker is not None:
+            tracker.boxes.update(boxes or {})
+            return tracker
+        tracker = state.lazy_boxes = LazyBoxes(session, boxes)
+    _observe_input(session, LAZY_BOX_INPUT, _handle_boxes, ignore_init=False)
+    return tracker
+
+
+def handle_lazy_box(session: Any, report: Any) -> None:
+    """Handle a client report of boxes nearing the viewport: {"boxes": [box_id, ...]}.
+
+    The report may carry the boxes' registration keys: {"keys": [key, ...]}.
+    """
+    _handle_boxes(session, report)
@@ -0,0 +1,361 @@
+"""Delivery metrics for server helper messages.
+
+Helpers return only a bool and swallow send errors, so metrics are the way
+to see how many messages are sent, how large they are, how long the sends
+take and how many fail. Instrumentation is off by default; once enabled,
+every message handed to a session's send method is recorded:
+
+- per message name: sent/failed counters, bytes, and latency and size
+  histograms (messages shipped in a `bs4dash_batch` are recorded under
+  their own names, so bandwidth is attributed to the helper that sent it);
+- per session: sent/failed counters and bytes;
+- failures by message name and reason (the exception type, `no_sender`
+  when no session method accepted the message, or `dropped` when a
+  dispatcher queue overflowed).
+
+Latency is the time spent in the session's send call. For async session
+APIs called from sync helpers the send is scheduled rather than awaited, so
+use the awaitable helpers (e.g., `aupdate_sidebar_badges`) to measure real
+delivery.
+
+    from bs4dash_py import enable_metrics, prometheus_text
+
+    enable_metrics()
+    ...
+    print(prometheus_text())   # Prometheus text exposition format
+"""
+
+import bisect
+import json
+import threading
+from typing import Any, Callable, Optional
+
+from . import server
+
+# Histogram bucket upper bounds (a final +Inf bucket is implied)
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        cumulative, total = [], 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            total += n
+            cumulative.append((bound, total))
+        return {"buckets": cumulative, "sum": self.sum, "count": self.count}
+
+
+class _Series:
+    """Counters for one message name or one session."""
+
+    def __init__(self, histograms: bool):
+        self.sent = 0
+        self.failed = 0
+        self.bytes = 0
+        self.latency = Histogram(LATENCY_BUCKETS) if histograms else None
+        self.size = Histogram(SIZE_BUCKETS) if histograms else None
+
+    def snapshot(self) -> dict:
+        out = {"sent": self.sent, "failed": self.failed, "bytes": self.bytes}
+        if self.latency is not None:
+            out["latency_seconds"] = self.latency.snapshot()
+            out["size_bytes"] = self.size.snapshot()
+        return out
+
+
+def session_label(session: Any) -> str:
+    """Return the label identifying `session` in metrics (its Shiny id)."""
+    sid = getattr(session, "id", None)
+    if isinstance(sid, str) and sid:
+        return sid
+    return f"{type(session).__name__}-{id(session):x}"
+
+
+def _size(payload: Any) -> int:
+    try:
+        return len(json.dumps(payload, default=str).encode("utf-8"))
+    except Exception:
+        return 0
+
+
+class Metrics:
+    """In-process store of delivery metrics.
+
+    - per_session: also keep counters per session (dropped when the
+      session ends, if it supports `on_ended`)
+    """
+
+    def __init__(self, per_session: bool = True):
+        self.per_session = per_session
+        self.lock = threading.RLock()
+        self.exporters: list = []
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all recorded metrics."""
+        with self.lock:
+            self.messages: dict = {}
+            self.sessions: dict = {}
+            self.failures: dict = {}
+
+    def add_exporter(self, exporter: Callable[[dict], Any]) -> None:
+        """Call `exporter(event)` for every recorded message.
+
+        `event` is a dict with `message`, `session`, `ok`, `seconds`,
+        `bytes` and `reason` keys, e.g. to forward to StatsD or OpenTelemetry.
+        Exporter errors are ignored.
+        """
+        self.exporters.append(exporter)
+
+    def remove_exporter(self, exporter: Callable[[dict], Any]) -> None:
+        """Stop calling `exporter`."""
+        try:
+            self.exporters.remove(exporter)
+        except ValueError:
+            pass
+
+    def observe(
+        self,
+        session: Any,
+        name: str,
+        payload: dict,
+        ok: bool,
+        seconds: float,
+        reason: Optional[str] = None,
+    ) -> None:
+        """Record one send of `name` to `session`."""
+        if name == server.BATCH_MESSAGE:
+            parts = [
+                (m.get("type"), _size(m.get("data")))
+                for m in (payload or {}).get("messages", [])
+            ]
+        else:
+            parts = [(name, _size(payload))]
+        label = session_label(session)
+        events = []
+        with self.lock:
+            for part, size in parts:
+                series = self.messages.get(part)
+                if series is None:
+                    series = self.messages[part] = _Series(True)
+                self._count(series, ok, size)
+                series.latency.observe(seconds)
+                series.size.observe(size)
+                if not ok:
+                    key = (part, reason or "unknown")
+                    self.failures[key] = self.failures.get(key, 0) + 1
+                events.append(
+                    {
+                        "message": part,
+                        "session": label,
+                        "ok": ok,
+                        "seconds": seconds,
+                        "bytes": size,
+                        "reason": None if ok else reason or "unknown",
+                    }
+                )
+            if self.per_session:
+                series = self._session_series(session, label)
+                for _, size in parts:
+                    self._count(series, ok, size)
+        self._export(events)
+
+    def record_failure(self, session: Any, name: str, reason: str) -> None:
+        """Record a message that failed before reaching the session's send."""
+        label = session_label(session)
+        with self.lock:
+            series = self.messages.get(name)
+            if series is None:
+                series = self.messages[name] = _Series(True)
+            series.failed += 1
+            key = (name, reason)
+            self.failures[key] = self.failures.get(key, 0) + 1
+            if self.per_session:
+                self._session_series(session, label).failed += 1
+        self._export(
+            [
+                {
+                    "message": name,
+                    "session": label,
+                    "ok": False,
+                    "seconds": 0.0,
+                    "bytes": 0,
+                    "reason": reason,
+                }
+            ]
+        )
+
+    @staticmethod
+    def _count(series: _Series, ok: bool, size: int) -> None:
+        if ok:
+            series.sent += 1
+            series.bytes += size
+        else:
+            series.failed += 1
+
+    def _session_series(self, session: Any, label: str) -> _Series:
+        """Return the per-session series (lock held)."""
+        series = self.sessions.get(label)
+        if series is None:
+            series = self.sessions[label] = _Series(False)
+            on_ended = getattr(session, "on_ended", None)
+            if callable(on_ended):
+                try:
+                    on_ended(lambda: self.forget_session(label))
+                except Exception:
+                    pass
+        return series
+
+    def forget_session(self, label: str) -> None:
+        """Drop the counters kept for the session labelled `label`."""
+        with self.lock:
+            self.sessions.pop(label, None)
+
+    def _export(self, events: list) -> None:
+        for exporter in list(self.exporters):
+            for event in events:
+                try:
+                    exporter(event)
+                except Exception:
+                    pass
+
+    def snapshot(self) -> dict:
+        """Return a point-in-time copy of all metrics as plain data."""
+        with self.lock:
+            return {
+                "messages": {n: s.snapshot() for n, s in self.messages.items()},
+                "sessions": {n: s.snapshot() for n, s in self.sessions.items()},
+                "failures": [
+                    {"message": n, "reason": r, "count": c}
+                    for (n, r), c in self.failures.items()
+                ],
+            }
+
+
+def enable_metrics(per_session: bool = True) -> Metrics:
+    """Start recording delivery metrics for all sessions; return the store.
+
+    Calling it again keeps the current store (and its data).
+    """
+    if server._metrics is None:
+        server._metrics = Metrics(per_session=per_session)
+    return server._metrics
+
+
+def disable_metrics() -> None:
+    """Stop recording delivery metrics and discard the store."""
+    server._metrics = None
+
+
+def get_metrics() -> Optional[Metrics]:
+    """Return the active metrics store, or None when metrics are disabled."""
+    return server._metrics
+
+
+def metrics_snapshot() -> dict:
+    """Return a snapshot of the active metrics (empty when disabled)."""
+    metrics = server._metrics
+    if metrics is None:
+        return {"messages": {}, "sessions": {}, "failures": []}
+    return metrics.snapshot()
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+    return "{" + body + "}"
+
+
+def _bound(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+def prometheus_text(snapshot: Optional[dict] = None, prefix: str = "bs4dash") -> str:
+    """Render a metrics snapshot in the Prometheus text exposition format.
+
+    - snapshot: a `metrics_snapshot()` result (default: take one now)
+    - prefix: metric name prefix
+    """
+    if snapshot is None:
+        snapshot = metrics_snapshot()
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+    messages = snapshot.get("messages", {})
+    family("messages_total", "counter", "Messages handed to the session.")
+    for name, s in messages.items():
+        for outcome, key in (("sent", "sent"), ("failed", "failed")):
+            labels = _labels(message=name, outcome=outcome)
+            lines.append(f"{prefix}_messages_total{labels} {s[key]}")
+    family("message_bytes_total", "counter", "JSON bytes of messages sent.")
+    for name, s in messages.items():
+        lines.append(
+            f"{prefix}_message_bytes_total{_labels(message=name)} {s['bytes']}"
+        )
+    for metric, key, help_text in (
+        ("send_latency_seconds", "latency_seconds", "Time spent sending."),
+        ("message_size_bytes", "size_bytes", "JSON size of messages."),
+    ):
+        family(metric, "histogram", help_text)
+        for name, s in messages.items():
+            h = s.get(key)
+            if h is None:
+                continue
+            for bound, count in h["buckets"]:
+                labels = _labels(message=name, le=_bound(bound))
+                lines.append(f"{prefix}_{metric}_bucket{labels} {count}")
+            labels = _labels(message=name)
+            lines.append(f"{prefix}_{metric}_sum{labels} {h['sum']}")
+            lines.append(f"{prefix}_{metric}_count{labels} {h['count']}")
+
+    family("send_failures_total", "counter", "Failed messages by reason.")
+    for f in snapshot.get("failures", []):
+        labels = _labels(message=f["message"], reason=f["reason"])
+        lines.append(f"{prefix}_send_failures_total{labels} {f['count']}")
+
+    sessions = snapshot.get("sessions", {})
+    if sessions:
+        family("session_messages_total", "counter", "Messages per session.")
+        for label, s in sessions.items():
+            for outcome in ("sent", "failed"):
+                labels = _labels(session=label, outcome=outcome)
+                lines.append(f"{prefix}_session_messages_total{labels} {s[outcome]}")
+        family("session_bytes_total", "counter", "JSON bytes sent per session.")
+        for label, s in sessions.items():
+            lines.append(
+                f"{prefix}_session_bytes_total{_labels(session=label)} {s['bytes']}"
+            )
+    return "\n".join(lines) + "\n"
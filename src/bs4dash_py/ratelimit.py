@@ -0,0 +1,261 @@
+"""Throttle and debounce policies for server helper messages.
+
+Streaming sources can call helpers such as `update_sidebar_badges` hundreds
+of times per second. Rate policies set on a session bound how often each
+target is updated in the browser while guaranteeing the final value is
+delivered by a trailing-edge flush:
+
+- `throttle(name, hz=4)`: the first update for a target is sent at once;
+  later updates within the interval are held (superseding each other) and
+  the latest is sent when the interval ends.
+- `debounce(name, ms=250, max_ms=None)`: updates are held until the target
+  has been quiet for `ms`; `max_ms` bounds how long a continuous stream can
+  delay delivery.
+
+Policies apply per message name and per target: each tab (`tab_id`), nav
+(`nav_id`) and page-wide element (sidebar menu, badges, active item) is
+limited separately, and held badge updates are merged per href. Messages
+that can't be superseded (a controlbar `toggle`) are never held.
+
+    from bs4dash_py import debounce, set_rate_limits, throttle
+
+    def server(input, output, session):
+        set_rate_limits(
+            session,
+            throttle("bs4dash_update_sidebar_badges", hz=4),
+            debounce("bs4dash_update_tab_content", ms=250),
+        )
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from typing import Any, Optional
+
+from . import server
+
+THROTTLE = "throttle"
+DEBOUNCE = "debounce"
+
+
+class RatePolicy:
+    """How often messages named `name` may be sent, per target.
+
+    - name: custom message name (e.g., "bs4dash_update_sidebar_badges")
+    - kind: `THROTTLE` or `DEBOUNCE`
+    - interval: seconds between sends (throttle) or of quiet (debounce)
+    - max_wait: debounce only, seconds after which held updates are sent
+      even if updates keep arriving (None: no bound)
+    """
+
+    def __init__(
+        self, name: str, kind: str, interval: float, max_wait: Optional[float] = None
+    ):
+        if kind not in (THROTTLE, DEBOUNCE):
+            raise ValueError(f"kind must be {THROTTLE!r} or {DEBOUNCE!r}")
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.name = name
+        self.kind = kind
+        self.interval = interval
+        self.max_wait = max_wait
+
+    def __repr__(self):
+        return f"RatePolicy({self.name!r}, {self.kind!r}, {self.interval!r})"
+
+
+def throttle(
+    name: str, hz: Optional[float] = None, ms: Optional[float] = None
+) -> RatePolicy:
+    """Send at most `hz` updates per second (or one every `ms`) per target."""
+    if (hz is None) == (ms is None):
+        raise ValueError("pass exactly one of hz or ms")
+    interval = 1.0 / hz if hz is not None else ms / 1000.0
+    return RatePolicy(name, THROTTLE, interval)
+
+
+def debounce(name: str, ms: float, max_ms: Optional[float] = None) -> RatePolicy:
+    """Send a target's latest update once it has been quiet for `ms`.
+
+    - max_ms: send held updates at the latest `max_ms` after the first one
+    """
+    max_wait = max_ms / 1000.0 if max_ms is not None else None
+    return RatePolicy(name, DEBOUNCE, ms / 1000.0, max_wait)
+
+
+class _Entry:
+    """Rate state for one target."""
+
+    __slots__ = ("last", "first", "deadline", "pending", "armed")
+
+    def __init__(self):
+        self.last = float("-inf")
+        self.first = None
+        self.deadline = 0.0
+        self.pending = None
+        self.armed = False
+
+
+class _Limiter:
+    """Holds back rate-limited messages for one session."""
+
+    def __init__(self, session: Any, policies: dict, loop):
+        # weak: the limiter is kept in the session's weakly keyed state
+        self._session = weakref.ref(session)
+        self.policies = policies
+        self.loop = loop
+        self.entries: dict = {}
+        self.lock = threading.Lock()
+        self.closed = False
+
+    @property
+    def session(self) -> Any:
+        """The session held messages are sent to (None once it is gone)."""
+        return self._session()
+
+    def hold(self, name: str, payload: dict) -> bool:
+        """Return True when the message is held for a trailing-edge flush."""
+        policy = self.policies.get(name)
+        if policy is None or self.closed:
+            return False
+        key = server._coalesce_key(name, payload)
+        if key is None:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            e = self.entries.get(key)
+            if e is None:
+                e = self.entries[key] = _Entry()
+            if policy.kind == THROTTLE:
+                if e.pending is None and now - e.last >= policy.interval:
+                    # leading edge: send now
+                    e.last = now
+                    return False
+                deadline = e.last + policy.interval
+            else:
+                if e.first is None:
+                    e.first = now
+                deadline = now + policy.interval
+                if policy.max_wait is not None:
+                    deadline = min(deadline, e.first + policy.max_wait)
+            if e.pending is not None:
+                payload = server._merge_payloads(name, e.pending[1], payload)
+            if not e.armed:
+                if not self._schedule(key, deadline - now):
+                    # loop closed: nothing would flush, so send it now
+                    e.pending, e.first, e.last = None, None, now
+                    return False
+                e.armed = True
+            e.pending = (name, payload)
+            e.deadline = deadline
+        return True
+
+    def _schedule(self, key, delay: float) -> bool:
+        """Call `_fire(key)` on the loop after `delay` seconds, if it is open."""
+        loop = self.loop
+        delay = max(delay, 0)
+        try:
+            if getattr(loop, "_thread_id", None) == threading.get_ident():
+                loop.call_later(delay, self._fire, key)
+            else:
+                loop.call_soon_threadsafe(loop.call_later, delay, self._fire, key)
+        except RuntimeError:
+            return False
+        return True
+
+    def _fire(self, key) -> None:
+        now = time.monotonic()
+        with self.lock:
+            e = self.entries.get(key)
+            if e is None or e.pending is None or self.closed:
+                if e is not None:
+                    e.armed = False
+                return
+            # a debounced update may have moved the deadline; wait for it
+            if e.deadline - now > 0.001 and self._schedule(key, e.deadline - now):
+                return
+            message, e.pending = e.pending, None
+            e.armed = False
+            e.first = None
+            e.last = now
+        self._send(*message)
+
+    def _send(self, name: str, payload: dict) -> None:
+        session = self.session
+        if session is None:
+            return
+        try:
+            server._send_released(session, name, payload)
+        except Exception:
+            # Best-effort: swallow errors to avoid breaking user apps
+            pass
+
+    def flush(self) -> None:
+        """Send every held message now."""
+        now = time.monotonic()
+        with self.lock:
+            messages = []
+            for e in self.entries.values():
+                if e.pending is not None:
+                    messages.append(e.pending)
+                    e.pending, e.first, e.last = None, None, now
+        for message in messages:
+            self._send(*message)
+
+    def close(self) -> None:
+        """Stop holding messages and drop those still held."""
+        with self.lock:
+            self.closed = True
+            self.entries.clear()
+
+
+def set_rate_limits(session: Any, *policies: RatePolicy, loop=None) -> None:
+    """Apply `throttle`/`debounce` policies to helper messages for `session`.
+
+    Call it from the server function (so trailing-edge flushes run on the
+    session's loop) or pass `loop`; without a running loop the shared send
+    loop is used. Replaces the session's previous policies, sending any
+    messages they still held. Held messages are dropped when the session
+    ends, if the session supports `on_ended`.
+    """
+    if loop is None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            dispatcher = server._session_state(session).dispatcher
+            loop = dispatcher.loop if dispatcher is not None else None
+    if loop is None:
+        loop = server._get_shared_loop()
+    limiter = _Limiter(session, {p.name: p for p in policies}, loop)
+    state = server._session_state(session)
+    with state.lock:
+        previous, state.limiter = state.limiter, limiter
+    if previous is not None:
+        previous.flush()
+        previous.close()
+    on_ended = getattr(session, "on_ended", None)
+    if callable(on_ended):
+        try:
+            on_ended(limiter.close)
+        except Exception:
+            pass
+
+
+def clear_rate_limits(session: Any, flush: bool = True) -> None:
+    """Remove the session's rate limits; send held messages unless `flush=False`."""
+    state = server._session_state(session)
+    with state.lock:
+        limiter, state.limiter = state.limiter, None
+    if limiter is None:
+        return
+    if flush:
+        limiter.flush()
+    limiter.close()
+
+
+def flush_rate_limits(session: Any) -> None:
+    """Send the messages currently held by the session's rate limits."""
+    limiter = server._session_state(session).limiter
+    if limiter is not None:
+        limiter.flush()
@@ -1,6 +1,13 @@
 import asyncio
 import inspect
-from typing import Any
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from .shadow import ShadowState
+from .sidebar_data import compact_menu
 
 """Server-side helpers for sending custom messages to client-side handlers.
 
@@ -10,8 +17,8 @@ both synchronous session APIs (methods that perform sends immediately) and
 asynchronous session APIs (async methods or methods that return awaitables).
 
 Behavior when an async method or awaitable is detected:
-- If no running event loop is found, the coroutine is run to completion via
-  `asyncio.run`.
+- If no running event loop is found, the coroutine is run to completion on a
+  shared, long-lived event loop running in a background thread.
 - If a running loop exists on the current thread, the coroutine is scheduled
   with `loop.create_task`.
 - If a running loop exists on another thread, the coroutine is scheduled
@@ -19,8 +26,360 @@ Behavior when an async method or awaitable is detected:
 
 This reduces "coroutine was never awaited" warnings and works across a
 variety of Shiny session implementations.
+
+Each helper also has an awaitable counterpart (e.g., `aupdate_sidebar_badges`)
+that awaits the session's send on the caller's loop, so async servers can
+wait for delivery and apply backpressure.
+
+Batching: inside a Shiny reactive flush (or an explicit ``with batch(session):``
+block) helper messages are queued per session, superseded updates to the same
+target are coalesced, and the queue is shipped as a single ``bs4dash_batch``
+message that the client applies in one pass.
 """
 
+# Message name used to ship a batch of queued helper messages
+BATCH_MESSAGE = "bs4dash_batch"
+
+# Field in the payload identifying the target a message updates. `None` means
+# the message targets a single page-wide element (e.g., the sidebar menu).
+_TARGET_FIELDS = {
+    "bs4dash_update_sidebar": None,
+    "bs4dash_update_sidebar_virtual": None,
+    "bs4dash_update_sidebar_active": None,
+    "bs4dash_update_sidebar_badges": None,
+    "bs4dash_update_navs": "nav_id",
+    "bs4dash_update_nav_items": "nav_id",
+    "bs4dash_update_tab_content": "tab_id",
+    "bs4dash_unload_tab": "tab_id",
+}
+
+
+def _coalesce_key(name: str, payload: dict):
+    """Return a key identifying the target updated by a message, or None.
+
+    Two queued messages with the same key update the same target, so the
+    later one supersedes the earlier one. `None` means the message must not
+    be coalesced (e.g., a controlbar `toggle`, which is not idempotent).
+    """
+    if name == "bs4dash_controlbar":
+        action = (payload or {}).get("action")
+        return (name,) if action in ("show", "hide") else None
+    if name not in _TARGET_FIELDS:
+        return None
+    field = _TARGET_FIELDS[name]
+    if field is None:
+        return (name,)
+    return (name, (payload or {}).get(field))
+
+
+def _merge_payloads(name: str, old: dict, new: dict) -> dict:
+    """Combine a pending payload with a newer one for the same target.
+
+    Badge updates are merged per href (later values win); other messages
+    are superseded by the newer payload.
+    """
+    if name == "bs4dash_update_sidebar_badges":
+        merged = {b.get("href"): b for b in old.get("badges", [])}
+        merged.update({b.get("href"): b for b in new.get("badges", [])})
+        return {"badges": list(merged.values())}
+    return new
+
+
+class _SessionState:
+    """Per-session bookkeeping shared by the server helpers."""
+
+    def __init__(self, session: Any = None):
+        self.lock = threading.RLock()
+        self.batch = None
+        # cached send strategy: (method_name, style, is_async)
+        self.sender = None
+        self.can_flush = callable(getattr(session, "on_flush", None))
+        # cross-thread delivery dispatcher (see `bs4dash_py.dispatch`)
+        self.dispatcher = None
+        # what the client was last sent, when enabled (see `bs4dash_py.shadow`)
+        self.shadow = None
+        # throttle/debounce policies, when set (see `bs4dash_py.ratelimit`)
+        self.limiter = None
+        # why the last send failed (exception type or "no_sender")
+        self.error = None
+        # client ack tracking, when enabled (see `bs4dash_py.acks`)
+        self.acks = None
+        # fragments the client holds, when enabled (see `bs4dash_py.content_cache`)
+        self.content_cache = None
+        # lazy tab panes by tabs id, when used (see `bs4dash_py.lazy`)
+        self.lazy_tabs = None
+        self.lazy_boxes = None
+        # hold messages while the page is hidden (see `bs4dash_py.background`);
+        # `hidden` is the buffer of held messages, None while visible
+        self.background_hold = False
+        self.hidden = None
+
+
+# delivery metrics store when enabled (see `bs4dash_py.metrics`)
+_metrics = None
+
+_STATES: "weakref.WeakKeyDictionary[Any, _SessionState]" = weakref.WeakKeyDictionary()
+_STATES_LOCK = threading.Lock()
+
+
+def _session_state(session: Any) -> _SessionState:
+    """Return the helper state for `session`, creating it on first use.
+
+    State is weakly keyed by the session so it goes away with the session.
+    Sessions that can't be weakly referenced keep it on an attribute instead.
+    """
+    try:
+        state = _STATES.get(session)
+        if state is not None:
+            return state
+        with _STATES_LOCK:
+            state = _STATES.get(session)
+            if state is None:
+                state = _STATES[session] = _SessionState(session)
+            return state
+    except TypeError:
+        pass
+    state = getattr(session, "_bs4dash_state", None)
+    if isinstance(state, _SessionState):
+        return state
+    state = _SessionState(session)
+    try:
+        setattr(session, "_bs4dash_state", state)
+    except Exception:
+        # degrade gracefully: state is not kept between calls
+        pass
+    return state
+
+
+class _Batch:
+    """Queue of pending messages for one session, coalesced by target."""
+
+    def __init__(self, auto: bool = False):
+        self.thread_id = threading.get_ident()
+        self.depth = 0
+        # opened for a reactive flush, not by a `batch` block
+        self.auto = auto
+        # key -> (name, payload, number of uncoalesced `name` messages before it)
+        self.entries: dict = {}
+        self._seq = 0
+        self._uncoalesced: dict = {}
+
+    def add(self, name: str, payload: dict) -> None:
+        key = _coalesce_key(name, payload)
+        if key is None:
+            # never coalesced: give it a unique key to keep its position
+            key = ("", self._seq)
+            self._seq += 1
+            self._uncoalesced[name] = self._uncoalesced.get(name, 0) + 1
+        count = self._uncoalesced.get(name, 0)
+        previous = self.entries.get(key)
+        if previous is not None:
+            payload = _merge_payloads(name, previous[1], payload)
+            if previous[2] != count:
+                # e.g. show, toggle, hide: the update must stay after the toggle
+                del self.entries[key]
+        # otherwise updated in place, keeping its order relative to the others
+        self.entries[key] = (name, payload, count)
+
+    def messages(self) -> list:
+        return [{"type": n, "data": p} for n, p, _ in self.entries.values()]
+
+
+_get_current_context = None
+
+
+def _in_reactive_context() -> bool:
+    """Return True when called from inside a Shiny reactive context."""
+    global _get_current_context
+    if _get_current_context is None:
+        try:
+            from shiny.reactive import get_current_context
+        except Exception:
+            get_current_context = False
+        _get_current_context = get_current_context
+    if not _get_current_context:
+        return False
+    try:
+        _get_current_context()
+    except Exception:
+        return False
+    return True
+
+
+def _queue_message(
+    session: Any,
+    name: str,
+    payload: dict,
+    state: "_SessionState" = None,
+    auto: bool = True,
+) -> bool:
+    """Queue a message on the session's open batch, if there is one.
+
+    A batch is opened automatically when a helper is called during a Shiny
+    reactive flush; it is shipped by a `session.on_flush` callback. With
+    `auto=False` only a `batch` block queues the message. Returns True when
+    the message was queued instead of sent.
+    """
+    if state is None:
+        state = _session_state(session)
+    if state.batch is None and not (auto and state.can_flush):
+        # fast path: no open batch and no reactive flush to batch within
+        return False
+    with state.lock:
+        b = state.batch
+        if b is not None and b.auto and not auto:
+            return False
+        if b is None and state.can_flush and auto:
+            if _in_reactive_context():
+                b = state.batch = _Batch(auto=True)
+                b.depth = 1
+
+                async def _ship():
+                    await _aclose_batch(session, b)
+
+                try:
+                    session.on_flush(_ship, once=True)
+                except Exception:
+                    state.batch = None
+                    return False
+        if b is None or b.thread_id != threading.get_ident():
+            return False
+        b.add(name, payload)
+        return True
+
+
+def _take_batch(session: Any, expected: "_Batch" = None):
+    """Leave one batch level; return the (name, payload) to ship, if any.
+
+    Returns None while outer batch levels are still open or when nothing was
+    queued. A single queued message is returned as itself, unwrapped. With
+    `expected`, only that batch is closed (it may have shipped already).
+    """
+    state = _session_state(session)
+    with state.lock:
+        b = state.batch
+        if b is None or (expected is not None and b is not expected):
+            return None
+        b.depth -= 1
+        if b.depth > 0:
+            return None
+        state.batch = None
+    return _batch_message(b)
+
+
+def _batch_message(b: _Batch):
+    messages = b.messages()
+    if not messages:
+        return None
+    if len(messages) == 1:
+        return messages[0]["type"], messages[0]["data"]
+    return BATCH_MESSAGE, {"messages": messages}
+
+
+def _ship_auto_batch(state: "_SessionState", name: str, payload: dict) -> tuple:
+    """Return the message to send now, shipping an open reactive-flush batch.
+
+    The message joins the batch, so it still follows what was queued before.
+    """
+    with state.lock:
+        b = state.batch
+        if b is None or not b.auto or b.thread_id != threading.get_ident():
+            return name, payload
+        state.batch = None
+    b.add(name, payload)
+    return _batch_message(b)
+
+
+async def _aship_auto_batch(session: Any) -> bool:
+    """Send the batch opened for the current reactive flush now, if any."""
+    state = _session_state(session)
+    with state.lock:
+        b = state.batch
+        if b is None or not b.auto or b.thread_id != threading.get_ident():
+            return True
+        state.batch = None
+    message = _batch_message(b)
+    if message is None:
+        return True
+    return await _adispatch_custom_message(session, *message)
+
+
+def _close_batch(session: Any) -> bool:
+    """Leave one batch level; ship the queue when the outermost level closes."""
+    message = _take_batch(session)
+    if message is None:
+        return True
+    return _deliver(session, *message)
+
+
+async def _aclose_batch(session: Any, expected: "_Batch" = None) -> bool:
+    """Awaitable counterpart of `_close_batch`."""
+    message = _take_batch(session, expected)
+    if message is None:
+        return True
+    return await _adispatch_custom_message(session, *message)
+
+
+@contextmanager
+def batch(session: Any):
+    """Queue helper messages sent to `session` and ship them as one message.
+
+    Within the block, helper calls (e.g., `update_sidebar_badges`) made from
+    the same thread are queued; updates superseding earlier ones for the
+    same target are coalesced. On exit, the queue is sent as a single
+    `bs4dash_batch` message. Blocks may be nested; the outermost one ships.
+
+    Example:
+        with batch(session):
+            update_sidebar_badges(session, [{"href": "#a", "badge": "1"}])
+            update_tab_content(session, "t1", "<p>Done</p>")
+    """
+    state = _session_state(session)
+    with state.lock:
+        b = state.batch
+        if b is None:
+            b = state.batch = _Batch()
+        elif b.thread_id != threading.get_ident():
+            # another thread owns the open batch; send our messages directly
+            b = None
+        if b is not None:
+            b.depth += 1
+            # ships when the block ends, even if it was opened for a flush
+            b.auto = False
+    try:
+        yield
+    finally:
+        if b is not None:
+            _close_batch(session)
+
+
+def enable_shadow_state(session: Any) -> None:
+    """Keep a shadow of the client UI state and send only what changed.
+
+    Afterwards `update_sidebar` and `update_navbar_items` send keyed
+    insert/remove/update/move patches, `update_sidebar_badges` sends only
+    changed badges, and unchanged updates (including a repeated
+    `update_sidebar_active`) are not sent at all. Use it when the server is
+    the only source of these updates; call `reset_shadow_state` after the
+    client changes them on its own, to force the next messages in full.
+    """
+    state = _session_state(session)
+    with state.lock:
+        if state.shadow is None:
+            state.shadow = ShadowState()
+
+
+def disable_shadow_state(session: Any) -> None:
+    """Stop tracking client UI state for `session`; send full updates again."""
+    _session_state(session).shadow = None
+
+
+def reset_shadow_state(session: Any) -> None:
+    """Forget the tracked client UI state so the next updates are sent in full."""
+    shadow = _session_state(session).shadow
+    if shadow is not None:
+        shadow.reset()
+
 
 def _send_controlbar_message(session: Any, action: str = "toggle") -> bool:
     """Send a controlbar message to the client using the Shiny session.
@@ -33,96 +392,439 @@ def _send_controlbar_message(session: Any, action: str = "toggle") -> bool:
     return _send_custom_message(session, "bs4dash_controlbar", payload)
 
 
+class _Capture:
+    """Stand-in session that records what helpers send, without delivering.
+
+    Used by `broadcast` to build a message once for many sessions; recorded
+    messages skip the per-session pipeline and aren't counted in metrics.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+
 # Generic custom message sender used by other helpers
 def _send_custom_message(session: Any, name: str, payload: dict) -> bool:
-    """Send a custom message to the client. Tries multiple session APIs.
+    """Send a custom message to the client, or queue it on an open batch.
 
-    This function supports both synchronous and coroutine-based session
-    methods. If the underlying method returns an awaitable or is an
-    `async def`, it will be awaited when possible or scheduled as a task
-    on the running loop.
+    Messages held back by the session's rate limits return True; they are
+    delivered by a trailing-edge flush. So do messages held while the page
+    is hidden; they are delivered when it is shown.
     """
-    candidates = [
-        "send_custom_message",
-        "send_message",
-        "send",
-        "sendCustomMessage",
-        "send_input_message",
-        "sendInputMessage",
-    ]
-
-    def _maybe_await(res):
-        # If the result is awaitable, try to run or schedule it instead of
-        # letting it leak a coroutine and produce a RuntimeWarning.
-        try:
-            if inspect.isawaitable(res):
+    if isinstance(session, _Capture):
+        session.messages.append((name, payload))
+        return True
+    state = _session_state(session)
+    if state.hidden is not None and _hold_hidden(state, name, payload):
+        return True
+    limiter = state.limiter
+    if limiter is not None and limiter.hold(name, payload):
+        return True
+    if _queue_message(session, name, payload, state):
+        return True
+    return _deliver(session, name, payload, state)
+
+
+def _send_released(session: Any, name: str, payload: dict) -> bool:
+    """Send a message a rate limit held back, the way it would have gone then.
+
+    It is held if the page is hidden by now, or queued on an open batch.
+    """
+    state = _session_state(session)
+    if state.hidden is not None and _hold_hidden(state, name, payload):
+        return True
+    if _queue_message(session, name, payload, state):
+        return True
+    return _deliver(session, name, payload, state)
+
+
+def _hold_hidden(state: "_SessionState", name: str, payload: dict) -> bool:
+    """Buffer a message while the client's page is hidden; True if held."""
+    with state.lock:
+        buffer = state.hidden
+        if buffer is None:
+            return False
+        buffer.add(name, payload)
+        return True
+
+
+def _deliver(
+    session: Any, name: str, payload: dict, state: "_SessionState" = None
+) -> bool:
+    """Send now, or hand off to the session's dispatcher from other threads."""
+    if state is None:
+        state = _session_state(session)
+    dispatcher = state.dispatcher
+    if dispatcher is not None and dispatcher.accepts_from_current_thread():
+        return dispatcher.submit(name, payload)
+    return _dispatch_custom_message(session, name, payload, state)
+
+
+# Session methods probed, in order, to find one that sends custom messages
+_SEND_CANDIDATES = (
+    "send_custom_message",
+    "send_message",
+    "send",
+    "sendCustomMessage",
+    "send_input_message",
+    "sendInputMessage",
+)
+
+# Signature styles: fn(name, payload) or fn({"type": name, "data": payload})
+_PAIR = "pair"
+_DICT = "dict"
+
+
+_shared_loop = None
+_shared_loop_lock = threading.Lock()
+
+
+def _get_shared_loop() -> asyncio.AbstractEventLoop:
+    """Return the long-lived event loop used to run sends for sync callers.
+
+    The loop runs forever in a daemon thread, created on first use, so sync
+    callers without a running loop don't create and tear down a new event
+    loop (as `asyncio.run` would) for every message.
+    """
+    global _shared_loop
+    with _shared_loop_lock:
+        if _shared_loop is None or _shared_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            t = threading.Thread(
+                target=loop.run_forever, name="bs4dash-send-loop", daemon=True
+            )
+            t.start()
+            _shared_loop = loop
+        return _shared_loop
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+def _run_on_shared_loop(awaitable):
+    """Run `awaitable` on the shared loop and wait for its result."""
+    if not asyncio.iscoroutine(awaitable):
+        awaitable = _await(awaitable)
+    future = asyncio.run_coroutine_threadsafe(awaitable, _get_shared_loop())
+    return future.result()
+
+
+def _maybe_await(res) -> None:
+    """Run or schedule `res` if it is awaitable, instead of leaking it."""
+    # If the result is awaitable, try to run or schedule it instead of
+    # letting it leak a coroutine and produce a RuntimeWarning.
+    try:
+        if inspect.isawaitable(res):
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # No running loop: run to completion on the shared loop
+                _run_on_shared_loop(res)
+            else:
+                # If the loop is running in a different thread, use
+                # run_coroutine_threadsafe which is thread-safe.
                 try:
-                    loop = asyncio.get_running_loop()
-                except RuntimeError:
-                    # No running loop, run to completion
-                    asyncio.run(res)
-                else:
-                    # If the loop is running in a different thread, use
-                    # run_coroutine_threadsafe which is thread-safe.
-                    try:
-                        import threading
-
-                        if (
-                            getattr(loop, "_thread_id", None) is not None
-                            and getattr(loop, "_thread_id") != threading.get_ident()
-                        ):
-                            asyncio.run_coroutine_threadsafe(res, loop)
-                            return
-                    except Exception:
-                        # Fall back to attempting create_task
-                        pass
+                    if (
+                        getattr(loop, "_thread_id", None) is not None
+                        and getattr(loop, "_thread_id") != threading.get_ident()
+                    ):
+                        asyncio.run_coroutine_threadsafe(res, loop)
+                        return
+                except Exception:
+                    # Fall back to attempting create_task
+                    pass
 
-                    # Running loop on this thread: schedule as a task
+                # Running loop on this thread: schedule as a task
+                try:
+                    loop.create_task(res)
+                except Exception:
+                    # Fallbacks if create_task fails
                     try:
-                        loop.create_task(res)
+                        asyncio.run_coroutine_threadsafe(res, loop)
                     except Exception:
-                        # Fallbacks if create_task fails
                         try:
-                            asyncio.run_coroutine_threadsafe(res, loop)
+                            asyncio.ensure_future(res)
                         except Exception:
-                            try:
-                                asyncio.ensure_future(res)
-                            except Exception:
-                                pass
-        except Exception:
-            # Best-effort: swallow errors to avoid breaking user apps
-            pass
+                            pass
+    except Exception:
+        # Best-effort: swallow errors to avoid breaking user apps
+        pass
 
-    for m in candidates:
+
+def _call_sender(fn, style: str, name: str, payload: dict):
+    """Call a session send method using the given signature style."""
+    if style == _PAIR:
+        return fn(name, payload)
+    return fn({"type": name, "data": payload})
+
+
+def _resolve_and_send(
+    session: Any, name: str, payload: dict, skip=None, state: "_SessionState" = None
+):
+    """Probe the session's send methods; return the strategy that worked.
+
+    The strategy is a `(method_name, style, is_async)` tuple, or None when no
+    candidate method accepted the message. `skip` names a method to leave out.
+    When `state` is given, the type of the last error is kept in `state.error`.
+    """
+    for m in _SEND_CANDIDATES:
+        if m == skip:
+            continue
         fn = getattr(session, m, None)
+        if not callable(fn):
+            continue
+        is_async = inspect.iscoroutinefunction(fn)
+        try:
+            # Try (name, payload) signature first
+            _maybe_await(_call_sender(fn, _PAIR, name, payload))
+            return (m, _PAIR, is_async)
+        except TypeError:
+            # Try a single-dict signature
+            try:
+                _maybe_await(_call_sender(fn, _DICT, name, payload))
+                return (m, _DICT, is_async)
+            except Exception as e:
+                # give up on this method and try next
+                if state is not None and not isinstance(e, TypeError):
+                    state.error = type(e).__name__
+                continue
+        except Exception as e:
+            if state is not None:
+                state.error = type(e).__name__
+            continue
+    return None
+
+
+def _reduce_with(reducer: Any, name: str, payload: dict):
+    """Reduce a message (or each message of a batch) with `reducer.reduce`.
+
+    Reducers track what the client holds (`ShadowState`, `ContentCache`).
+    Returns the (name, payload) to send, or None when nothing changed.
+    """
+    if name != BATCH_MESSAGE:
+        return reducer.reduce(name, payload)
+    messages = []
+    for m in payload.get("messages", []):
+        reduced = reducer.reduce(m["type"], m["data"])
+        if reduced is not None:
+            messages.append({"type": reduced[0], "data": reduced[1]})
+    if not messages:
+        return None
+    if len(messages) == 1:
+        return messages[0]["type"], messages[0]["data"]
+    return name, {"messages": messages}
+
+
+def _reduce_for_client(state: "_SessionState", name: str, payload: dict):
+    """Reduce a message against what the client already holds, if tracked.
+
+    Applies the session's shadow state, then its content cache. Returns the
+    (name, payload) to send, or None when there is nothing to send.
+    """
+    for reducer in (state.shadow, state.content_cache):
+        if reducer is not None:
+            message = _reduce_with(reducer, name, payload)
+            if message is None:
+                return None
+            name, payload = message
+    return name, payload
+
+
+def _reset_client_state(state: "_SessionState") -> None:
+    """Forget what the client holds after a failed send."""
+    for reducer in (state.shadow, state.content_cache):
+        if reducer is not None:
+            reducer.reset()
+
+
+def _dispatch_custom_message(
+    session: Any, name: str, payload: dict, state: "_SessionState" = None
+) -> bool:
+    """Send a custom message to the client. Tries multiple session APIs.
+
+    This function supports both synchronous and coroutine-based session
+    methods. If the underlying method returns an awaitable or is an
+    `async def`, it will be awaited when possible or scheduled as a task
+    on the running loop.
+
+    When shadow state is enabled for the session, the message is first
+    reduced to a minimal patch (or dropped when it changes nothing); with a
+    content cache, tab content the client holds is replaced by its hash.
+    """
+    if state is None:
+        state = _session_state(session)
+    message = _reduce_for_client(state, name, payload)
+    if message is None:
+        return True
+    name, payload = message
+    acks = state.acks
+    if acks is not None:
+        payload = acks.stamp(name, payload)
+    metrics = _metrics
+    if metrics is None:
+        ok = _send_with_strategy(session, name, payload, state)
+    else:
+        start = time.perf_counter()
+        ok = _send_with_strategy(session, name, payload, state)
+        elapsed = time.perf_counter() - start
+        metrics.observe(session, name, payload, ok, elapsed, state.error)
+    if not ok:
+        _reset_client_state(state)
+    return ok
+
+
+def _send_with_strategy(
+    session: Any, name: str, payload: dict, state: "_SessionState"
+) -> bool:
+    """Send using the session's cached send strategy, resolving it if needed.
+
+    The send strategy that worked (method, signature style, sync/async) is
+    cached in the session's weakly keyed state, so later sends skip the
+    probing. A cached strategy that fails is dropped and re-resolved.
+    """
+    strategy = state.sender
+    state.error = None
+    if strategy is not None:
+        method, style, is_async = strategy
+        fn = getattr(session, method, None)
         if callable(fn):
             try:
-                # If the method itself is async, call and await/schedule it
-                if inspect.iscoroutinefunction(fn):
-                    coro = fn(name, payload)
-                    _maybe_await(coro)
-                    return True
-
-                # Try (name, payload) signature first
-                res = fn(name, payload)
-                _maybe_await(res)
+                res = _call_sender(fn, style, name, payload)
+                if is_async or res is not None:
+                    _maybe_await(res)
                 return True
+            except Exception as e:
+                state.error = type(e).__name__
+        state.sender = None
+        strategy = _resolve_and_send(session, name, payload, method, state)
+    else:
+        strategy = _resolve_and_send(session, name, payload, state=state)
+    if strategy is None:
+        state.error = state.error or "no_sender"
+        return False
+    state.sender = strategy
+    return True
+
+
+async def _aresolve_and_send(
+    session: Any, name: str, payload: dict, skip=None, state: "_SessionState" = None
+):
+    """Awaitable counterpart of `_resolve_and_send`; awaits delivery."""
+    for m in _SEND_CANDIDATES:
+        if m == skip:
+            continue
+        fn = getattr(session, m, None)
+        if not callable(fn):
+            continue
+        is_async = inspect.iscoroutinefunction(fn)
+        for style in (_PAIR, _DICT):
+            try:
+                res = _call_sender(fn, style, name, payload)
             except TypeError:
-                # Try a single-dict signature
-                try:
-                    if inspect.iscoroutinefunction(fn):
-                        coro = fn({"type": name, "data": payload})
-                        _maybe_await(coro)
-                    else:
-                        res = fn({"type": name, "data": payload})
-                        _maybe_await(res)
-                    return True
-                except Exception:
-                    # give up on this method and try next
-                    continue
-            except Exception:
+                # Try the next signature style
                 continue
-    return False
+            except Exception as e:
+                if state is not None:
+                    state.error = type(e).__name__
+                break
+            if inspect.isawaitable(res):
+                try:
+                    await res
+                except Exception as e:
+                    if state is not None:
+                        state.error = type(e).__name__
+                    return None
+            return (m, style, is_async)
+    return None
+
+
+async def _adispatch_custom_message(
+    session: Any, name: str, payload: dict, state: "_SessionState" = None
+) -> bool:
+    """Send a custom message and await its delivery by the session.
+
+    Uses the same shadow state and cached send strategy as
+    `_dispatch_custom_message`, but awaits the session's send coroutine on
+    the caller's loop instead of scheduling it, so callers get real
+    completion and backpressure. Returns False when no method accepted the
+    message or the send failed.
+    """
+    if state is None:
+        state = _session_state(session)
+    message = _reduce_for_client(state, name, payload)
+    if message is None:
+        return True
+    name, payload = message
+    acks = state.acks
+    if acks is not None:
+        payload = acks.stamp(name, payload)
+    metrics = _metrics
+    if metrics is None:
+        ok = await _asend_with_strategy(session, name, payload, state)
+    else:
+        start = time.perf_counter()
+        ok = await _asend_with_strategy(session, name, payload, state)
+        elapsed = time.perf_counter() - start
+        metrics.observe(session, name, payload, ok, elapsed, state.error)
+    if not ok:
+        _reset_client_state(state)
+    return ok
+
+
+async def _asend_with_strategy(
+    session: Any, name: str, payload: dict, state: "_SessionState"
+) -> bool:
+    """Awaitable counterpart of `_send_with_strategy`; awaits delivery."""
+    strategy = state.sender
+    state.error = None
+    skip = None
+    if strategy is not None:
+        method, style, is_async = strategy
+        fn = getattr(session, method, None)
+        if callable(fn):
+            try:
+                res = _call_sender(fn, style, name, payload)
+            except Exception as e:
+                state.error = type(e).__name__
+            else:
+                if is_async or inspect.isawaitable(res):
+                    try:
+                        await res
+                    except Exception as e:
+                        state.error = type(e).__name__
+                        return False
+                return True
+        state.sender = None
+        skip = method
+    strategy = await _aresolve_and_send(session, name, payload, skip, state)
+    if strategy is None:
+        state.error = state.error or "no_sender"
+        return False
+    state.sender = strategy
+    return True
+
+
+async def _asend_custom_message(session: Any, name: str, payload: dict) -> bool:
+    """Awaitable counterpart of `_send_custom_message`.
+
+    The message is sent, and its delivery awaited, even during a reactive
+    flush: messages queued for the flush so far go out with it, as one
+    batch. Messages queued in a `batch` block return True immediately and
+    are delivered when the block ends, messages held back by rate limits
+    when the limit's trailing-edge flush runs, and messages held for a
+    hidden page when it is shown.
+    """
+    state = _session_state(session)
+    if state.hidden is not None and _hold_hidden(state, name, payload):
+        return True
+    limiter = state.limiter
+    if limiter is not None and limiter.hold(name, payload):
+        return True
+    if _queue_message(session, name, payload, state, auto=False):
+        return True
+    name, payload = _ship_auto_batch(state, name, payload)
+    return await _adispatch_custom_message(session, name, payload, state)
 
 
 def update_sidebar(session: Any, menu: list[dict]) -> bool:
@@ -134,6 +836,16 @@ def update_sidebar(session: Any, menu: list[dict]) -> bool:
     return _send_custom_message(session, "bs4dash_update_sidebar", payload)
 
 
+def update_virtual_sidebar(session: Any, menu: list) -> bool:
+    """Replace the menu of a virtualized sidebar (`sidebar_shiny(virtual=True)`).
+
+    - menu: entries as accepted by `sidebar_shiny` (items, groups, headers,
+      dividers); they are sent as compact data, not markup
+    """
+    payload = compact_menu(menu)
+    return _send_custom_message(session, "bs4dash_update_sidebar_virtual", payload)
+
+
 def update_navbar_tabs(session: Any, nav_id: str, tabs: list[dict]) -> bool:
     """Request the client to update navbar tabs.
 
@@ -190,11 +902,96 @@ def update_navbar_items(session: Any, nav_id: str, items: list[dict]) -> bool:
     return _send_custom_message(session, "bs4dash_update_nav_items", payload)
 
 
-def update_tab_content(session: Any, tab_id: str, content: str) -> bool:
+def _tab_content_payload(tab_id: str, content: str, deps: Optional[list]) -> dict:
+    payload = {"tab_id": tab_id, "content": content}
+    if deps:
+        payload["deps"] = deps
+    return payload
+
+
+def update_tab_content(
+    session: Any, tab_id: str, content: str, deps: Optional[list] = None
+) -> bool:
     """Replace the inner HTML content of a tab pane.
 
     - tab_id: id of the tab pane to update
     - content: HTML string to set as innerHTML
+    - deps: HTML dependencies of the content, as rendered by Shiny's
+      `session._process_ui`; the client loads them before inserting it
     """
-    payload = {"tab_id": tab_id, "content": content}
+    payload = _tab_content_payload(tab_id, content, deps)
     return _send_custom_message(session, "bs4dash_update_tab_content", payload)
+
+
+# Awaitable counterparts: these await the session's send instead of
+# scheduling it, so async servers get delivery completion and backpressure.
+async def _asend_controlbar_message(session: Any, action: str = "toggle") -> bool:
+    """Awaitable counterpart of `_send_controlbar_message`."""
+    action = action or "toggle"
+    payload = {"action": action}
+    return await _asend_custom_message(session, "bs4dash_controlbar", payload)
+
+
+async def aupdate_sidebar(session: Any, menu: list[dict]) -> bool:
+    """Awaitable counterpart of `update_sidebar`."""
+    payload = {"items": menu}
+    return await _asend_custom_message(session, "bs4dash_update_sidebar", payload)
+
+
+async def aupdate_virtual_sidebar(session: Any, menu: list) -> bool:
+    """Awaitable counterpart of `update_virtual_sidebar`."""
+    payload = compact_menu(menu)
+    return await _asend_custom_message(
+        session, "bs4dash_update_sidebar_virtual", payload
+    )
+
+
+async def aupdate_navbar_tabs(session: Any, nav_id: str, tabs: list[dict]) -> bool:
+    """Awaitable counterpart of `update_navbar_tabs`."""
+    payload = {"nav_id": nav_id, "tabs": tabs}
+    return await _asend_custom_message(session, "bs4dash_update_navs", payload)
+
+
+async def ashow_controlbar(session: Any) -> bool:
+    """Awaitable counterpart of `show_controlbar`."""
+    return await _asend_controlbar_message(session, "show")
+
+
+async def ahide_controlbar(session: Any) -> bool:
+    """Awaitable counterpart of `hide_controlbar`."""
+    return await _asend_controlbar_message(session, "hide")
+
+
+async def atoggle_controlbar(session: Any) -> bool:
+    """Awaitable counterpart of `toggle_controlbar`."""
+    return await _asend_controlbar_message(session, "toggle")
+
+
+async def aupdate_sidebar_badges(session: Any, badges: list[dict]) -> bool:
+    """Awaitable counterpart of `update_sidebar_badges`."""
+    payload = {"badges": badges}
+    return await _asend_custom_message(
+        session, "bs4dash_update_sidebar_badges", payload
+    )
+
+
+async def aupdate_sidebar_active(session: Any, target: str) -> bool:
+    """Awaitable counterpart of `update_sidebar_active`."""
+    payload = {"target": target}
+    return await _asend_custom_message(
+        session, "bs4dash_update_sidebar_active", payload
+    )
+
+
+async def aupdate_navbar_items(session: Any, nav_id: str, items: list[dict]) -> bool:
+    """Awaitable counterpart of `update_navbar_items`."""
+    payload = {"nav_id": nav_id, "items": items}
+    return await _asend_custom_message(session, "bs4dash_update_nav_items", payload)
+
+
+async def aupdate_tab_content(
+    session: Any, tab_id: str, content: str, deps: Optional[list] = None
+) -> bool:
+    """Awaitable counterpart of `update_tab_content`."""
+    payload = _tab_content_payload(tab_id, content, deps)
+    return await _asend_custom_message(session, "bs4dash_update_tab_content", payload)
@@ -0,0 +1,193 @@
+"""Server-side shadow of the client UI state, used to send minimal patches.
+
+A `ShadowState` remembers what the client was last sent for the sidebar
+menu, navbar items, sidebar badges and the active sidebar item. Each outgoing
+full-state message is reduced against it just before it is sent:
+
+- `bs4dash_update_sidebar` / `bs4dash_update_nav_items` become keyed
+  `bs4dash_patch_sidebar` / `bs4dash_patch_nav_items` messages holding only
+  `remove`, `update`, `insert` and `move` ops (items are keyed by `href`);
+- `bs4dash_update_sidebar_badges` keeps only badges whose value changed;
+- `bs4dash_update_sidebar_active` is dropped when the target is unchanged;
+- a message that would change nothing is not sent at all.
+
+Lists with duplicate keys, and patches that would be larger than the list
+itself, are sent in full.
+"""
+
+import threading
+from typing import Optional
+
+
+def _item_key(item: dict):
+    return (item or {}).get("href") or "#"
+
+
+def _lis(seq: list) -> set:
+    """Return the indexes in `seq` forming a longest increasing subsequence."""
+    tails: list = []
+    tails_idx: list = []
+    prev = [-1] * len(seq)
+    for i, v in enumerate(seq):
+        lo, hi = 0, len(tails)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if tails[mid] < v:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo > 0:
+            prev[i] = tails_idx[lo - 1]
+        if lo == len(tails):
+            tails.append(v)
+            tails_idx.append(i)
+        else:
+            tails[lo] = v
+            tails_idx[lo] = i
+    out = set()
+    i = tails_idx[-1] if tails_idx else -1
+    while i >= 0:
+        out.add(i)
+        i = prev[i]
+    return out
+
+
+def diff_items(old: list, new: list) -> Optional[list]:
+    """Return keyed ops turning `old` into `new`, or None to send in full.
+
+    Ops are applied in order by the client:
+    - {"op": "remove", "key": k}
+    - {"op": "update", "key": k, "item": it}
+    - {"op": "insert", "key": k, "item": it, "before": k2 or None}
+    - {"op": "move", "key": k, "before": k2 or None}
+    where `before` names the item to place it in front of (None: at the end).
+    """
+    old_keys = [_item_key(it) for it in old]
+    new_keys = [_item_key(it) for it in new]
+    if len(set(old_keys)) != len(old_keys) or len(set(new_keys)) != len(new_keys):
+        return None
+    old_by_key = dict(zip(old_keys, old))
+    new_set = set(new_keys)
+
+    ops = [{"op": "remove", "key": k} for k in old_keys if k not in new_set]
+    kept = [k for k in old_keys if k in new_set]
+    pos = {k: i for i, k in enumerate(kept)}
+
+    # keys whose relative order is unchanged stay put; the others move
+    common = [k for k in new_keys if k in pos]
+    stable = {common[i] for i in _lis([pos[k] for k in common])}
+
+    for k, it in zip(new_keys, new):
+        if k in old_by_key and old_by_key[k] != it:
+            ops.append({"op": "update", "key": k, "item": it})
+
+    # place from the end so each `before` anchor is already in position
+    before = None
+    for k, it in zip(reversed(new_keys), reversed(new)):
+        if k not in old_by_key:
+            ops.append({"op": "insert", "key": k, "item": it, "before": before})
+        elif k not in stable:
+            ops.append({"op": "move", "key": k, "before": before})
+        before = k
+
+    if len(ops) >= max(len(new), 1):
+        return None
+    return ops
+
+
+class ShadowState:
+    """What the client was last sent, for one session."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget everything, so the next messages are sent in full."""
+        self.sidebar = None
+        self.nav_items: dict = {}
+        self.badges: dict = {}
+        self.active = None
+
+    def reduce(self, name: str, payload: dict):
+        """Return the (name, payload) to send instead, or None to send nothing.
+
+        Records the new state; call `reset()` if the send then fails.
+        """
+        with self.lock:
+            if name == "bs4dash_update_sidebar":
+                items = list(payload.get("items") or [])
+                old, self.sidebar = self.sidebar, items
+                # the client keeps badges only on the items it still shows
+                self.badges = {} if old is None else self._kept_badges(items)
+                if old is None:
+                    self.active = None
+                    return name, payload
+                if self.active is not None and self.active not in {
+                    _item_key(it) for it in items
+                }:
+                    self.active = None
+                out = self._patch(name, "bs4dash_patch_sidebar", old, items, payload)
+                if out is not None and out[0] == name:
+                    # sent in full: forget badges and active so they are resent
+                    self.badges, self.active = {}, None
+                return out
+
+            if name == "bs4dash_update_nav_items":
+                nav_id = payload.get("nav_id")
+                items = list(payload.get("items") or [])
+                old = self.nav_items.get(nav_id)
+                self.nav_items[nav_id] = items
+                if old is None:
+                    return name, payload
+                return self._patch(
+                    name, "bs4dash_patch_nav_items", old, items, payload, nav_id=nav_id
+                )
+
+            if name == "bs4dash_update_sidebar_badges":
+                changed = []
+                for b in payload.get("badges") or []:
+                    href, value = b.get("href"), b.get("badge")
+                    if href in self.badges and self.badges[href] == value:
+                        continue
+                    self.badges[href] = value
+                    changed.append(b)
+                if not changed:
+                    return None
+                return name, {"badges": changed}
+
+            if name == "bs4dash_update_sidebar_active":
+                target = payload.get("target")
+                if target is not None and target == self.active:
+                    return None
+                self.active = target
+                return name, payload
+
+            return name, payload
+
+    def record(self, name: str, payload: dict) -> None:
+        """Record a full-state message that was sent without being reduced."""
+        with self.lock:
+            if name == "bs4dash_update_sidebar":
+                self.sidebar = list(payload.get("items") or [])
+                self.badges, self.active = {}, None
+            elif name == "bs4dash_update_nav_items":
+                self.nav_items[payload.get("nav_id")] = list(payload.get("items") or [])
+            elif name == "bs4dash_update_sidebar_badges":
+                for b in payload.get("badges") or []:
+                    self.badges[b.get("href")] = b.get("badge")
+            elif name == "bs4dash_update_sidebar_active":
+                self.active = payload.get("target")
+
+    def _kept_badges(self, items: list) -> dict:
+        keys = {_item_key(it) for it in items}
+        return {k: v for k, v in self.badges.items() if k in keys}
+
+    @staticmethod
+    def _patch(name: str, patch_name: str, old: list, new: list, payload, **extra):
+        ops = diff_items(old, new)
+        if ops is None:
+            return name, payload
+        if not ops:
+            return None
+        return patch_name, dict(extra, ops=ops)
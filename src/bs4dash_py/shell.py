@@ -0,0 +1,200 @@
+"""Static export of a dashboard's shell, served from disk with hashed assets.
+
+When the chrome of a dashboard (`dashboard_page_shiny` with its navbar,
+sidebar and footer) is fixed, build it once at deploy time instead of on
+every page view. `export_shell` renders the page to `index.html` and copies
+the files of its HTML dependencies next to it, under directories named
+after a hash of their contents:
+
+    shell/
+      index.html
+      shell.json                      # the asset directories written
+      assets/bs4dash-py-3f2a9c1e07b4/bs4dash_controlbar.min.js
+      ...
+
+`shell_app` serves it: Shiny reads `index.html` once at startup and adds its
+own scripts, so a page view costs no rendering, and the asset URLs are sent
+as immutable. Regions filled in by the server (`ui.output_ui`, outputs,
+`update_*` helpers) work as usual over the websocket. The serving side
+doesn't import the layout builders, so a cold start only loads Shiny and
+the server function.
+
+    # at deploy time: python scripts/export_shell.py myapp.ui:page shell/
+    from bs4dash_py import shell_app
+
+    app = shell_app("shell", server)
+"""
+
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Optional
+
+SHELL_HTML = "index.html"
+SHELL_MANIFEST = "shell.json"
+# directory, and URL prefix, of the exported assets
+ASSETS = "assets"
+
+# Shiny inserts these itself where this marker is (see `shiny.ui.page_html`)
+DEPS_PLACEHOLDER = '<meta name="shiny-dependency-placeholder" content="">'
+_SHINY_DEPENDENCIES = frozenset(
+    {"requirejs", "jquery", "shiny", "shiny-busy-indicators", "shiny-devmode"}
+)
+
+# one year: asset URLs change whenever their contents do
+MAX_AGE = 31536000
+
+
+def _dir_hash(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=6)
+    for file in sorted(p for p in path.rglob("*") if p.is_file()):
+        digest.update(file.relative_to(path).as_posix().encode("utf-8") + b"\0")
+        digest.update(file.read_bytes())
+    return digest.hexdigest()
+
+
+def _clean(out: Path) -> None:
+    # remove only what the previous export wrote
+    try:
+        previous = json.loads((out / SHELL_MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return
+    for name in previous.get("assets", []):
+        target = out / ASSETS / name
+        if target.is_dir() and target.parent == out / ASSETS:
+            shutil.rmtree(target)
+
+
+def export_shell(page: Any, out_dir: Any) -> dict:
+    """Render `page` to `out_dir/index.html`, with its assets under `assets/`.
+
+    - page: the UI (a tag, e.g. from `dashboard_page_shiny`)
+    - out_dir: directory to write; files of a previous export are replaced
+
+    Returns the manifest written to `shell.json`.
+    """
+    from htmltools import HTML, TagList, tags
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    _clean(out)
+    body = TagList(page).tagify()
+    deps = [d for d in body.get_dependencies() if d.name not in _SHINY_DEPENDENCIES]
+    # the marker leads <head>, so Shiny's jQuery comes before everything else
+    head = tags.head(
+        HTML(DEPS_PLACEHOLDER),
+        tags.meta(charset="utf-8"),
+        *[dep.as_html_tags(lib_prefix=ASSETS) for dep in deps],
+    )
+    html = "<!DOCTYPE html>\n" + str(tags.html(head, tags.body(body)))
+
+    staging = out / ".staging"
+    shutil.rmtree(staging, ignore_errors=True)
+    assets = {}
+    try:
+        for dep in deps:
+            paths = dep.source_path_map(lib_prefix=None)
+            if not paths["source"]:
+                # head content only
+                continue
+            dep.copy_to(str(staging))
+            href = paths["href"]
+            name = f"{dep.name}-{_dir_hash(staging / href)}"
+            target = out / ASSETS / name
+            if target.exists():
+                shutil.rmtree(target)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            (staging / href).rename(target)
+            # preload hints (see `dependencies.preload_hints`) name lib/ URLs
+            for prefix in (ASSETS, "lib"):
+                html = html.replace(f'"{prefix}/{href}/', f'"{ASSETS}/{name}/')
+            assets[dep.name] = name
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    (out / SHELL_HTML).write_text(html, encoding="utf-8")
+    manifest = {
+        "html": hashlib.blake2b(html.encode("utf-8"), digest_size=8).hexdigest(),
+        "assets": sorted(assets.values()),
+    }
+    (out / SHELL_MANIFEST).write_text(
+        json.dumps(manifest, indent=2) + "\n", encoding="utf-8"
+    )
+    return manifest
+
+
+def shell_app(shell_dir: Any, server: Any = None, max_age: int = MAX_AGE, **kwargs):
+    """Return an ASGI app serving the shell exported to `shell_dir`.
+
+    - server: the Shiny server function, for the dynamic regions
+    - max_age: `Cache-Control` max-age of the (hashed) asset URLs
+    - kwargs: passed to `shiny.App`
+
+    The page is answered with an `ETag`, so browsers revalidate it cheaply.
+    """
+    from shiny import App
+
+    shell = Path(shell_dir).resolve()
+    manifest = json.loads((shell / SHELL_MANIFEST).read_text(encoding="utf-8"))
+    app = App(
+        shell / SHELL_HTML,
+        server,
+        static_assets={f"/{ASSETS}": shell / ASSETS},
+        **kwargs,
+    )
+    return _with_shell_headers(app, manifest["html"], max_age)
+
+
+def _with_shell_headers(app: Any, etag: str, max_age: int) -> Any:
+    from shiny import __version__ as shiny_version
+
+    # the page also carries the markup of Shiny's own dependencies
+    etag = f'"{etag}-{shiny_version}"'.encode("latin-1")
+    cache_control = f"public, max-age={max_age}, immutable".encode("latin-1")
+
+    async def wrapped(scope, receive, send):
+        if scope.get("type") != "http":
+            return await app(scope, receive, send)
+        path = scope.get("path", "")
+        root = scope.get("root_path", "")
+        if root and path.startswith(root):
+            path = path[len(root) :] or "/"
+        is_page = path == "/" and scope.get("method", "GET") in ("GET", "HEAD")
+        if is_page and _header(scope, b"if-none-match") == etag:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(b"etag", etag), (b"cache-control", b"no-cache")],
+                }
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return None
+        is_asset = path.startswith(f"/{ASSETS}/")
+
+        async def _send(message):
+            if message.get("type") == "http.response.start" and message.get(
+                "status"
+            ) in (200, 304):
+                headers = list(message.get("headers", []))
+                if is_page:
+                    headers = [h for h in headers if h[0].lower() != b"cache-control"]
+                    headers.append((b"etag", etag))
+                    headers.append((b"cache-control", b"no-cache"))
+                elif is_asset:
+                    headers = [h for h in headers if h[0].lower() != b"cache-control"]
+                    headers.append((b"cache-control", cache_control))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        return await app(scope, receive, _send)
+
+    return wrapped
+
+
+def _header(scope: Any, name: bytes) -> Optional[bytes]:
+    for k, v in scope.get("headers", []):
+        if k.lower() == name:
+            return v
+    return None
@@ -12,7 +12,34 @@ def dashboard_page_shiny(
     title="bs4dash-py MVP",
     adminlte_css=None,
     adminlte_js=None,
+    inline_assets=False,
+    vendored=False,
+    icons=(),
 ):
+    """Create the dashboard page.
+
+    The package's client assets are attached as a versioned HTML dependency
+    (see `bs4dash_py.dependencies`), served from a content-addressed URL the
+    browser can cache. With `inline_assets=True` they are inlined into the
+    page instead, e.g. for a standalone HTML file.
+
+    With `vendored=True` AdminLTE, Bootstrap and Font Awesome are served
+    from the app, as built by `scripts/vendor_assets.py`, instead of
+    `adminlte_css` / `adminlte_js` URLs.
+
+    Registered SVG icons used on the page are inlined as one sprite (see
+    `bs4dash_py.icons`); `icons` adds more, for content sent later.
+    """
+    vendor = None
+    if vendored:
+        from .dependencies import vendor_dependency
+
+        vendor = vendor_dependency()
+        if vendor is None:
+            raise FileNotFoundError(
+                "vendored assets not built: run scripts/vendor_assets.py"
+            )
+
     head_links = []
     if adminlte_css:
         head_links.append(ui.tags.link(rel="stylesheet", href=adminlte_css))
@@ -28,75 +55,52 @@ def dashboard_page_shiny(
         controlbar,
         footer or ui.tags.footer({"class": "main-footer"}),
     ]
+    wrapper_children = [c for c in wrapper_children if c is not None]
 
-    # Prefer external assets when possible: include controlbar JS and our
-    # stylesheet. Fall back to inlining the content when running from the
-    # source tree or when `ui.include_*` helpers aren't available.
-    controlbar_asset = None
-    style_asset = None
-
-    if hasattr(ui, "include_js"):
-        try:
-            controlbar_asset = ui.include_js("bs4dash_py/assets/bs4dash_controlbar.js")
-        except Exception:
-            try:
-                from pathlib import Path
-
-                p = Path(__file__).parent / "assets" / "bs4dash_controlbar.js"
-                if p.exists():
-                    content = p.read_text(encoding="utf-8")
-                    controlbar_asset = ui.tags.script(content)
-            except Exception:
-                controlbar_asset = None
+    from .icons import icon_sprite
 
-    if hasattr(ui, "include_css"):
-        try:
-            style_asset = ui.include_css("bs4dash_py/assets/bs4dash_styles.css")
-        except Exception:
-            try:
-                from pathlib import Path
+    # ahead of the content, so icons draw with the first paint
+    sprite = icon_sprite(*wrapper_children, icons=icons)
 
-                p = Path(__file__).parent / "assets" / "bs4dash_styles.css"
-                if p.exists():
-                    style_asset = ui.tags.style(p.read_text(encoding="utf-8"))
-            except Exception:
-                style_asset = None
-
-    # fallback JS stub if no asset available
-    if controlbar_asset is None:
-        controlbar_asset = ui.tags.script(
-            "(function(){\n"
-            "    function handle(msg){\n"
-            "        var action = msg && msg.action ? msg.action : 'toggle';\n"
-            "        var body = document.body;\n"
-            "        if(!body) return;\n"
-            "        if(action === 'show') body.classList.add('control-sidebar-open');\n"
-            "        else if(action === 'hide') body.classList.remove('control-sidebar-open');\n"
-            "        else body.classList.toggle('control-sidebar-open');\n"
-            "    }\n"
-            "    if(window.Shiny && Shiny.addCustomMessageHandler){\n"
-            "        Shiny.addCustomMessageHandler('bs4dash_controlbar', handle);\n"
-            "    }\n"
-            "})();"
-        )
+    if inline_assets:
+        assets = _inline_assets()
+    else:
+        from .dependencies import asset_dependency, preload_hints
 
-    # fallback style stub if no asset available
-    if style_asset is None:
-        style_asset = ui.tags.style(
-            ".user-avatar-initials{display:inline-block;border-radius:50%;font-weight:600;background:#6c757d;color:#fff;text-align:center}.user-avatar-initials.avatar-md{width:32px;height:32px;line-height:32px}"
-        )
+        # hints first, so they lead <head>
+        assets = [preload_hints(), asset_dependency()]
 
     page = ui.tags.div(
+        vendor,
         *head_links,
-        ui.tags.div(
-            {"class": "wrapper"}, *[c for c in wrapper_children if c is not None]
-        ),
+        sprite,
+        ui.tags.div({"class": "wrapper"}, *wrapper_children),
         ui.tags.script(src=adminlte_js) if adminlte_js else None,
-        controlbar_asset,
+        *assets,
     )
     return page
 
 
+def _inline_assets():
+    """Return <style> and <script> tags inlining the client assets.
+
+    The minified bundles are used when built; contents are read once per
+    process.
+    """
+    from .dependencies import SCRIPT, STYLESHEET, read_asset, served_name
+
+    def contents(name):
+        text = read_asset(served_name(name))
+        # a source map URL is relative to the file, which isn't served here
+        head, sep, tail = text.rpartition("# sourceMappingURL=")
+        return head.rstrip("/*").rstrip() + "\n" if sep else text
+
+    return [
+        ui.tags.style(ui.HTML(contents(STYLESHEET))),
+        ui.tags.script(ui.HTML(contents(SCRIPT))),
+    ]
+
+
 def _normalize_badge(badge):
     """Normalize badge input into (text, class) tuple.
 
@@ -127,10 +131,9 @@ def navbar_item_shiny(title, href="#", badge=None, icon=None):
     """
     children = []
     if icon:
-        if isinstance(icon, str):
-            children.append(ui.tags.i({"class": icon}))
-        else:
-            children.append(icon)
+        from .icons import icon_shiny
+
+        children.append(icon_shiny(icon))
     children.append(title)
 
     a = ui.tags.a({"class": "nav-link", "href": href}, *children)
@@ -321,10 +324,9 @@ def menu_item_shiny(text, href="#", badge=None, active=False, icon=None):
     # build children for anchor: icon (optional) then text
     children = []
     if icon:
-        if isinstance(icon, str):
-            children.append(ui.tags.i({"class": icon}))
-        else:
-            children.append(icon)
+        from .icons import icon_shiny
+
+        children.append(icon_shiny(icon))
     children.append(text)
 
     a = ui.tags.a({"class": a_cls, "href": href}, *children)
@@ -366,14 +368,27 @@ def menu_group_shiny(title, items):
     )
 
 
-def sidebar_shiny(brand_title="My app", menu=None, id="main-sidebar"):
+def sidebar_shiny(
+    brand_title="My app",
+    menu=None,
+    id="main-sidebar",
+    virtual=False,
+    row_height=40,
+    overscan=10,
+):
     """Create a sidebar. Menu entries may be:
 
     - simple tuple: (text, href)
     - tuple with badge: (text, href, badge)
     - dict: {"text":..., "href":..., "badge":...}
     - group: ("Group title", [item, item, ...])
+
+    With `virtual=True` the menu is embedded as compact data and the client
+    asset renders only the rows in view (plus `overscan` rows either side),
+    each `row_height` pixels tall. Use it for menus with thousands of entries.
     """
+    if virtual:
+        return _virtual_sidebar(brand_title, menu, id, row_height, overscan)
     menu_items = []
     if menu:
         for entry in menu:
@@ -432,7 +447,51 @@ def sidebar_shiny(brand_title="My app", menu=None, id="main-sidebar"):
     )
 
 
-def box_shiny(children, title=None, status=None, width=12):
+def _virtual_sidebar(brand_title, menu, id, row_height, overscan):
+    """Sidebar whose menu is rendered by the client from compact data."""
+    from .sidebar_data import compact_menu, menu_icons, menu_json
+
+    data = compact_menu(menu)
+    return ui.tags.aside(
+        {
+            "class": "main-sidebar sidebar-dark-primary elevation-4",
+            "id": id,
+            # registered icons the rows use, for the page's sprite
+            "data-bs4dash-icons": " ".join(menu_icons(data)) or None,
+        },
+        ui.tags.a(
+            {"class": "brand-link"},
+            ui.tags.span({"class": "brand-text font-weight-light"}, brand_title),
+        ),
+        ui.tags.div(
+            {
+                "class": "sidebar",
+                "data-bs4dash-virtual": "true",
+                "data-row-height": row_height,
+                "data-overscan": overscan,
+            },
+            ui.tags.nav(
+                {"class": "mt-2"},
+                ui.tags.ul(
+                    {"class": "nav nav-pills nav-sidebar flex-column", "role": "menu"}
+                ),
+            ),
+            ui.tags.script(
+                {"type": "application/json", "class": "bs4dash-sidebar-data"},
+                ui.HTML(menu_json(data)),
+            ),
+        ),
+    )
+
+
+def box_shiny(children, title=None, status=None, width=12, id=None, lazy=False):
+    """Create a card box.
+
+    - children: body content; may be a callable returning it
+    - id: id of the card (its body gets the id `{id}-body`)
+    - lazy: show a skeleton until the box nears the viewport, then have the
+      server render the body (see `lazy_boxes`); requires `id`
+    """
     cls = "card"
     if status:
         cls += f" card-{status}"
@@ -443,23 +502,54 @@ def box_shiny(children, title=None, status=None, width=12):
         if title
         else None
     )
+    card = {"class": cls}
+    body = {"class": "card-body"}
+    if id is not None:
+        from .lazy import box_body_id
+
+        card["id"] = id
+        body["id"] = box_body_id(id)
+    if lazy:
+        if id is None:
+            raise ValueError("lazy boxes need an id")
+        from .lazy import register_lazy_box
+
+        body["data-bs4dash-defer"] = "pending"
+        body["data-bs4dash-box"] = id
+        # the registration key: reports from this page are matched to its body
+        body["data-bs4dash-box-key"] = register_lazy_box(id, children)
+        body["aria-busy"] = "true"
+        children = _box_skeleton()
+    elif callable(children):
+        children = children()
     return ui.tags.div(
         {"class": f"col-{width}"},
-        ui.tags.div(
-            {"class": cls}, header, ui.tags.div({"class": "card-body"}, children)
-        ),
+        ui.tags.div(card, header, ui.tags.div(body, children)),
+    )
+
+
+def _box_skeleton(lines=3):
+    """Placeholder lines shown in a lazy box until its body arrives."""
+    return ui.tags.div(
+        {"class": "bs4dash-skeleton"},
+        *[ui.tags.div({"class": "bs4dash-skeleton-line"}) for _ in range(lines)],
     )
 
 
-def value_box_shiny(value, title=None, icon=None, color=None, width=3, href=None):
+def value_box_shiny(
+    value, title=None, icon=None, color=None, width=3, href=None, id=None, lazy=False
+):
     """Create a small value box similar to AdminLTE's `small-box`.
 
-    - value: prominent value (string or tag)
+    - value: prominent value (string or tag); may be a callable returning it
     - title: label below value
     - icon: optional icon tag
     - color: background color class suffix (e.g., 'primary')
     - width: bootstrap column width (1-12)
     - href: optional link for the footer
+    - id: id of the box (its value and title get the id `{id}-body`)
+    - lazy: show a skeleton until the box nears the viewport, then have the
+      server render the value (see `lazy_boxes`); requires `id`
     """
     cl = "small-box"
     if color:
@@ -471,15 +561,36 @@ def value_box_shiny(value, title=None, icon=None, color=None, width=3, href=None
         else None
     )
 
+    def inner():
+        v = value() if callable(value) else value
+        return ui.TagList(ui.tags.h3(v), ui.tags.p(title) if title else None)
+
+    box = {"class": cl}
+    body = {"class": "inner"}
+    if id is not None:
+        from .lazy import box_body_id
+
+        box["id"] = id
+        body["id"] = box_body_id(id)
+    if lazy:
+        if id is None:
+            raise ValueError("lazy boxes need an id")
+        from .lazy import register_lazy_box
+
+        body["data-bs4dash-defer"] = "pending"
+        body["data-bs4dash-box"] = id
+        # the registration key: reports from this page are matched to its body
+        body["data-bs4dash-box-key"] = register_lazy_box(id, inner)
+        body["aria-busy"] = "true"
+        content = _box_skeleton(2)
+    else:
+        content = inner()
+
     return ui.tags.div(
         {"class": f"col-{width}"},
         ui.tags.div(
-            {"class": cl},
-            ui.tags.div(
-                {"class": "inner"},
-                ui.tags.h3(value),
-                ui.tags.p(title) if title else None,
-            ),
+            box,
+            ui.tags.div(body, content),
             ui.tags.div({"class": "icon"}, icon) if icon else None,
             footer,
         ),
@@ -509,14 +620,21 @@ def info_box_shiny(title, value, icon=None, color=None, width=12):
     )
 
 
-def tabs_shiny(id, *tabs, nav_class="nav nav-tabs", content_class="tab-content"):
+def tabs_shiny(
+    id, *tabs, nav_class="nav nav-tabs", content_class="tab-content", lazy=False
+):
     """Create a simple tabs container.
 
     - id: container id
-    - tabs: tuples of (tab_id, title, content, active=False)
+    - tabs: tuples of (tab_id, title, content, active=False); content may be
+      a callable returning it
+    - lazy: build only the active pane; the others are placeholders rendered
+      by the server on first activation (see `lazy_tabs`)
     """
     nav_items = []
     panes = []
+    deferred = {}
+    active_id = None
     for tab in tabs:
         tab_id, title, content = tab[0], tab[1], tab[2]
         active = tab[3] if len(tab) > 3 else False
@@ -530,10 +648,33 @@ def tabs_shiny(id, *tabs, nav_class="nav nav-tabs", content_class="tab-content")
                 ),
             )
         )
-        panes.append(ui.tags.div({"class": pane_cls, "id": tab_id}, content))
-
+        if lazy:
+            deferred[tab_id] = content
+            if active and active_id is None:
+                active_id = tab_id
+        if lazy and not active:
+            pane = ui.tags.div(
+                {"class": pane_cls, "id": tab_id, "data-bs4dash-lazy": "pending"}
+            )
+        else:
+            if callable(content):
+                content = content()
+            attrs = {"class": pane_cls, "id": tab_id}
+            if lazy:
+                attrs["data-bs4dash-lazy"] = "loaded"
+            pane = ui.tags.div(attrs, content)
+        panes.append(pane)
+
+    container = {"id": id}
+    if lazy:
+        from .lazy import register_lazy_panes
+
+        # the registration key: events from this page are matched to its panes
+        container["data-bs4dash-lazy-tabs"] = register_lazy_panes(
+            id, deferred, active_id
+        )
     return ui.tags.div(
-        {"id": id},
+        container,
         ui.tags.ul({"class": nav_class}, *nav_items),
         ui.tags.div({"class": content_class}, *panes),
     )
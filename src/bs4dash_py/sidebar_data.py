@@ -0,0 +1,137 @@
+"""Compact menu data for virtualized sidebars.
+
+A virtualized sidebar (`sidebar_shiny(..., virtual=True)`) receives its menu
+as data instead of markup, and the client asset renders only the rows in
+view. `compact_menu` turns the menu entries accepted by `sidebar_shiny` into
+that data, as short JSON arrays:
+
+- item:    ["Home", "#home"], plus badge and icon when set:
+           ["Inbox", "#inbox", "3", "fas fa-inbox"]
+- icon:    a class string, or "@name" (plus any other classes) for a
+           registered SVG icon drawn from the page's sprite (see `icons`)
+- badge:   text, or [text, class] for a badge with a non-default class
+- group:   ["Reports", [item, item, ...]]
+- header:  ["Documentation"]
+- divider: "-"
+
+The active item, top-level or in a group, is returned separately:
+{"menu": [...], "active": "#home"}.
+"""
+
+import json
+from typing import Any, Optional
+
+DEFAULT_BADGE_CLASS = "badge badge-info"
+
+
+def _compact_badge(badge: Any):
+    """Return the compact form of a badge (string or dict), or None."""
+    if not badge:
+        return None
+    if isinstance(badge, dict):
+        text = badge.get("text") or badge.get("badge")
+        cls = badge.get("class")
+        if not cls:
+            color = badge.get("color")
+            cls = f"badge badge-{color}" if color else DEFAULT_BADGE_CLASS
+        if text is None:
+            return None
+        return str(text) if cls == DEFAULT_BADGE_CLASS else [str(text), cls]
+    return str(badge)
+
+
+def _compact_icon(icon: str) -> str:
+    from .icons import resolve_icon
+
+    resolved = resolve_icon(icon)
+    if resolved is None:
+        return icon
+    name, rest = resolved
+    return " ".join(["@" + name, *rest])
+
+
+def _compact_item(text: Any, href: Any, badge: Any = None, icon: Any = None) -> list:
+    row = [str(text or ""), href or "#", _compact_badge(badge)]
+    if isinstance(icon, str) and icon:
+        row.append(_compact_icon(icon))
+    # trim trailing empty fields
+    while len(row) > 2 and row[-1] is None:
+        row.pop()
+    return row
+
+
+def _item_fields(entry: Any):
+    """Return (text, href, badge, icon, active) for an item entry."""
+    if isinstance(entry, dict):
+        return (
+            entry.get("text", ""),
+            entry.get("href", "#"),
+            entry.get("badge"),
+            entry.get("icon"),
+            bool(entry.get("active", False)),
+        )
+    badge = entry[2] if len(entry) > 2 else None
+    icon = entry[3] if len(entry) > 3 else None
+    return entry[0], entry[1], badge, icon, False
+
+
+def compact_menu(menu: Optional[list]) -> dict:
+    """Return {"menu": rows, "active": href} for `sidebar_shiny` menu entries.
+
+    Malformed entries are skipped, as `sidebar_shiny` does.
+    """
+    rows: list = []
+    active = None
+    for entry in menu or []:
+        try:
+            if isinstance(entry, str):
+                if entry.upper() == "DIVIDE":
+                    rows.append("-")
+                continue
+            if isinstance(entry, tuple) and len(entry) == 1:
+                rows.append([str(entry[0])])
+                continue
+            if isinstance(entry, (tuple, list)) and isinstance(entry[1], list):
+                children = []
+                for child in entry[1]:
+                    try:
+                        text, href, badge, icon, is_active = _item_fields(child)
+                    except Exception:
+                        continue
+                    children.append(_compact_item(text, href, badge, icon))
+                    if is_active and active is None:
+                        # the client opens the group to show it
+                        active = href or "#"
+                rows.append([str(entry[0]), children])
+                continue
+            text, href, badge, icon, is_active = _item_fields(entry)
+        except Exception:
+            continue
+        rows.append(_compact_item(text, href, badge, icon))
+        if is_active and active is None:
+            active = href or "#"
+    return {"menu": rows, "active": active}
+
+
+def menu_json(data: dict) -> str:
+    """Serialise compact menu data for embedding in a <script> element."""
+    text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    # keep the data from closing the script element or opening a comment
+    return text.replace("<", "\\u003c")
+
+
+def menu_icons(data: dict) -> list:
+    """Return the registered SVG icons used by compact menu `data`."""
+    names: list = []
+
+    def visit(rows):
+        for row in rows:
+            if isinstance(row, list) and len(row) > 1 and isinstance(row[1], list):
+                visit(row[1])
+            elif isinstance(row, list) and len(row) > 3:
+                icon = row[3]
+                if icon.startswith("@") and icon.split()[0][1:] not in names:
+                    names.append(icon.split()[0][1:])
+
+    visit(data.get("menu", []))
+    return names
@@ -0,0 +1,153 @@
+"""Visibility of tab panes, cards and the controlbar, and output suspension.
+
+The client asset tracks whether each tab pane, card and controlbar with an
+id is shown (a pane is active, a card is not collapsed, the controlbar is
+open, and the same holds for the containers around it) and publishes the
+result on the `bs4dash_visible` input as {id: true|false}. It also asks
+Shiny to recheck which outputs are hidden whenever a container changes.
+
+`suspend_when_hidden(id)` makes a render function or effect pause while its
+container is hidden: it takes no reactive dependencies except the
+container's visibility, so upstream changes cost nothing, and it runs once
+to catch up when the container is shown again. The output keeps showing its
+last value in the meantime.
+
+    @render.plot
+    @suspend_when_hidden("sales-box")
+    def sales_plot():
+        return plot_sales(input.region())
+"""
+
+import functools
+import inspect
+import weakref
+from typing import Any
+
+# Input the client publishes container visibility on
+VISIBLE_INPUT = "bs4dash_visible"
+
+# root session -> {container id: reactive.Value}, see `_tracked`
+_TRACKED: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _current_session() -> Any:
+    try:
+        from shiny.session import get_current_session
+    except Exception:
+        return None
+    try:
+        return get_current_session()
+    except Exception:
+        return None
+
+
+def visibility(session: Any = None) -> dict:
+    """Return {container_id: visible} as last reported by the client.
+
+    Reading it inside a reactive context takes a dependency on the
+    `bs4dash_visible` input.
+    """
+    session = session if session is not None else _current_session()
+    root = getattr(session, "_root_session", session)
+    return _read(getattr(root, "input", None))
+
+
+def _read(inputs: Any) -> dict:
+    if inputs is None:
+        return {}
+    try:
+        value = inputs[VISIBLE_INPUT]()
+    except Exception:
+        # not reported yet
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
+def _tracked(root: Any, inputs: Any, id: str) -> Any:
+    """Return a reactive value holding what the client reported for `id`.
+
+    One effect per session reads the whole input and sets these values, which
+    only notify their readers when they change; so a reader depends on its
+    own container, not on every other one. None outside a reactive context.
+    """
+    try:
+        from shiny import reactive
+
+        reactive.get_current_context()
+    except Exception:
+        return None
+    try:
+        values = _TRACKED.get(root)
+    except TypeError:
+        # can't be weakly referenced
+        return None
+    if values is None:
+        values = _TRACKED[root] = {}
+
+        @reactive.effect
+        def _update_visibility():
+            report = _read(inputs)
+            for key, value in list(values.items()):
+                value.set(report.get(key))
+
+    value = values.get(id)
+    if value is None:
+        with reactive.isolate():
+            value = values[id] = reactive.Value(_read(inputs).get(id))
+    return value
+
+
+def is_visible(id: str, session: Any = None, default: bool = True) -> bool:
+    """Return whether container `id` is shown; `default` until reported.
+
+    Inside a reactive context this depends on container `id` only.
+    """
+    session = session if session is not None else _current_session()
+    root = getattr(session, "_root_session", session)
+    inputs = getattr(root, "input", None)
+    value = _tracked(root, inputs, id) if inputs is not None else None
+    reported = value() if value is not None else _read(inputs).get(id)
+    return bool(default if reported is None else reported)
+
+
+def suspend_when_hidden(id: str, session: Any = None):
+    """Decorate a render function or effect to pause while container `id` is hidden.
+
+    - id: id of a tab pane, card (`box_shiny(id=...)`) or the controlbar
+    - session: session to read visibility from (default: the current one)
+    """
+
+    def _cancel() -> None:
+        try:
+            from shiny import req
+        except Exception:
+            return
+        req(False, cancel_output=True)
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def _async_wrapper(*args, **kwargs):
+                if not is_visible(id, session):
+                    _cancel()
+                    return None
+                return await fn(*args, **kwargs)
+
+            return _async_wrapper
+
+        @functools.wraps(fn)
+        def _wrapper(*args, **kwargs):
+            if not is_visible(id, session):
+                _cancel()
+                return None
+            return fn(*args, **kwargs)
+
+        return _wrapper
+
+    return decorator
+
+
+def hidden_containers(session: Any = None) -> list:
+    """Return the ids of the containers the client reported hidden."""
+    return sorted(k for k, v in visibility(session).items() if not v)
@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+
+from bs4dash_py.acks import (
+    ack_stats,
+    disable_acks,
+    enable_acks,
+    get_ack_tracker,
+    wait_for_ack,
+)
+from bs4dash_py.server import (
+    aupdate_tab_content,
+    batch,
+    update_sidebar_active,
+    update_sidebar_badges,
+    update_tab_content,
+)
+
+
+class DummySession:
+    def __init__(self):
+        self.calls = []
+
+    def send_custom_message(self, name, payload):
+        self.calls.append((name, payload))
+
+
+def test_messages_carry_sequence_ids():
+    s = DummySession()
+    enable_acks(s)
+    update_tab_content(s, "t1", "a")
+    with batch(s):
+        update_sidebar_active(s, "#a")
+        update_sidebar_badges(s, [{"href": "#a", "badge": "1"}])
+    assert s.calls[0][1] == {"tab_id": "t1", "content": "a", "_seq": 1}
+    assert s.calls[1][0] == "bs4dash_batch"
+    assert s.calls[1][1]["_seq"] == 2
+    disable_acks(s)
+    update_tab_content(s, "t1", "b")
+    assert "_seq" not in s.calls[-1][1]
+
+
+def test_cumulative_acks_record_latency_per_type():
+    s = DummySession()
+    tracker = enable_acks(s)
+    update_tab_content(s, "t1", "a")
+    with batch(s):
+        update_tab_content(s, "t2", "b")
+        update_sidebar_active(s, "#a")
+    update_sidebar_active(s, "#b")
+    tracker.receive({"seq": 2, "apply_ms": 1.5})
+    stats = ack_stats(s)
+    assert stats["bs4dash_update_tab_content"]["count"] == 2
+    assert stats["bs4dash_update_sidebar_active"]["count"] == 1
+    assert set(stats["bs4dash_update_tab_content"]) == {
+        "count",
+        "max",
+        "p50",
+        "p90",
+        "p99",
+    }
+    # message 3 is still pending until acked
+    tracker.receive(3)
+    assert ack_stats(s)["bs4dash_update_sidebar_active"]["count"] == 2
+    assert tracker.apply_ms == 1.5
+
+
+def test_wait_for_ack_resolves_on_ack_and_times_out():
+    s = DummySession()
+    tracker = enable_acks(s)
+
+    async def main():
+        await aupdate_tab_content(s, "t1", "a")
+        seq = s.calls[-1][1]["_seq"]
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.01, tracker.receive, {"seq": seq})
+        latency = await wait_for_ack(s, timeout=1.0)
+        assert latency is not None and latency >= 0
+        # already acknowledged: returns at once
+        assert await wait_for_ack(s, seq=seq) == latency
+
+        await aupdate_tab_content(s, "t1", "b")
+        with pytest.raises(asyncio.TimeoutError):
+            await wait_for_ack(s, timeout=0.01)
+        assert tracker.waiters == []
+
+    asyncio.run(main())
+
+
+def test_wait_for_ack_requires_ack_mode():
+    with pytest.raises(RuntimeError):
+        asyncio.run(wait_for_ack(DummySession()))
+
+
+def test_pending_acks_are_bounded():
+    s = DummySession()
+    tracker = enable_acks(s, max_pending=3)
+    for i in range(5):
+        update_tab_content(s, "t1", str(i))
+    assert list(tracker.pending) == [3, 4, 5]
+    assert tracker.unacked == 2
+
+
+def test_wait_for_ack_inside_a_reactive_effect():
+    pytest.importorskip("shiny")
+    pytest.importorskip("starlette")
+    from shiny import reactive
+
+    class RouteSession:
+        def __init__(self):
+            self.calls = []
+            self.routes = {}
+            self.flush_callbacks = []
+
+        async def send_custom_message(self, name, payload):
+            await asyncio.sleep(0)
+            self.calls.append((name, payload))
+
+        def on_flush(self, fn, once=True):
+            self.flush_callbacks.append(fn)
+
+        def dynamic_route(self, name, handler):
+            self.routes[name] = handler
+            return f"session/1/dynamic_route/{name}?nonce=1"
+
+    class Request:
+        def __init__(self, **params):
+            self.query_params = params
+
+    s = RouteSession()
+    seen = []
+
+    async def client():
+        # acks the tab content once it arrives; the effect holds up the flush
+        sent = dict(s.calls)
+        while "bs4dash_update_tab_content" not in sent:
+            await asyncio.sleep(0.001)
+            sent = dict(s.calls)
+        seq = sent["bs4dash_update_tab_content"]["_seq"]
+        response = s.routes["bs4dash_ack"](Request(seq=str(seq), apply_ms="1.5"))
+        assert response.status_code == 204
+
+    async def main():
+        enable_acks(s)
+        task = asyncio.ensure_future(client())
+
+        @reactive.effect
+        async def _():
+            # queued for the flush; shipped before waiting
+            update_tab_content(s, "t1", "a")
+            seen.append(await wait_for_ack(s, timeout=1.0))
+
+        await reactive.flush()
+        await asyncio.wait_for(task, 1.0)
+
+    asyncio.run(main())
+    sent = dict(s.calls)
+    assert sent["bs4dash_ack_route"]["url"] == (
+        "session/1/dynamic_route/bs4dash_ack?nonce=1"
+    )
+    assert len(seen) == 1 and seen[0] is not None
+    assert get_ack_tracker(s).apply_ms == 1.5
+    assert ack_stats(s)["bs4dash_update_tab_content"]["count"] == 1
@@ -0,0 +1,85 @@
+import asyncio
+
+from bs4dash_py.background import (
+    disable_background_hold,
+    enable_background_hold,
+    held_messages,
+    page_hidden,
+    set_page_visible,
+)
+from bs4dash_py.server import (
+    aupdate_tab_content,
+    toggle_controlbar,
+    update_sidebar_active,
+    update_sidebar_badges,
+    update_tab_content,
+)
+
+
+class DummySession:
+    def __init__(self):
+        self.calls = []
+
+    def send_custom_message(self, name, payload):
+        self.calls.append((name, payload))
+
+
+def test_hidden_page_gets_one_coalesced_snapshot():
+    s = DummySession()
+    enable_background_hold(s)
+    set_page_visible(s, False)
+    assert page_hidden(s)
+    update_tab_content(s, "t1", "a")
+    update_sidebar_badges(s, [{"href": "#a", "badge": "1"}])
+    update_tab_content(s, "t1", "b")
+    update_sidebar_badges(s, [{"href": "#b", "badge": "2"}])
+    update_sidebar_active(s, "#a")
+    update_sidebar_active(s, "#b")
+    assert s.calls == []
+    assert held_messages(s) == 3
+
+    set_page_visible(s, True)
+    assert not page_hidden(s)
+    assert len(s.calls) == 1
+    name, payload = s.calls[0]
+    assert name == "bs4dash_batch"
+    assert [(m["type"], m["data"]) for m in payload["messages"]] == [
+        ("bs4dash_update_tab_content", {"tab_id": "t1", "content": "b"}),
+        (
+            "bs4dash_update_sidebar_badges",
+            {"badges": [{"href": "#a", "badge": "1"}, {"href": "#b", "badge": "2"}]},
+        ),
+        ("bs4dash_update_sidebar_active", {"target": "#b"}),
+    ]
+    update_tab_content(s, "t1", "c")
+    assert s.calls[-1] == (
+        "bs4dash_update_tab_content",
+        {"tab_id": "t1", "content": "c"},
+    )
+
+
+def test_toggles_are_kept_and_async_helpers_are_held():
+    s = DummySession()
+    enable_background_hold(s)
+    set_page_visible(s, False)
+    toggle_controlbar(s)
+    toggle_controlbar(s)
+    assert asyncio.run(aupdate_tab_content(s, "t1", "a")) is True
+    assert held_messages(s) == 3
+    disable_background_hold(s)
+    assert [m["type"] for m in s.calls[0][1]["messages"]] == [
+        "bs4dash_controlbar",
+        "bs4dash_controlbar",
+        "bs4dash_update_tab_content",
+    ]
+    # disabled: visibility reports no longer hold messages
+    set_page_visible(s, False)
+    update_tab_content(s, "t1", "b")
+    assert len(s.calls) == 2
+
+
+def test_visibility_is_ignored_unless_enabled():
+    s = DummySession()
+    set_page_visible(s, False)
+    update_tab_content(s, "t1", "a")
+    assert len(s.calls) == 1 and not page_hidden(s)
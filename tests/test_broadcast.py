@@ -0,0 +1,221 @@
+import asyncio
+import gc
+import threading
+
+import pytest
+
+from bs4dash_py.background import enable_background_hold, set_page_visible
+from bs4dash_py.broadcast import (
+    abroadcast,
+    abroadcast_message,
+    broadcast,
+    register_session,
+    registered_sessions,
+    unregister_session,
+)
+from bs4dash_py.ratelimit import set_rate_limits, throttle
+from bs4dash_py.server import (
+    aupdate_sidebar_badges,
+    enable_shadow_state,
+    update_sidebar_active,
+    update_sidebar_badges,
+)
+
+
+class DummySession:
+    def __init__(self):
+        self.calls = []
+        self.ended = []
+
+    def send_custom_message(self, name, payload):
+        self.calls.append((name, payload))
+
+    def on_ended(self, fn):
+        self.ended.append(fn)
+
+
+class Broken(DummySession):
+    def send_custom_message(self, name, payload):
+        raise ConnectionError("closed")
+
+
+class Slow(DummySession):
+    async def send_custom_message(self, name, payload):
+        await asyncio.sleep(1)
+
+
+BADGES = [{"href": "#a", "badge": "3"}]
+
+
+def test_registry_groups_and_on_ended():
+    a, b = DummySession(), DummySession()
+    register_session(a, group="wall")
+    register_session(b)
+    assert a in registered_sessions() and b in registered_sessions()
+    assert registered_sessions("wall") == [a]
+    a.ended[0]()
+    assert a not in registered_sessions() and registered_sessions("wall") == []
+    unregister_session(b)
+    assert b not in registered_sessions()
+
+
+def test_registry_holds_sessions_weakly():
+    s = DummySession()
+    register_session(s, group="weak")
+    del s
+    gc.collect()
+    assert registered_sessions("weak") == []
+
+
+def test_broadcast_isolates_failures():
+    good = [DummySession() for _ in range(3)]
+    bad = Broken()
+    result = broadcast(update_sidebar_badges, BADGES, sessions=good + [bad])
+    assert result["delivered"] == 3
+    assert result["failed"] == 1
+    assert result["errors"][0][0] is bad
+    for s in good:
+        assert s.calls == [("bs4dash_update_sidebar_badges", {"badges": BADGES})]
+
+
+def test_broadcast_times_out_slow_sessions():
+    fast, slow = DummySession(), Slow()
+
+    async def main():
+        return await abroadcast(
+            update_sidebar_badges, BADGES, sessions=[fast, slow], timeout=0.05
+        )
+
+    result = asyncio.run(main())
+    assert (result["delivered"], result["failed"]) == (1, 1)
+    assert isinstance(result["errors"][0][1], asyncio.TimeoutError)
+
+
+def test_broadcast_targets_a_group_on_its_loop():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    seen = []
+
+    class OnLoop(DummySession):
+        def send_custom_message(self, name, payload):
+            seen.append(threading.get_ident())
+            super().send_custom_message(name, payload)
+
+    async def register(s):
+        register_session(s, group="looped")
+
+    members = [OnLoop(), OnLoop()]
+    for s in members:
+        asyncio.run_coroutine_threadsafe(register(s), loop).result()
+    try:
+        result = broadcast(update_sidebar_active, "#a", group="looped")
+        assert result["delivered"] == 2
+        assert seen == [thread.ident, thread.ident]
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=1)
+        loop.close()
+
+
+def test_broadcast_concurrency_holds_for_sessions_on_other_loops():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    state = {"now": 0, "peak": 0}
+
+    class Counted(DummySession):
+        async def send_custom_message(self, name, payload):
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+            await asyncio.sleep(0.01)
+            state["now"] -= 1
+            super().send_custom_message(name, payload)
+
+    async def register(s):
+        register_session(s, group="elsewhere")
+
+    members = [Counted() for _ in range(20)]
+    for s in members:
+        asyncio.run_coroutine_threadsafe(register(s), loop).result()
+    try:
+        result = broadcast(
+            update_sidebar_active, "#a", group="elsewhere", concurrency=2
+        )
+        assert result["delivered"] == 20
+        assert state["peak"] == 2
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=1)
+        loop.close()
+
+
+def test_broadcast_records_shadow_state():
+    s = DummySession()
+    enable_shadow_state(s)
+    broadcast(update_sidebar_active, "#a", sessions=[s])
+    # the client already has "#a" active, so the per-session update is skipped
+    update_sidebar_active(s, "#a")
+    assert s.calls == [("bs4dash_update_sidebar_active", {"target": "#a"})]
+
+
+def test_broadcast_counts_only_real_deliveries_in_metrics():
+    from bs4dash_py.metrics import disable_metrics, enable_metrics, metrics_snapshot
+
+    sessions = [DummySession() for _ in range(3)]
+    for s in sessions:
+        register_session(s, group="counted")
+    enable_metrics()
+    try:
+        for _ in range(5):
+            broadcast(update_sidebar_badges, {"#a": "1"}, group="counted")
+        snap = metrics_snapshot()
+    finally:
+        disable_metrics()
+        for s in sessions:
+            unregister_session(s)
+    assert snap["messages"]["bs4dash_update_sidebar_badges"]["sent"] == 15
+    assert len(snap["sessions"]) == 3
+    assert sum(s["sent"] for s in snap["sessions"].values()) == 15
+
+
+def test_broadcast_rejects_misuse():
+    with pytest.raises(TypeError):
+        broadcast(aupdate_sidebar_badges, BADGES, sessions=[])
+
+    async def main():
+        broadcast(update_sidebar_badges, BADGES, sessions=[])
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(main())
+
+
+def test_abroadcast_message_sends_raw_messages():
+    s = DummySession()
+    result = asyncio.run(abroadcast_message("custom_event", {"x": 1}, sessions=[s]))
+    assert result == {"delivered": 1, "failed": 0, "errors": []}
+    assert s.calls == [("custom_event", {"x": 1})]
+
+
+def test_broadcast_replaces_updates_held_for_a_hidden_page():
+    s = DummySession()
+    enable_background_hold(s)
+    set_page_visible(s, False)
+    update_sidebar_badges(s, [{"href": "#a", "badge": "1"}])
+    assert broadcast(update_sidebar_badges, BADGES, sessions=[s])["delivered"] == 1
+    set_page_visible(s, True)
+    assert s.calls == [("bs4dash_update_sidebar_badges", {"badges": BADGES})]
+
+
+def test_broadcast_replaces_a_pending_trailing_update():
+    s = DummySession()
+
+    async def main():
+        set_rate_limits(s, throttle("bs4dash_update_sidebar_active", ms=50))
+        update_sidebar_active(s, "#a")
+        update_sidebar_active(s, "#b")
+        await abroadcast(update_sidebar_active, "#c", sessions=[s])
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert [p["target"] for _, p in s.calls] == ["#a", "#c"]
@@ -0,0 +1,134 @@
+import asyncio
+import gzip
+import json
+import shutil
+
+import pytest
+
+from bs4dash_py import dependencies
+from scripts.build_assets import (
+    build,
+    js_tokens,
+    minify_css,
+    minify_js,
+    select_bundles,
+    source_map,
+)
+
+
+def test_minify_js_keeps_tokens_and_statement_breaks():
+    src = """// dropped
+var a = b + +c, re = /[/]\\/*x/g;  /* gone */
+function f(x){
+    return
+        x;
+}
+var s = 'it\\'s // not a comment' + "/* nor this */";
+a = b
+(c)
+"""
+    out, _ = minify_js(src)
+    assert "dropped" not in out and "gone" not in out
+    assert [t for t, *_ in js_tokens(out)] == [t for t, *_ in js_tokens(src)]
+    assert "b+ +c" in out
+    assert "/[/]\\/*x/g" in out
+    # a line break ending `return` (or a statement) is kept
+    assert "return\nx;" in out
+    assert "a=b\n(c)" in out
+
+
+def test_minify_css():
+    out, _ = minify_css(
+        "/* theme */\n.a .b > c:hover {\n  color: red;\n  width: calc(1px + 2px);\n}\n"
+    )
+    assert out == ".a .b>c:hover{color:red;width:calc(1px + 2px)}"
+
+
+def test_select_bundles_blanks_unselected_sections():
+    src = "core\n// @bundle navs\nnav\n// @end bundle\n// @bundle sidebar\nside\n// @end bundle\n"
+    assert select_bundles(src) == src
+    out = select_bundles(src, ["sidebar"])
+    assert out.split("\n") == src.replace("nav\n", "\n").split("\n")
+    with pytest.raises(ValueError):
+        select_bundles(src, ["nope"])
+
+
+def test_source_map_points_at_source_lines():
+    src = "var a = 1;\n\n  var b = 2;\n"
+    out, segments = minify_js(src)
+    assert out == "var a=1;var b=2;"
+    assert segments == [(0, 0, 0, 0), (0, 8, 2, 2)]
+    smap = source_map(segments, "x.min.js", "x.js", src)
+    assert smap["mappings"] == "AAAA,QAEE"
+    assert smap["sourcesContent"] == [src]
+
+
+@pytest.fixture
+def built(tmp_path, monkeypatch):
+    for name in (dependencies.SCRIPT, dependencies.STYLESHEET):
+        shutil.copy(dependencies.ASSETS_DIR / name, tmp_path / name)
+    manifest = build(tmp_path)
+    monkeypatch.setattr(dependencies, "ASSETS_DIR", tmp_path)
+    dependencies._clear_caches()
+    yield tmp_path, manifest
+    dependencies._clear_caches()
+
+
+def test_build_writes_bundles_and_runtime_serves_them(built):
+    out, manifest = built
+    entry = manifest[dependencies.SCRIPT]
+    assert entry["file"] == "bs4dash_controlbar.min.js"
+    code = (out / entry["file"]).read_text()
+    assert code.endswith("//# sourceMappingURL=bs4dash_controlbar.min.js.map\n")
+    assert gzip.decompress((out / (entry["file"] + ".gz")).read_bytes()) == (
+        code.encode()
+    )
+    assert json.loads((out / "build.json").read_text()) == manifest
+
+    assert dependencies.served_name(dependencies.SCRIPT) == entry["file"]
+    assert dependencies.asset_path(dependencies.STYLESHEET).endswith(
+        "/bs4dash_styles.min.css"
+    )
+
+    # an edited source is served as is until rebuilt
+    (out / dependencies.SCRIPT).write_text(code + "\n// edited\n")
+    dependencies._clear_caches()
+    assert dependencies.served_name(dependencies.SCRIPT) == dependencies.SCRIPT
+
+
+def test_precompressed_variant_is_served(built):
+    out, manifest = built
+    passed = []
+
+    async def app(scope, receive, send):
+        passed.append(scope["path"])
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"plain"})
+
+    def get(path, accept):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/" + path,
+            "root_path": "",
+            "headers": [(b"accept-encoding", accept)],
+        }
+        asyncio.run(dependencies.with_asset_cache(app)(scope, None, send))
+        return dict(sent[0]["headers"]), sent[1]["body"]
+
+    path = dependencies.asset_path(dependencies.SCRIPT)
+    headers, body = get(path, b"br;q=0, gzip")
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"content-type"].startswith(b"text/javascript")
+    assert headers[b"cache-control"].endswith(b"immutable")
+    assert gzip.decompress(body) == (out / "bs4dash_controlbar.min.js").read_bytes()
+    assert passed == []
+
+    headers, body = get(path, b"identity")
+    assert body == b"plain" and passed == ["/" + path]
+    assert headers[b"vary"] == b"accept-encoding"
@@ -0,0 +1,240 @@
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+ASSET = (
+    Path(__file__).resolve().parents[1] / "src/bs4dash_py/assets/bs4dash_controlbar.js"
+)
+
+# A minimal DOM, enough for the asset to load and for the nav handlers to run
+HARNESS = r"""
+const fs = require('fs'), vm = require('vm');
+function Text(value){ this.nodeType = 3; this.nodeValue = value; this.parentNode = null; }
+function El(tag){
+  this.nodeType = 1; this.tagName = tag.toUpperCase(); this.childNodes = [];
+  this.parentNode = null; this.attrs = {};
+  const self = this;
+  this.classList = {
+    contains: c => (self.attrs['class'] || '').split(/\s+/).includes(c),
+    add: c => { if(!self.classList.contains(c)) self.className = (self.className + ' ' + c).trim(); },
+    remove: c => { self.className = (self.attrs['class'] || '').split(/\s+/).filter(x => x && x !== c).join(' '); },
+    toggle: (c, on) => {
+      if(on === undefined) on = !self.classList.contains(c);
+      on ? self.classList.add(c) : self.classList.remove(c);
+      return on;
+    },
+  };
+}
+const sibling = (n, d, el) => {
+  if(!n.parentNode) return null;
+  const list = n.parentNode.childNodes;
+  for(let i = list.indexOf(n) + d; i >= 0 && i < list.length; i += d){
+    if(!el || list[i].nodeType === 1) return list[i];
+  }
+  return null;
+};
+for(const C of [El, Text]){
+  Object.defineProperty(C.prototype, 'nextSibling', {get(){ return sibling(this, 1); }});
+  C.prototype.remove = function(){
+    if(this.parentNode) this.parentNode.childNodes.splice(this.parentNode.childNodes.indexOf(this), 1);
+    this.parentNode = null;
+  };
+}
+Object.defineProperties(El.prototype, {
+  className: {get(){ return this.attrs['class'] || ''; }, set(v){ this.attrs['class'] = v; }},
+  href: {get(){ return this.attrs.href; }, set(v){ this.attrs.href = v; }},
+  id: {get(){ return this.attrs.id || ''; }, set(v){ this.attrs.id = v; }},
+  children: {get(){ return this.childNodes.filter(n => n.nodeType === 1); }},
+  firstChild: {get(){ return this.childNodes[0] || null; }},
+  firstElementChild: {get(){ return this.children[0] || null; }},
+  nextElementSibling: {get(){ return sibling(this, 1, true); }},
+  textContent: {
+    get(){ return this.childNodes.map(n => n.nodeType === 3 ? n.nodeValue : n.textContent).join(''); },
+    set(v){ this.childNodes.forEach(n => { n.parentNode = null; }); this.childNodes = []; this.appendChild(new Text(v)); },
+  },
+});
+El.prototype.getAttribute = function(k){ return k in this.attrs ? this.attrs[k] : null; };
+El.prototype.setAttribute = function(k, v){ this.attrs[k] = String(v); };
+El.prototype.hasAttribute = function(k){ return k in this.attrs; };
+El.prototype.removeAttribute = function(k){ delete this.attrs[k]; };
+El.prototype.addEventListener = function(){};
+El.prototype.insertBefore = function(n, ref){
+  const nodes = n.tagName === '#FRAGMENT' ? n.childNodes.slice() : [n];
+  for(const c of nodes){
+    c.remove();
+    c.parentNode = this;
+    const at = ref ? this.childNodes.indexOf(ref) : -1;
+    at < 0 ? this.childNodes.push(c) : this.childNodes.splice(at, 0, c);
+  }
+  return n;
+};
+El.prototype.appendChild = function(n){ return this.insertBefore(n, null); };
+El.prototype.contains = function(n){ for(; n; n = n.parentNode) if(n === this) return true; return false; };
+El.prototype.matches = function(sel){
+  if(sel === '*') return true;
+  const m = /^([a-z]*)((?:\.[\w-]+)*)$/i.exec(sel.trim());
+  if(!m) return false;
+  if(m[1] && m[1].toUpperCase() !== this.tagName) return false;
+  return m[2].split('.').filter(Boolean).every(c => this.classList.contains(c));
+};
+// simple selectors and descendant combinations of them ('.a .b')
+El.prototype.matchesPath = function(parts, root){
+  if(!this.matches(parts[parts.length - 1])) return false;
+  let i = parts.length - 2;
+  for(let n = this.parentNode; i >= 0 && n && n !== root; n = n.parentNode){
+    if(n.matches(parts[i])) i--;
+  }
+  return i < 0;
+};
+El.prototype.querySelectorAll = function(sel){
+  const out = [], parts = sel.trim().split(/\s+/);
+  const walk = n => n.children.forEach(c => { if(c.matchesPath(parts, this)) out.push(c); walk(c); });
+  walk(this);
+  return out;
+};
+El.prototype.querySelector = function(sel){ return this.querySelectorAll(sel)[0] || null; };
+El.prototype.closest = function(sel){ for(let n = this; n && n.nodeType === 1; n = n.parentNode) if(n.matches(sel)) return n; return null; };
+
+const root = new El('html'), body = new El('body');
+root.appendChild(body);
+const document = {
+  readyState: 'complete', hidden: true, visibilityState: 'hidden', body: body,
+  documentElement: root,
+  addEventListener(){},
+  createElement: t => new El(t),
+  createTextNode: v => new Text(v),
+  createDocumentFragment: () => new El('#fragment'),
+  getElementById: id => root.querySelectorAll('*').find(n => n.id === id) || null,
+  querySelector: s => root.querySelector(s),
+  querySelectorAll: s => root.querySelectorAll(s),
+};
+const handlers = {};
+const ctx = {document, console, setTimeout, clearTimeout, Map, Set, Promise,
+  Shiny: {addCustomMessageHandler(n, f){ handlers[n] = f; }, setInputValue(){}}};
+ctx.window = ctx;
+ctx.addEventListener = () => {};
+vm.createContext(ctx);
+vm.runInContext(fs.readFileSync(process.argv[1], 'utf8'), ctx);
+
+const script = JSON.parse(fs.readFileSync(0, 'utf8'));
+for(const html of script.setup){
+  const nav = new El('div'); nav.id = html.id;
+  if(html.cls) nav.className = html.cls;
+  const ul = new El('ul'); ul.className = 'nav'; nav.appendChild(ul);
+  for(const it of html.items || []){
+    const li = new El('li'), a = new El('a');
+    a.className = it.active ? 'nav-link active' : 'nav-link';
+    a.setAttribute('href', it.href);
+    li.appendChild(a); ul.appendChild(li);
+  }
+  body.appendChild(nav);
+}
+// "@frame" lets the queued messages apply before the next ones arrive
+const feed = async () => {
+  for(const [name, msg] of script.messages){
+    if(name === '@frame') await new Promise(r => setTimeout(r, 5));
+    else handlers[name](msg);
+  }
+};
+feed().then(() => setTimeout(() => {
+  const out = {items: {}, active: {}};
+  for(const html of script.setup){
+    const ul = document.getElementById(html.id).querySelector('ul');
+    out.items[html.id] = ul.children.map(li => li.querySelector('a').getAttribute('href'));
+    out.active[html.id] = ul.querySelectorAll('a.active').map(a => a.getAttribute('href'));
+  }
+  process.stdout.write(JSON.stringify(out));
+}, 10));
+"""
+
+
+def _run(setup, messages):
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("node is not installed")
+    script = json.dumps({"setup": setup, "messages": messages})
+    out = subprocess.run(
+        [node, "-e", HARNESS, str(ASSET)],
+        input=script,
+        capture_output=True,
+        text=True,
+        timeout=30,
+        check=True,
+    )
+    return json.loads(out.stdout)
+
+
+def _items(*hrefs):
+    return [{"title": h, "href": h} for h in hrefs]
+
+
+def test_full_update_after_a_patch_is_applied_after_it():
+    # all three arrive within one frame; the patch was computed against the
+    # first list, the last update against the patched one
+    result = _run(
+        [{"id": "demo"}],
+        [
+            [
+                "bs4dash_update_nav_items",
+                {"nav_id": "demo", "items": _items("a", "b", "c")},
+            ],
+            [
+                "bs4dash_patch_nav_items",
+                {
+                    "nav_id": "demo",
+                    "ops": [
+                        {"op": "remove", "key": "c"},
+                        {
+                            "op": "insert",
+                            "key": "d",
+                            "item": {"href": "d"},
+                            "before": None,
+                        },
+                    ],
+                },
+            ],
+            [
+                "bs4dash_update_nav_items",
+                {"nav_id": "demo", "items": _items("a", "b", "d", "e")},
+            ],
+        ],
+    )
+    assert result["items"] == {"demo": ["a", "b", "d", "e"]}
+
+
+def test_updates_without_patches_collapse_in_place():
+    result = _run(
+        [{"id": "one"}, {"id": "two"}],
+        [
+            ["bs4dash_update_nav_items", {"nav_id": "one", "items": _items("a")}],
+            ["bs4dash_update_nav_items", {"nav_id": "two", "items": _items("x")}],
+            ["bs4dash_update_nav_items", {"nav_id": "one", "items": _items("b", "c")}],
+        ],
+    )
+    assert result["items"] == {"one": ["b", "c"], "two": ["x"]}
+
+
+def test_active_updates_clear_links_active_in_the_page():
+    # "#b" is active in the page markup, not set by an update
+    items = [{"href": "#a"}, {"href": "#b", "active": True}, {"href": "#c"}]
+    result = _run(
+        [{"id": "sidebar", "cls": "main-sidebar", "items": items}],
+        [
+            ["bs4dash_update_sidebar_active", {"target": "#c"}],
+        ],
+    )
+    assert result["active"] == {"sidebar": ["#c"]}
+    result = _run(
+        [{"id": "sidebar", "cls": "main-sidebar", "items": items}],
+        [
+            ["bs4dash_update_sidebar_active", {"target": "#c"}],
+            ["@frame", None],
+            ["bs4dash_update_sidebar_active", {"target": "#a"}],
+            ["@frame", None],
+            ["bs4dash_update_sidebar_active", {"target": "#c"}],
+        ],
+    )
+    assert result["active"] == {"sidebar": ["#c"]}
@@ -0,0 +1,97 @@
+from bs4dash_py.content_cache import (
+    content_hash,
+    disable_content_cache,
+    enable_content_cache,
+    handle_cache_miss,
+)
+from bs4dash_py.server import batch, update_tab_content
+
+
+class DummySession:
+    def __init__(self):
+        self.calls = []
+
+    def send_custom_message(self, name, payload):
+        self.calls.append((name, payload))
+
+
+A = "<p>" + "a" * 300 + "</p>"
+B = "<p>" + "b" * 300 + "</p>"
+
+
+def test_repeated_content_is_sent_as_hash():
+    s = DummySession()
+    enable_content_cache(s, size=4)
+    update_tab_content(s, "t1", A)
+    update_tab_content(s, "t1", B)
+    update_tab_content(s, "t1", A)
+    first, second, third = (p for _, p in s.calls)
+    assert first == {"tab_id": "t1", "content": A, "hash": content_hash(A), "cache": 4}
+    assert second["content"] == B
+    assert third == {"tab_id": "t1", "hash": content_hash(A)}
+
+
+def test_small_content_and_other_messages_are_untouched():
+    s = DummySession()
+    enable_content_cache(s)
+    update_tab_content(s, "t1", "<p>x</p>")
+    update_tab_content(s, "t1", "<p>x</p>")
+    assert [p for _, p in s.calls] == [{"tab_id": "t1", "content": "<p>x</p>"}] * 2
+
+
+def test_mirror_evicts_like_the_client_lru():
+    s = DummySession()
+    enable_content_cache(s, size=2)
+    contents = [f"<p>{i}</p>" + "x" * 300 for i in range(3)]
+    for c in contents:
+        update_tab_content(s, "t1", c)
+    # contents[0] was evicted by the client too: sent in full again
+    update_tab_content(s, "t1", contents[0])
+    assert s.calls[-1][1]["content"] == contents[0]
+    update_tab_content(s, "t1", contents[2])
+    assert "content" not in s.calls[-1][1]
+
+
+def test_misses_resend_only_current_content():
+    s = DummySession()
+    enable_content_cache(s)
+    update_tab_content(s, "t1", A)
+    update_tab_content(s, "t1", A)
+    handle_cache_miss(s, {"misses": [{"tab_id": "t1", "hash": content_hash(A)}]})
+    assert s.calls[-1][1]["content"] == A
+
+    update_tab_content(s, "t1", B)
+    count = len(s.calls)
+    # a late miss for content since replaced is ignored
+    handle_cache_miss(s, {"misses": [{"tab_id": "t1", "hash": content_hash(A)}]})
+    assert len(s.calls) == count
+
+
+def test_batched_content_is_reduced_and_failures_reset():
+    class Flaky(DummySession):
+        fail = False
+
+        def send_custom_message(self, name, payload):
+            if self.fail:
+                raise ConnectionError("closed")
+            super().send_custom_message(name, payload)
+
+    s = Flaky()
+    enable_content_cache(s)
+    update_tab_content(s, "t1", A)
+    with batch(s):
+        update_tab_content(s, "t1", A)
+        update_tab_content(s, "t2", A)
+    messages = s.calls[-1][1]["messages"]
+    assert [m["data"] for m in messages] == [
+        {"tab_id": "t1", "hash": content_hash(A)},
+        {"tab_id": "t2", "hash": content_hash(A)},
+    ]
+    s.fail = True
+    update_tab_content(s, "t1", B)
+    s.fail = False
+    update_tab_content(s, "t1", A)
+    assert s.calls[-1][1]["content"] == A
+    disable_content_cache(s)
+    update_tab_content(s, "t1", A)
+    assert s.calls[-1][1] == {"tab_id": "t1", "content": A}
@@ -12,34 +12,76 @@ def test_dashboard_page_includes_adminlte_assets():
     assert "src=/js/adminlte.js" in s or "/js/adminlte.js" in s
 
 
-def test_dashboard_page_inlines_fallback_assets_when_include_missing(monkeypatch):
+def test_dashboard_page_attaches_versioned_asset_dependency():
     import pytest
 
     pytest.importorskip("shiny")
-    # Simulate include_js and include_css not available or raising
-    from shiny import ui
+    from htmltools import HTMLDocument
 
     from bs4dash_py import dashboard_page_shiny
+    from bs4dash_py.dependencies import asset_version, read_asset
 
-    # Backup and remove/replace include_js/include_css
-    orig_include_js = getattr(ui, "include_js", None)
-    orig_include_css = getattr(ui, "include_css", None)
+    page = dashboard_page_shiny()
+    deps = [d for d in page.get_dependencies() if d.name == "bs4dash-py"]
+    assert len(deps) == 1
+    assert str(deps[0].version) == asset_version()
+    assert "+" in asset_version()
 
-    monkeypatch.setattr(
-        ui, "include_js", lambda *a, **k: (_ for _ in ()).throw(Exception("no"))
-    )
-    monkeypatch.setattr(
-        ui, "include_css", lambda *a, **k: (_ for _ in ()).throw(Exception("no"))
-    )
+    html = HTMLDocument(page).render(lib_prefix="lib")["html"]
+    head = html.split("</head>")[0]
+    versioned = f"lib/bs4dash-py-{asset_version()}/"
+    assert f'rel="preload" href="{versioned}bs4dash_styles.css"' in head
+    assert head.index('rel="preload"') < head.index(f'src="{versioned}')
 
-    page = dashboard_page_shiny()
-    s = str(page)
-    # Expect fallback inline handler or identifier present
+    # assets are read once, not on every page build
+    dashboard_page_shiny()
+    assert read_asset.cache_info().currsize == 2
+
+
+def test_dashboard_page_inlines_assets_on_request():
+    import pytest
+
+    pytest.importorskip("shiny")
+    from bs4dash_py import dashboard_page_shiny
+
+    s = str(dashboard_page_shiny(inline_assets=True))
     assert "bs4dash_controlbar" in s
     assert "user-avatar-initials" in s
+    assert "bs4dash-py-" not in s
+    assert "sourceMappingURL" not in s
+
+
+def test_asset_cache_headers():
+    import asyncio
+
+    from bs4dash_py.dependencies import asset_path, with_asset_cache
+
+    async def app(scope, receive, send):
+        kind = b"text/css" if scope["path"].endswith(".css") else b"text/html"
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", kind), (b"cache-control", b"no-cache")],
+            }
+        )
+        await send({"type": "http.response.body", "body": b""})
+
+    def headers(path):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "path": path, "root_path": ""}
+        asyncio.run(with_asset_cache(app)(scope, None, send))
+        return dict(sent[0]["headers"])
+
+    asset = headers("/" + asset_path("bs4dash_styles.css"))
+    assert asset[b"cache-control"] == b"public, max-age=31536000, immutable"
+    assert b"link" not in asset
 
-    # restore
-    if orig_include_js is not None:
-        monkeypatch.setattr(ui, "include_js", orig_include_js)
-    if orig_include_css is not None:
-        monkeypatch.setattr(ui, "include_css", orig_include_css)
+    page = headers("/")
+    assert page[b"cache-control"] == b"no-cache"
+    assert page[b"link"].startswith(b"</lib/bs4dash-py-")
+    assert b"rel=preload; as=script" in page[b"link"]
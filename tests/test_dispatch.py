@@ -0,0 +1,162 @@
+import asyncio
+import gc
+import threading
+import time
+import weakref
+
+import pytest
+
+from bs4dash_py.dispatch import (
+    BACKGROUND,
+    INTERACTIVE,
+    attach_dispatcher,
+    detach_dispatcher,
+    get_dispatcher,
+)
+from bs4dash_py.server import (
+    update_sidebar_active,
+    update_sidebar_badges,
+    update_tab_content,
+)
+
+
+class AsyncSession:
+    def __init__(self):
+        self.calls = []
+
+    async def send_custom_message(self, name, payload):
+        self.calls.append((name, payload))
+
+
+def _drain(loop):
+    # run the (not yet running) loop until queued drains complete
+    loop.run_until_complete(asyncio.sleep(0.01))
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def test_interactive_lane_overtakes_background(loop):
+    s = AsyncSession()
+    d = attach_dispatcher(s, loop=loop)
+    assert get_dispatcher(s) is d
+
+    update_sidebar_badges(s, [{"href": "#a", "badge": "1"}])
+    update_sidebar_badges(s, [{"href": "#b", "badge": "2"}])
+    update_tab_content(s, "t1", "<p>x</p>")
+    update_sidebar_active(s, "#about")
+    assert s.calls == []
+    assert d.stats()["depth_by_lane"] == {INTERACTIVE: 2, BACKGROUND: 2}
+
+    _drain(loop)
+    assert [c[0] for c in s.calls] == [
+        "bs4dash_update_tab_content",
+        "bs4dash_update_sidebar_active",
+        "bs4dash_update_sidebar_badges",
+        "bs4dash_update_sidebar_badges",
+    ]
+    stats = d.stats()
+    assert stats["depth"] == 0
+    assert stats["delivered"] == 4
+
+
+def test_drop_oldest_prefers_background_messages(loop):
+    s = AsyncSession()
+    d = attach_dispatcher(s, loop=loop, maxsize=2, overflow="drop_oldest")
+    update_sidebar_badges(s, [{"href": "#a", "badge": "1"}])
+    update_tab_content(s, "t1", "one")
+    # full: drops the queued badge refresh rather than the tab update
+    assert update_tab_content(s, "t2", "two") is True
+    # full of interactive messages: a background message is dropped itself
+    assert update_sidebar_badges(s, [{"href": "#b", "badge": "2"}]) is False
+
+    _drain(loop)
+    assert [c[1].get("tab_id") for c in s.calls] == ["t1", "t2"]
+    assert d.stats()["dropped"] == 2
+
+
+def test_coalesce_replaces_queued_message_for_same_target(loop):
+    s = AsyncSession()
+    d = attach_dispatcher(s, loop=loop, overflow="coalesce")
+    update_tab_content(s, "t1", "old")
+    update_tab_content(s, "t2", "other")
+    update_tab_content(s, "t1", "new")
+    update_sidebar_badges(s, [{"href": "#a", "badge": "1"}])
+    update_sidebar_badges(s, [{"href": "#b", "badge": "2"}])
+    assert d.depth == 3
+
+    _drain(loop)
+    assert s.calls[:2] == [
+        ("bs4dash_update_tab_content", {"tab_id": "t1", "content": "new"}),
+        ("bs4dash_update_tab_content", {"tab_id": "t2", "content": "other"}),
+    ]
+    assert s.calls[2][1]["badges"] == [
+        {"href": "#a", "badge": "1"},
+        {"href": "#b", "badge": "2"},
+    ]
+    assert d.stats()["coalesced"] == 2
+
+
+def test_block_waits_for_space_with_timeout(loop):
+    s = AsyncSession()
+    d = attach_dispatcher(s, loop=loop, maxsize=1, block_timeout=0.05)
+    assert update_sidebar_active(s, "#a") is True
+    start = time.monotonic()
+    assert update_sidebar_active(s, "#b") is False
+    assert time.monotonic() - start >= 0.04
+    assert d.stats()["dropped"] == 1
+
+
+def test_worker_threads_deliver_on_session_loop():
+    s = AsyncSession()
+    loop = asyncio.new_event_loop()
+    t = threading.Thread(target=loop.run_forever, daemon=True)
+    t.start()
+    try:
+        d = attach_dispatcher(s, loop=loop, maxsize=4)
+        workers = [
+            threading.Thread(target=lambda i=i: update_tab_content(s, f"t{i}", str(i)))
+            for i in range(20)
+        ]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        deadline = time.time() + 2
+        while time.time() < deadline and len(s.calls) < 20:
+            time.sleep(0.01)
+        assert len(s.calls) == 20
+        assert d.stats()["delivered"] == 20
+        assert d.stats()["dropped"] == 0
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        t.join(timeout=1)
+        loop.close()
+
+
+def test_detach_restores_direct_sends(loop):
+    s = AsyncSession()
+    attach_dispatcher(s, loop=loop)
+    detach_dispatcher(s)
+    assert get_dispatcher(s) is None
+    update_sidebar_active(s, "#a")
+    assert s.calls == [("bs4dash_update_sidebar_active", {"target": "#a"})]
+
+
+def test_dispatcher_does_not_keep_its_session_alive(loop):
+    s = AsyncSession()
+    d = attach_dispatcher(s, loop=loop)
+    ref = weakref.ref(s)
+    del s
+    gc.collect()
+    assert ref() is None
+    assert d.session is None
+
+
+def test_invalid_overflow_policy(loop):
+    with pytest.raises(ValueError):
+        attach_dispatcher(AsyncSession(), loop=loop, overflow="nope")
@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+pytest.importorskip("shiny")
+
+from htmltools import HTMLDependency, HTMLDocument  # noqa: E402
+from shiny import ui  # noqa: E402
+
+from bs4dash_py import fragment_cache, icons, shiny_layout  # noqa: E402
+
+DEP = HTMLDependency("extra", "1.0", source={"subdir": "."}, script={"src": "x.js"})
+
+
+@pytest.fixture(autouse=True)
+def shared_cache(monkeypatch):
+    monkeypatch.setattr(fragment_cache, "_cache", fragment_cache.FragmentCache())
+
+
+def test_cached_builder_reuses_rendered_html_across_calls():
+    calls = []
+
+    def navbar(title, right_ui=None):
+        calls.append(title)
+        return shiny_layout.navbar_shiny(title, right_ui=right_ui)
+
+    cached = fragment_cache.cached_builder(navbar)
+    items = [{"title": "Inbox", "badge": "3"}, ui.tags.li(DEP)]
+    first = cached("Dash", right_ui=items)
+    assert cached("Dash", right_ui=items) is first
+    assert cached("Other", right_ui=items) is not first
+    assert cached(1) is not cached(True)
+    assert calls == ["Dash", "Other", 1, True]
+
+    def page(header):
+        return shiny_layout.dashboard_page_shiny(header=header)
+
+    expected = page(shiny_layout.navbar_shiny("Dash", right_ui=items))
+    rendered = HTMLDocument(page(first)).render(lib_prefix="lib")
+    assert rendered["html"] == HTMLDocument(expected).render(lib_prefix="lib")["html"]
+    assert "extra" in [d.name for d in rendered["dependencies"]]
+    stats = fragment_cache.fragment_cache_stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (4, 1, 4)
+    with pytest.raises(TypeError):
+        cached(object())
+
+
+def test_inline_fragments_and_icons_render_in_place(monkeypatch):
+    monkeypatch.setattr(icons, "_icons", {})
+    icons.register_icon("solid/home", '<svg viewBox="0 0 1 1"><path/></svg>')
+    span = fragment_cache.cache_fragment("span", lambda: ui.tags.span("x"))
+    assert str(ui.tags.div(span, "t")) == str(ui.tags.div(ui.tags.span("x"), "t"))
+    side = fragment_cache.cache_fragment(
+        "side",
+        lambda: shiny_layout.sidebar_shiny(menu=[("H", "#", None, "fas fa-home")]),
+    )
+    page = shiny_layout.dashboard_page_shiny(sidebar=side)
+    assert 'id="bs4i-solid-home"' in str(page)
+    with pytest.raises(TypeError):
+        fragment_cache.cache_fragment("list", lambda: [ui.tags.p("a")])
+
+
+def test_lru_eviction_by_entries_and_memory():
+    cache = fragment_cache.FragmentCache(max_entries=2, max_bytes=10_000)
+    for key in "abc":
+        str(cache.get(key, lambda k=key: ui.tags.p(k)))
+    assert list(cache.entries) == ["b", "c"]
+    cache.get("b", lambda: ui.tags.p("b"))
+    str(cache.get("big", lambda: ui.tags.p("x" * 9_900)))
+    # "c" was least recently used; the big entry alone fits the memory cap
+    assert list(cache.entries) == ["big"]
+    assert cache.stats()["evictions"] == 3
+    fragment_cache.set_fragment_cache_limits(max_entries=1)
+    with pytest.raises(ValueError):
+        fragment_cache.FragmentCache(max_bytes=0)
+
+
+def test_concurrent_misses_build_once():
+    started, release, builds = threading.Event(), threading.Event(), []
+
+    def build():
+        builds.append(1)
+        started.set()
+        release.wait(5)
+        return ui.tags.p("slow")
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(fragment_cache.cache_fragment("k", build))
+        )
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    started.wait(5)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert len(builds) == 1
+    assert len(results) == 4 and all(r is results[0] for r in results)
@@ -0,0 +1,104 @@
+import pytest
+
+pytest.importorskip("shiny")
+
+from htmltools import HTML, HTMLDependency, HTMLDocument  # noqa: E402
+from shiny import ui  # noqa: E402
+
+from bs4dash_py import html_render, icons, shiny_layout  # noqa: E402
+
+DEP = HTMLDependency("extra", "1.0", source={"subdir": "."}, script={"src": "x.js"})
+
+MENU = [
+    ("Home", "#home", None, "fas fa-home fa-fw"),
+    ("Inbox & <co>", '#in"box', {"text": 3, "color": "danger"}, "far fa-envelope"),
+    ("Plain", "#p", "new"),
+    {"text": "Active", "href": "#a", "active": True, "badge": {"text": "x"}},
+    {"text": HTML("<b>raw</b>"), "href": None},
+    {"text": ui.tags.em("tag"), "icon": ui.tags.i(class_="x")},
+    ("Header {0}",),
+    "DIVIDE",
+    ("Group", [("A", "#a"), {"text": "B", "badge": "2", "icon": "fas fa-home"}]),
+    ("Empty group", []),
+    (ui.tags.b("tag title"), [("C", "#c")]),
+    (ui.tags.b("tag header"),),
+    42,
+]
+
+CASES = [
+    ("sidebar_shiny", (), {"menu": MENU}),
+    ("sidebar_shiny", ("B<r>",), {"menu": [], "id": None}),
+    ("sidebar_shiny", (ui.tags.i("brand"),), {}),
+    (
+        "menu_item_shiny",
+        ("x", "#"),
+        {"badge": "1", "active": True, "icon": "fas fa-home"},
+    ),
+    ("menu_group_shiny", ("g", [("a", "#")]), {}),
+    ("navbar_item_shiny", ("N", "#n"), {"badge": "5", "icon": "fas fa-bell"}),
+    ("sidebar_header_shiny", ("h",), {}),
+    ("sidebar_divider_shiny", (), {}),
+    (
+        "box_shiny",
+        ([ui.tags.p("a"), "text", DEP],),
+        {"title": "T & x", "status": "primary", "width": 6, "id": "b1"},
+    ),
+    ("box_shiny", ("just text",), {}),
+    ("box_shiny", ([],), {"title": ui.tags.span("t")}),
+    ("box_shiny", (lambda: ui.tags.div(ui.tags.p("deep")),), {"title": "{0}"}),
+    (
+        "value_box_shiny",
+        ("42", "Users"),
+        {"icon": ui.tags.i(class_="fas fa-user"), "color": "info", "href": "#u"},
+    ),
+    ("value_box_shiny", (ui.tags.span("v"),), {}),
+    ("info_box_shiny", ("T", "9"), {"icon": ui.tags.i(class_="x"), "color": "danger"}),
+    ("info_box_shiny", (ui.tags.b("T"), ui.tags.div(ui.tags.p("v"))), {"width": 4}),
+]
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    monkeypatch.setattr(icons, "_icons", {})
+    monkeypatch.setattr(icons, "_dirs", [])
+    icons.register_icon("solid/home", '<svg viewBox="0 0 1 1"><path d="M0"/></svg>')
+
+
+@pytest.mark.parametrize("name,args,kwargs", CASES)
+def test_string_builders_match_tag_builders(name, args, kwargs):
+    tag = getattr(shiny_layout, name)(*args, **kwargs)
+    fragment = getattr(html_render, name)(*args, **kwargs)
+    assert isinstance(fragment, html_render.Fragment)
+    assert str(fragment) == str(tag)
+
+    # indentation follows wherever the fragment is placed
+    def nest(x):
+        return ui.tags.div(ui.tags.section(x, "tail"), ui.tags.span("i"))
+
+    assert str(nest(fragment)) == str(nest(tag))
+
+
+def test_pages_keep_dependencies_and_icons():
+    def page(layout):
+        return layout.dashboard_page_shiny(
+            sidebar=layout.sidebar_shiny(menu=MENU),
+            body=layout.box_shiny([ui.tags.p("a"), DEP], id="b"),
+        )
+
+    tags = HTMLDocument(page(shiny_layout)).render(lib_prefix="lib")
+    strings = HTMLDocument(page(html_render)).render(lib_prefix="lib")
+    assert strings["html"] == tags["html"]
+    assert "extra" in [d.name for d in strings["dependencies"]]
+    assert 'id="bs4i-solid-home"' in strings["html"]
+
+
+def test_lazy_box_registers_its_body():
+    from bs4dash_py import lazy
+
+    fragment = html_render.box_shiny(ui.tags.p("later"), id="lz", lazy=True)
+    key = lazy._latest["box", "lz"]
+    assert f'data-bs4dash-box-key="{key}"' in str(fragment)
+    same = str(shiny_layout.box_shiny(ui.tags.p("x"), id="lz", lazy=True))
+    assert str(fragment).replace(key, lazy._latest["box", "lz"]) == same
+    with pytest.raises(ValueError):
+        html_render.box_shiny("x", lazy=True)
@@ -0,0 +1,78 @@
+import pytest
+
+pytest.importorskip("shiny")
+
+from bs4dash_py import icons  # noqa: E402
+from bs4dash_py.sidebar_data import compact_menu, menu_icons  # noqa: E402
+
+HOME = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 576 512"><path d="M1 2"/></svg>'
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch, tmp_path):
+    monkeypatch.setattr(icons, "_icons", {})
+    monkeypatch.setattr(icons, "_dirs", [])
+    (tmp_path / "regular").mkdir()
+    (tmp_path / "regular" / "bell.svg").write_text(
+        '<svg viewBox="0 0 448 512"><path d="M3 4"/></svg>'
+    )
+    icons.register_icon("solid/home", HOME)
+    icons.register_icons(tmp_path)
+
+
+def test_class_strings_resolve_to_registered_icons():
+    assert icons.resolve_icon("fas fa-home") == ("solid/home", [])
+    assert icons.resolve_icon("fa-solid fa-fw fa-home nav-icon") == (
+        "solid/home",
+        ["fa-fw", "nav-icon"],
+    )
+    assert icons.resolve_icon("far fa-bell") == ("regular/bell", [])
+    assert icons.resolve_icon("fas fa-cog") is None
+    with pytest.raises(ValueError):
+        icons.register_icon("bad", "<path/>")
+
+
+def test_page_inlines_a_sprite_of_the_icons_used():
+    from bs4dash_py import dashboard_page_shiny, navbar_shiny, sidebar_shiny
+
+    side = sidebar_shiny(
+        menu=[
+            ("Home", "#", None, "fas fa-home"),
+            ("Settings", "#s", None, "fas fa-cog"),
+        ]
+    )
+    hdr = navbar_shiny(
+        right_ui=[{"title": "Alerts", "href": "#a", "icon": "far fa-bell"}]
+    )
+    html = str(dashboard_page_shiny(header=hdr, sidebar=side))
+
+    assert '<use href="#bs4i-solid-home"></use>' in html
+    assert '<use href="#bs4i-regular-bell"></use>' in html
+    # unregistered icons keep their icon-font tag
+    assert '<i class="fas fa-cog"></i>' in html
+    sprite = html[html.index('class="bs4dash-icon-sprite"') : html.index("</svg>")]
+    assert sprite.count("<symbol") == 2
+    assert (
+        '<symbol id="bs4i-solid-home" viewBox="0 0 576 512"><path d="M1 2"/>' in sprite
+    )
+    assert html.index("bs4dash-icon-sprite") < html.index('class="wrapper"')
+
+    # no registered icons used: no sprite
+    assert "bs4dash-icon-sprite" not in str(dashboard_page_shiny())
+    html = str(dashboard_page_shiny(icons=["far fa-bell"]))
+    assert 'id="bs4i-regular-bell"' in html
+
+
+def test_virtual_sidebar_rows_reference_the_sprite():
+    from bs4dash_py import dashboard_page_shiny, sidebar_shiny
+
+    menu = [
+        ("Home", "#", None, "fas fa-home nav-icon"),
+        ("G", [("B", "#b", None, "far fa-bell")]),
+    ]
+    data = compact_menu(menu)
+    assert data["menu"][0] == ["Home", "#", None, "@solid/home nav-icon"]
+    assert menu_icons(data) == ["solid/home", "regular/bell"]
+
+    html = str(dashboard_page_shiny(sidebar=sidebar_shiny(menu=menu, virtual=True)))
+    assert 'id="bs4i-solid-home"' in html and 'id="bs4i-regular-bell"' in html
@@ -0,0 +1,278 @@
+import gc
+import re
+import weakref
+
+import pytest
+
+from bs4dash_py import lazy
+from bs4dash_py.lazy import handle_lazy_tab, lazy_tabs, register_lazy_panes
+
+
+class DummySession:
+    def __init__(self):
+        self.calls = []
+
+    def send_custom_message(self, name, payload):
+        self.calls.append((name, payload))
+
+
+class ShinyLikeSession(DummySession):
+    """Renders UI with its HTML dependencies, as Shiny sessions do."""
+
+    def __init__(self):
+        super().__init__()
+        self.registered = []
+
+    def _process_ui(self, ui):
+        from htmltools import TagList
+
+        res = TagList(ui).render()
+        self.registered.extend(d.name for d in res["dependencies"])
+        deps = [d.as_dict(lib_prefix="lib") for d in res["dependencies"]]
+        return {"deps": deps, "html": res["html"]}
+
+
+def _widget():
+    from htmltools import HTMLDependency, tags
+
+    dep = HTMLDependency(
+        "widget", "1.0", source={"subdir": "."}, script={"src": "widget.js"}
+    )
+    return tags.div(tags.span("chart"), dep, class_="widget")
+
+
+def _event(tab, event="activate", tabs="reports"):
+    return {"tabs": tabs, "tab": tab, "event": event}
+
+
+def test_panes_render_once_on_first_activation():
+    renders = []
+
+    def details():
+        renders.append("details")
+        return "<p>details</p>"
+
+    register_lazy_panes("reports", {"overview": "o", "details": details}, "overview")
+    s = DummySession()
+    lazy_tabs(s, "reports")
+    assert renders == []
+    handle_lazy_tab(s, _event("details"))
+    handle_lazy_tab(s, _event("details", "hide"))
+    handle_lazy_tab(s, _event("details"))
+    # the initially active pane was built with the page
+    handle_lazy_tab(s, _event("overview"))
+    assert renders == ["details"]
+    assert s.calls == [
+        (
+            "bs4dash_update_tab_content",
+            {"tab_id": "details", "content": "<p>details</p>"},
+        )
+    ]
+
+
+def test_unload_on_hide_renders_again():
+    register_lazy_panes("reports", {"a": "<p>a</p>", "b": "<p>b</p>"}, "a")
+    s = DummySession()
+    tabs = lazy_tabs(s, "reports", keep_alive=False)
+    handle_lazy_tab(s, _event("a", "hide"))
+    handle_lazy_tab(s, _event("b"))
+    handle_lazy_tab(s, _event("b", "hide"))
+    handle_lazy_tab(s, _event("a"))
+    assert [(n, p["tab_id"]) for n, p in s.calls] == [
+        ("bs4dash_unload_tab", "a"),
+        ("bs4dash_update_tab_content", "b"),
+        ("bs4dash_unload_tab", "b"),
+        ("bs4dash_update_tab_content", "a"),
+    ]
+    assert tabs.loaded == {"a"}
+
+
+def test_unknown_tabs_and_events_are_ignored():
+    register_lazy_panes("reports", {"a": "x"}, None)
+    s = DummySession()
+    lazy_tabs(s, "reports", panes={"b": lambda: "<p>b</p>"})
+    handle_lazy_tab(s, _event("a", tabs="other"))
+    handle_lazy_tab(s, _event("missing"))
+    handle_lazy_tab(s, "garbage")
+    handle_lazy_tab(s, _event("b"))
+    assert s.calls == [
+        ("bs4dash_update_tab_content", {"tab_id": "b", "content": "<p>b</p>"})
+    ]
+
+
+def test_sessions_get_the_panes_of_their_own_page():
+    first = register_lazy_panes("per-page", {"a": "a", "b": "<p>b1</p>"}, "a")
+    second = register_lazy_panes("per-page", {"a": "a", "b": "<p>b2</p>"}, "a")
+    s1, s2 = DummySession(), DummySession()
+    lazy_tabs(s1, "per-page")
+    lazy_tabs(s2, "per-page")
+    handle_lazy_tab(s1, dict(_event("b", tabs="per-page"), key=first))
+    handle_lazy_tab(s2, dict(_event("b", tabs="per-page"), key=second))
+    assert s1.calls[-1][1]["content"] == "<p>b1</p>"
+    assert s2.calls[-1][1]["content"] == "<p>b2</p>"
+
+
+def test_registrations_are_bounded(monkeypatch):
+    monkeypatch.setattr(lazy, "MAX_REGISTRATIONS", 3)
+    keys = [register_lazy_panes(f"bounded{i}", {"a": "a"}, None) for i in range(5)]
+    assert len(lazy._registry) == 3 and keys[0] not in lazy._registry
+    assert ("tabs", "bounded0") not in lazy._latest
+
+
+def test_lazy_tabs_do_not_keep_the_session_alive():
+    register_lazy_panes("weak", {"a": "a"}, None)
+    s = DummySession()
+    tabs = lazy_tabs(s, "weak")
+    ref = weakref.ref(s)
+    del s
+    gc.collect()
+    assert ref() is None and tabs.session is None
+
+
+def test_lazy_layout_builds_only_the_active_pane():
+    pytest.importorskip("shiny")
+    from bs4dash_py import tabs_shiny
+
+    built = []
+
+    def pane(text):
+        def build():
+            built.append(text)
+            return text
+
+        return build
+
+    html = str(
+        tabs_shiny(
+            "lazy1",
+            ("t1", "One", pane("Content 1"), True),
+            ("t2", "Two", pane("Content 2")),
+            lazy=True,
+        )
+    )
+    assert built == ["Content 1"]
+    assert 'data-bs4dash-lazy-tabs="' in html
+    assert 'id="t2" data-bs4dash-lazy="pending"' in html
+    assert "Content 2" not in html
+
+    s = DummySession()
+    lazy_tabs(s, "lazy1")
+    handle_lazy_tab(s, _event("t2", tabs="lazy1"))
+    assert s.calls[-1][1] == {"tab_id": "t2", "content": "Content 2"}
+
+
+def test_pane_content_ships_its_dependencies():
+    pytest.importorskip("htmltools")
+    register_lazy_panes("reports", {"a": "a", "chart": _widget}, "a")
+    s = ShinyLikeSession()
+    lazy_tabs(s, "reports")
+    handle_lazy_tab(s, _event("chart"))
+    name, payload = s.calls[-1]
+    assert payload["tab_id"] == "chart"
+    assert (
+        'class="widget"' in payload["content"] and "<script" not in payload["content"]
+    )
+    assert [d["name"] for d in payload["deps"]] == ["widget"]
+    assert payload["deps"][0]["script"][0]["src"].endswith("widget.js")
+    assert s.registered == ["widget"]
+
+
+def test_boxes_render_once_when_reported():
+    from bs4dash_py.lazy import handle_lazy_box, lazy_boxes, register_lazy_box
+
+    renders = []
+
+    def sales():
+        renders.append("sales")
+        return "<p>sales</p>"
+
+    register_lazy_box("sales", sales)
+    s = DummySession()
+    lazy_boxes(s, boxes={"kpis": "<p>kpis</p>"})
+    assert renders == []
+    # reports are cumulative: ids already rendered are skipped
+    handle_lazy_box(s, {"boxes": ["sales"]})
+    handle_lazy_box(s, {"boxes": ["sales", "kpis", "unknown"]})
+    assert renders == ["sales"]
+    assert s.calls == [
+        (
+            "bs4dash_update_tab_content",
+            {"tab_id": "sales-body", "content": "<p>sales</p>"},
+        ),
+        (
+            "bs4dash_update_tab_content",
+            {"tab_id": "kpis-body", "content": "<p>kpis</p>"},
+        ),
+    ]
+
+
+def test_boxes_render_the_body_of_their_own_page():
+    from bs4dash_py.lazy import handle_lazy_box, lazy_boxes, register_lazy_box
+
+    first = register_lazy_box("per-page-box", "<p>one</p>")
+    second = register_lazy_box("per-page-box", "<p>two</p>")
+    s1, s2 = DummySession(), DummySession()
+    lazy_boxes(s1)
+    lazy_boxes(s2)
+    handle_lazy_box(s1, {"boxes": ["per-page-box"], "keys": [first]})
+    handle_lazy_box(s2, {"boxes": ["per-page-box"], "keys": [second]})
+    assert s1.calls[-1][1]["content"] == "<p>one</p>"
+    assert s2.calls[-1][1]["content"] == "<p>two</p>"
+
+    tracker = lazy_boxes(s1)
+    ref = weakref.ref(s1)
+    del s1
+    gc.collect()
+    assert ref() is None and tracker.session is None
+
+
+def test_lazy_box_layout_shows_a_skeleton():
+    pytest.importorskip("shiny")
+    from bs4dash_py import box_shiny
+
+    built = []
+
+    def body():
+        built.append(1)
+        return "Body"
+
+    html = str(box_shiny(body, title="Sales", id="sales2", lazy=True))
+    assert built == []
+    assert 'id="sales2-body"' in html and 'data-bs4dash-defer="pending"' in html
+    assert "bs4dash-skeleton" in html and "Body" not in html
+    assert "Body" in str(box_shiny(body, title="Sales"))
+    with pytest.raises(ValueError):
+        box_shiny("x", lazy=True)
+
+
+def test_lazy_value_box_and_box_dependencies():
+    pytest.importorskip("shiny")
+    from bs4dash_py import box_shiny, html_render, value_box_shiny
+    from bs4dash_py.lazy import handle_lazy_box, lazy_boxes
+
+    computed = []
+
+    def orders():
+        computed.append(1)
+        return "42"
+
+    html = str(value_box_shiny(orders, "Orders", id="orders", lazy=True))
+    assert computed == []
+    assert 'id="orders-body"' in html and 'data-bs4dash-defer="pending"' in html
+    key = re.compile(r'data-bs4dash-box-key="\w+"')
+    assert key.sub("", html) == key.sub(
+        "", str(html_render.value_box_shiny(orders, "Orders", id="orders", lazy=True))
+    )
+    box_shiny(_widget, id="chart", lazy=True)
+
+    s = ShinyLikeSession()
+    lazy_boxes(s)
+    handle_lazy_box(s, {"boxes": ["orders", "chart"]})
+    assert computed == [1]
+    (_, value), (_, chart) = s.calls
+    assert value["tab_id"] == "orders-body" and "<h3>42</h3>" in value["content"]
+    assert "<p>Orders</p>" in value["content"] and "deps" not in value
+    assert chart["tab_id"] == "chart-body" and 'class="widget"' in chart["content"]
+    assert [d["name"] for d in chart["deps"]] == ["widget"]
+    with pytest.raises(ValueError):
+        value_box_shiny("1", lazy=True)
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from bs4dash_py.metrics import (
+    disable_metrics,
+    enable_metrics,
+    metrics_snapshot,
+    prometheus_text,
+)
+from bs4dash_py.server import (
+    aupdate_tab_content,
+    batch,
+    update_sidebar_active,
+    update_sidebar_badges,
+    update_tab_content,
+)
+
+
+class DummySession:
+    def __init__(self, sid="s1"):
+        self.id = sid
+        self.calls = []
+        self.ended = []
+
+    def send_custom_message(self, name, payload):
+        self.calls.append((name, payload))
+
+    def on_ended(self, fn):
+        self.ended.append(fn)
+
+
+@pytest.fixture
+def metrics():
+    disable_metrics()
+    yield enable_metrics()
+    disable_metrics()
+
+
+def test_counts_bytes_and_histograms_per_message(metrics):
+    s = DummySession()
+    update_tab_content(s, "t1", "x" * 1000)
+    update_sidebar_active(s, "#a")
+    snap = metrics_snapshot()
+    tab = snap["messages"]["bs4dash_update_tab_content"]
+    assert tab["sent"] == 1 and tab["failed"] == 0
+    assert tab["bytes"] > 1000
+    assert tab["size_bytes"]["count"] == 1
+    assert tab["latency_seconds"]["buckets"][-1] == (float("inf"), 1)
+    assert snap["sessions"]["s1"]["sent"] == 2
+
+
+def test_batches_are_attributed_to_their_messages(metrics):
+    s = DummySession()
+    with batch(s):
+        update_tab_content(s, "t1", "a")
+        update_sidebar_badges(s, [{"href": "#a", "badge": "1"}])
+    assert s.calls[0][0] == "bs4dash_batch"
+    messages = metrics_snapshot()["messages"]
+    assert "bs4dash_batch" not in messages
+    assert messages["bs4dash_update_tab_content"]["sent"] == 1
+    assert messages["bs4dash_update_sidebar_badges"]["sent"] == 1
+
+
+def test_failures_are_counted_by_reason(metrics):
+    class Closed(DummySession):
+        async def send_custom_message(self, name, payload):
+            raise ConnectionError("closed")
+
+    class Mute:
+        pass
+
+    assert asyncio.run(aupdate_tab_content(Closed(), "t1", "x")) is False
+    assert update_tab_content(Mute(), "t1", "x") is False
+    failures = {
+        (f["message"], f["reason"]): f["count"] for f in metrics_snapshot()["failures"]
+    }
+    assert failures == {
+        ("bs4dash_update_tab_content", "ConnectionError"): 1,
+        ("bs4dash_update_tab_content", "no_sender"): 1,
+    }
+
+
+def test_exporters_and_session_cleanup(metrics):
+    events = []
+    metrics.add_exporter(events.append)
+    metrics.add_exporter(lambda event: 1 / 0)  # errors are ignored
+    s = DummySession("abc")
+    update_sidebar_active(s, "#a")
+    assert events[0]["message"] == "bs4dash_update_sidebar_active"
+    assert events[0]["session"] == "abc" and events[0]["ok"] is True
+    s.ended[0]()
+    assert "abc" not in metrics_snapshot()["sessions"]
+
+
+def test_prometheus_text(metrics):
+    s = DummySession('we"ird')
+    update_tab_content(s, "t1", "x")
+    text = prometheus_text()
+    assert "# TYPE bs4dash_messages_total counter" in text
+    assert (
+        'bs4dash_messages_total{message="bs4dash_update_tab_content",outcome="sent"} 1'
+        in text
+    )
+    assert (
+        'bs4dash_send_latency_seconds_bucket{message="bs4dash_update_tab_content",'
+        'le="+Inf"} 1' in text
+    )
+    assert 'session="we\\"ird"' in text
+
+
+def test_disabled_by_default():
+    disable_metrics()
+    update_sidebar_active(DummySession(), "#a")
+    assert metrics_snapshot() == {"messages": {}, "sessions": {}, "failures": []}
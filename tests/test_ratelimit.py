@@ -0,0 +1,168 @@
+import asyncio
+import gc
+import weakref
+
+import pytest
+
+from bs4dash_py.ratelimit import (
+    clear_rate_limits,
+    debounce,
+    flush_rate_limits,
+    set_rate_limits,
+    throttle,
+)
+from bs4dash_py.server import (
+    toggle_controlbar,
+    update_sidebar_badges,
+    update_tab_content,
+)
+
+
+class DummySession:
+    def __init__(self):
+        self.calls = []
+
+    def send_custom_message(self, name, payload):
+        self.calls.append((name, payload))
+
+
+def test_policy_arguments_are_validated():
+    assert throttle("x", hz=4).interval == 0.25
+    assert throttle("x", ms=100).interval == 0.1
+    with pytest.raises(ValueError):
+        throttle("x")
+    with pytest.raises(ValueError):
+        throttle("x", hz=4, ms=10)
+    with pytest.raises(ValueError):
+        debounce("x", ms=0)
+
+
+def test_throttle_sends_leading_and_trailing_updates():
+    s = DummySession()
+
+    async def main():
+        set_rate_limits(s, throttle("bs4dash_update_tab_content", ms=50))
+        for i in range(20):
+            assert update_tab_content(s, "t1", str(i)) is True
+        assert [p["content"] for _, p in s.calls] == ["0"]
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert [p["content"] for _, p in s.calls] == ["0", "19"]
+
+
+def test_throttle_applies_per_target_and_merges_badges():
+    s = DummySession()
+
+    async def main():
+        set_rate_limits(
+            s,
+            throttle("bs4dash_update_tab_content", ms=50),
+            throttle("bs4dash_update_sidebar_badges", ms=50),
+        )
+        update_tab_content(s, "t1", "a")
+        update_tab_content(s, "t2", "b")
+        update_sidebar_badges(s, [{"href": "#a", "badge": "1"}])
+        update_sidebar_badges(s, [{"href": "#a", "badge": "2"}])
+        update_sidebar_badges(s, [{"href": "#b", "badge": "5"}])
+        assert len(s.calls) == 3
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert s.calls[-1] == (
+        "bs4dash_update_sidebar_badges",
+        {"badges": [{"href": "#a", "badge": "2"}, {"href": "#b", "badge": "5"}]},
+    )
+
+
+def test_debounce_waits_for_quiet_and_honours_max_wait():
+    s = DummySession()
+
+    async def main():
+        set_rate_limits(s, debounce("bs4dash_update_tab_content", ms=40))
+        for i in range(5):
+            update_tab_content(s, "t1", str(i))
+            await asyncio.sleep(0.01)
+        assert s.calls == []
+        await asyncio.sleep(0.08)
+        assert [p["content"] for _, p in s.calls] == ["4"]
+
+        s.calls.clear()
+        set_rate_limits(s, debounce("bs4dash_update_tab_content", ms=40, max_ms=60))
+        for i in range(12):
+            update_tab_content(s, "t1", str(i))
+            await asyncio.sleep(0.01)
+        # a steady stream is still delivered within max_ms
+        assert s.calls
+        await asyncio.sleep(0.08)
+
+    asyncio.run(main())
+    assert s.calls[-1][1]["content"] == "11"
+
+
+def test_toggle_is_never_held():
+    s = DummySession()
+
+    async def main():
+        set_rate_limits(s, throttle("bs4dash_controlbar", hz=1))
+        toggle_controlbar(s)
+        toggle_controlbar(s)
+
+    asyncio.run(main())
+    assert len(s.calls) == 2
+
+
+def test_flush_and_clear_send_held_messages():
+    s = DummySession()
+
+    async def main():
+        set_rate_limits(s, debounce("bs4dash_update_tab_content", ms=1000))
+        update_tab_content(s, "t1", "a")
+        flush_rate_limits(s)
+        assert s.calls == [
+            ("bs4dash_update_tab_content", {"tab_id": "t1", "content": "a"})
+        ]
+        update_tab_content(s, "t1", "b")
+        clear_rate_limits(s)
+        assert s.calls[-1][1]["content"] == "b"
+        # limits are gone: sent immediately
+        update_tab_content(s, "t1", "c")
+        assert s.calls[-1][1]["content"] == "c"
+
+    asyncio.run(main())
+
+
+def test_trailing_update_is_held_while_the_page_is_hidden():
+    from bs4dash_py.background import enable_background_hold, set_page_visible
+
+    s = DummySession()
+    enable_background_hold(s)
+
+    async def main():
+        set_rate_limits(s, throttle("bs4dash_update_tab_content", ms=50))
+        update_tab_content(s, "t1", "a")
+        update_tab_content(s, "t1", "b")
+        set_page_visible(s, False)
+        await asyncio.sleep(0.1)
+        assert [p["content"] for _, p in s.calls] == ["a"]
+        set_page_visible(s, True)
+
+    asyncio.run(main())
+    assert [p["content"] for _, p in s.calls] == ["a", "b"]
+
+
+def test_limiter_does_not_keep_its_session_alive():
+    async def main():
+        s = DummySession()
+        ref = weakref.ref(s)
+        set_rate_limits(s, throttle("bs4dash_update_tab_content", ms=20))
+        update_tab_content(s, "t1", "a")
+        # the trailing-edge timer is still pending
+        update_tab_content(s, "t1", "b")
+        del s
+        gc.collect()
+        assert ref() is None
+        # and firing it for the collected session is a no-op
+        await asyncio.sleep(0.05)
+
+    asyncio.run(main())
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+
+import pytest
+
+from bs4dash_py import server
+from bs4dash_py.server import (
+    ashow_controlbar,
+    aupdate_navbar_items,
+    aupdate_sidebar_badges,
+    aupdate_tab_content,
+    batch,
+    update_sidebar,
+)
+
+
+def test_async_helpers_await_delivery():
+    class SAsync:
+        def __init__(self):
+            self.calls = []
+
+        async def send_custom_message(self, name, payload):
+            await asyncio.sleep(0)
+            self.calls.append((name, payload))
+
+    async def main():
+        s = SAsync()
+        assert await aupdate_sidebar_badges(s, [{"href": "#a", "badge": "1"}])
+        # delivered by the time the await returns; nothing left scheduled
+        assert s.calls == [
+            (
+                "bs4dash_update_sidebar_badges",
+                {"badges": [{"href": "#a", "badge": "1"}]},
+            )
+        ]
+        assert await ashow_controlbar(s) is True
+        assert s.calls[-1] == ("bs4dash_controlbar", {"action": "show"})
+
+    asyncio.run(main())
+
+
+def test_async_helpers_work_with_sync_sessions():
+    class S:
+        def __init__(self):
+            self.calls = []
+
+        def send(self, message):
+            self.calls.append(message)
+
+    s = S()
+    assert asyncio.run(aupdate_navbar_items(s, "nav", [{"title": "A"}])) is True
+    assert s.calls == [
+        {
+            "type": "bs4dash_update_nav_items",
+            "data": {"nav_id": "nav", "items": [{"title": "A"}]},
+        }
+    ]
+
+
+def test_async_helpers_report_failed_sends():
+    class SAsync:
+        async def send_custom_message(self, name, payload):
+            raise ConnectionError("closed")
+
+    assert asyncio.run(aupdate_tab_content(SAsync(), "t1", "x")) is False
+
+
+def test_async_helpers_queue_on_open_batch():
+    class S:
+        def __init__(self):
+            self.calls = []
+
+        def send_custom_message(self, name, payload):
+            self.calls.append((name, payload))
+
+    s = S()
+    with batch(s):
+        assert asyncio.run(aupdate_tab_content(s, "t1", "x")) is True
+        assert s.calls == []
+    assert s.calls == [("bs4dash_update_tab_content", {"tab_id": "t1", "content": "x"})]
+
+
+def test_sync_callers_reuse_shared_loop():
+    seen = []
+
+    class SAsync:
+        async def send_custom_message(self, name, payload):
+            seen.append((asyncio.get_running_loop(), threading.get_ident()))
+
+    s = SAsync()
+    update_sidebar(s, [{"text": "A", "href": "#a"}])
+    update_sidebar(s, [{"text": "B", "href": "#b"}])
+
+    # run to completion before returning, on one long-lived background loop
+    assert len(seen) == 2
+    assert seen[0] == seen[1]
+    assert seen[0][0] is server._get_shared_loop()
+    assert seen[0][1] != threading.get_ident()
+
+
+def test_async_helpers_send_during_a_reactive_flush():
+    pytest.importorskip("shiny")
+    from shiny import reactive
+
+    class FlushSession:
+        def __init__(self):
+            self.calls = []
+            self.flush_callbacks = []
+
+        async def send_custom_message(self, name, payload):
+            await asyncio.sleep(0)
+            self.calls.append((name, payload))
+
+        def on_flush(self, fn, once=True):
+            self.flush_callbacks.append(fn)
+
+    s = FlushSession()
+    seen = []
+
+    async def main():
+        @reactive.effect
+        async def _():
+            server.update_sidebar_active(s, "#a")
+            assert s.calls == []
+            assert await aupdate_tab_content(s, "t1", "x") is True
+            seen.append(list(s.calls))
+
+        await reactive.flush()
+        # the batch opened for the flush shipped with the awaited message
+        for fn in s.flush_callbacks:
+            await fn()
+
+    asyncio.run(main())
+    assert len(seen) == 1 and len(seen[0]) == 1
+    name, payload = seen[0][0]
+    assert name == "bs4dash_batch"
+    assert [m["type"] for m in payload["messages"]] == [
+        "bs4dash_update_sidebar_active",
+        "bs4dash_update_tab_content",
+    ]
+    assert len(s.calls) == 1
@@ -0,0 +1,163 @@
+import asyncio
+import threading
+
+from bs4dash_py import server
+from bs4dash_py.server import (
+    batch,
+    hide_controlbar,
+    show_controlbar,
+    toggle_controlbar,
+    update_sidebar_active,
+    update_sidebar_badges,
+    update_tab_content,
+)
+
+
+class DummySession:
+    def __init__(self):
+        self.calls = []
+
+    def send_custom_message(self, name, payload):
+        self.calls.append((name, payload))
+
+
+def test_batch_ships_one_message():
+    s = DummySession()
+    with batch(s):
+        assert update_tab_content(s, "t1", "<p>1</p>") is True
+        assert update_sidebar_active(s, "#about") is True
+        assert s.calls == []
+
+    assert len(s.calls) == 1
+    name, payload = s.calls[0]
+    assert name == "bs4dash_batch"
+    assert [m["type"] for m in payload["messages"]] == [
+        "bs4dash_update_tab_content",
+        "bs4dash_update_sidebar_active",
+    ]
+
+
+def test_batch_coalesces_superseded_updates():
+    s = DummySession()
+    with batch(s):
+        update_tab_content(s, "t1", "<p>old</p>")
+        update_tab_content(s, "t2", "<p>other</p>")
+        update_tab_content(s, "t1", "<p>new</p>")
+        update_sidebar_badges(s, [{"href": "#a", "badge": "1"}])
+        update_sidebar_badges(
+            s, [{"href": "#b", "badge": "2"}, {"href": "#a", "badge": "3"}]
+        )
+
+    messages = s.calls[0][1]["messages"]
+    tabs = [m["data"] for m in messages if m["type"] == "bs4dash_update_tab_content"]
+    assert tabs == [
+        {"tab_id": "t1", "content": "<p>new</p>"},
+        {"tab_id": "t2", "content": "<p>other</p>"},
+    ]
+    badges = [m for m in messages if m["type"] == "bs4dash_update_sidebar_badges"]
+    assert len(badges) == 1
+    assert badges[0]["data"]["badges"] == [
+        {"href": "#a", "badge": "3"},
+        {"href": "#b", "badge": "2"},
+    ]
+
+
+def test_coalesced_updates_keep_their_position():
+    s = DummySession()
+    with batch(s):
+        server.update_sidebar(s, [{"text": "A", "href": "#a"}])
+        update_sidebar_active(s, "#a")
+        update_sidebar_badges(s, [{"href": "#a", "badge": "1"}])
+        server.update_sidebar(s, [{"text": "B", "href": "#b"}])
+
+    # the new menu is in place before the active and badge updates apply
+    messages = s.calls[0][1]["messages"]
+    assert [m["type"] for m in messages] == [
+        "bs4dash_update_sidebar",
+        "bs4dash_update_sidebar_active",
+        "bs4dash_update_sidebar_badges",
+    ]
+    assert messages[0]["data"] == {"items": [{"text": "B", "href": "#b"}]}
+
+
+def test_batch_keeps_toggles_and_last_show_hide():
+    s = DummySession()
+    with batch(s):
+        show_controlbar(s)
+        toggle_controlbar(s)
+        toggle_controlbar(s)
+        hide_controlbar(s)
+
+    actions = [m["data"]["action"] for m in s.calls[0][1]["messages"]]
+    assert actions == ["toggle", "toggle", "hide"]
+
+    with batch(s):
+        hide_controlbar(s)
+        update_sidebar_active(s, "#a")
+        show_controlbar(s)
+
+    actions = [m["data"].get("action") for m in s.calls[1][1]["messages"]]
+    assert actions == ["show", None]
+
+
+def test_single_message_batch_is_unwrapped():
+    s = DummySession()
+    with batch(s):
+        update_sidebar_active(s, "#a")
+        update_sidebar_active(s, "#b")
+
+    assert s.calls == [("bs4dash_update_sidebar_active", {"target": "#b"})]
+
+
+def test_nested_batches_ship_once_from_outermost():
+    s = DummySession()
+    with batch(s):
+        with batch(s):
+            update_tab_content(s, "t1", "x")
+        assert s.calls == []
+        update_tab_content(s, "t2", "y")
+    assert len(s.calls) == 1
+    assert s.calls[0][0] == "bs4dash_batch"
+
+
+def test_other_threads_are_not_batched():
+    s = DummySession()
+    with batch(s):
+        t = threading.Thread(target=lambda: update_sidebar_active(s, "#worker"))
+        t.start()
+        t.join()
+        assert s.calls == [("bs4dash_update_sidebar_active", {"target": "#worker"})]
+        update_sidebar_active(s, "#main")
+    assert s.calls[-1] == ("bs4dash_update_sidebar_active", {"target": "#main"})
+
+
+def test_reactive_flush_batches_until_on_flush(monkeypatch):
+    class FlushSession(DummySession):
+        def __init__(self):
+            super().__init__()
+            self.flush_callbacks = []
+
+        def on_flush(self, fn, once=True):
+            self.flush_callbacks.append(fn)
+
+    monkeypatch.setattr(server, "_in_reactive_context", lambda: True)
+    s = FlushSession()
+    update_sidebar_badges(s, [{"href": "#a", "badge": "1"}])
+    update_tab_content(s, "t1", "<p>x</p>")
+    assert s.calls == []
+    assert len(s.flush_callbacks) == 1
+
+    asyncio.run(s.flush_callbacks[0]())
+    assert len(s.calls) == 1
+    assert s.calls[0][0] == "bs4dash_batch"
+    assert len(s.calls[0][1]["messages"]) == 2
+
+
+def test_sessions_outside_reactive_context_send_immediately():
+    class FlushSession(DummySession):
+        def on_flush(self, fn, once=True):
+            raise AssertionError("should not register a flush callback")
+
+    s = FlushSession()
+    update_sidebar_active(s, "#a")
+    assert s.calls == [("bs4dash_update_sidebar_active", {"target": "#a"})]
@@ -284,3 +284,80 @@ def test_real_running_loop_schedules_coroutine(monkeypatch):
         # Stop background loop and join thread
         loop.call_soon_threadsafe(loop.stop)
         t.join(timeout=1)
+
+
+def test_send_strategy_is_cached_per_session():
+    from bs4dash_py import server
+    from bs4dash_py.server import update_sidebar_active
+
+    class S:
+        def __init__(self):
+            self.probes = 0
+            self.calls = []
+
+        def __getattribute__(self, name):
+            if name in server._SEND_CANDIDATES:
+                object.__getattribute__(self, "__dict__")["probes"] += 1
+            return object.__getattribute__(self, name)
+
+        def send(self, message):
+            self.calls.append(message)
+
+    s = S()
+    assert update_sidebar_active(s, "#a") is True
+    first = s.probes
+    assert update_sidebar_active(s, "#b") is True
+    # the cached strategy looks up only the resolved method
+    assert s.probes - first == 1
+    assert server._session_state(s).sender == ("send", server._DICT, False)
+    assert s.calls[-1] == {
+        "type": "bs4dash_update_sidebar_active",
+        "data": {"target": "#b"},
+    }
+
+
+def test_stale_send_strategy_is_re_resolved():
+    from bs4dash_py import server
+    from bs4dash_py.server import update_sidebar_active
+
+    class S:
+        def __init__(self):
+            self.calls = []
+
+        def send_custom_message(self, name, payload):
+            self.calls.append(("custom", name))
+
+        def send_message(self, name, payload):
+            self.calls.append(("message", name))
+
+    s = S()
+    update_sidebar_active(s, "#a")
+    assert server._session_state(s).sender[0] == "send_custom_message"
+
+    def broken(name, payload):
+        raise RuntimeError("closed")
+
+    s.send_custom_message = broken
+    assert update_sidebar_active(s, "#b") is True
+    assert s.calls[-1] == ("message", "bs4dash_update_sidebar_active")
+    assert server._session_state(s).sender[0] == "send_message"
+
+
+def test_session_state_is_weakly_keyed():
+    import gc
+    import weakref
+
+    from bs4dash_py import server
+    from bs4dash_py.server import update_sidebar_active
+
+    class S:
+        def send_custom_message(self, name, payload):
+            pass
+
+    s = S()
+    update_sidebar_active(s, "#a")
+    assert s in server._STATES
+    ref = weakref.ref(s)
+    del s
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,201 @@
+import random
+
+from bs4dash_py.server import (
+    batch,
+    disable_shadow_state,
+    enable_shadow_state,
+    reset_shadow_state,
+    update_navbar_items,
+    update_sidebar,
+    update_sidebar_active,
+    update_sidebar_badges,
+)
+from bs4dash_py.shadow import diff_items
+
+
+class DummySession:
+    def __init__(self):
+        self.calls = []
+
+    def send_custom_message(self, name, payload):
+        self.calls.append((name, payload))
+
+
+def _apply(old, ops):
+    """Apply ops the way the client asset does."""
+    cur = list(old)
+
+    def index(key):
+        return next(i for i, it in enumerate(cur) if (it.get("href") or "#") == key)
+
+    for op in ops:
+        if op["op"] == "remove":
+            cur.pop(index(op["key"]))
+        elif op["op"] == "update":
+            cur[index(op["key"])] = op["item"]
+        else:
+            it = op["item"] if op["op"] == "insert" else cur.pop(index(op["key"]))
+            at = len(cur) if op["before"] is None else index(op["before"])
+            cur.insert(at, it)
+    return cur
+
+
+def _menu(n):
+    return [{"text": f"Item {i}", "href": f"#i{i}"} for i in range(n)]
+
+
+def test_diff_items_small_changes_produce_few_ops():
+    old = _menu(300)
+    new = [dict(it) for it in old]
+    new[5]["text"] = "Renamed"
+    new.insert(100, {"text": "New", "href": "#new"})
+    ops = diff_items(old, new)
+    assert [op["op"] for op in ops] == ["update", "insert"]
+    assert ops[1]["before"] == "#i100"
+    assert _apply(old, ops) == new
+
+
+def test_diff_items_round_trips_random_edits():
+    rng = random.Random(1234)
+    for _ in range(500):
+        old = [{"href": f"#{i}", "text": str(i)} for i in rng.sample(range(40), 20)]
+        new = [dict(it) for it in old]
+        for _ in range(rng.randint(0, 4)):
+            r = rng.random()
+            if r < 0.25 and new:
+                new.pop(rng.randrange(len(new)))
+            elif r < 0.5:
+                href = f"#n{rng.randint(0, 99)}"
+                if all(it["href"] != href for it in new):
+                    new.insert(rng.randint(0, len(new)), {"href": href, "text": "n"})
+            elif r < 0.75 and new:
+                new[rng.randrange(len(new))]["text"] = "changed"
+            elif new:
+                it = new.pop(rng.randrange(len(new)))
+                new.insert(rng.randint(0, len(new)), it)
+        ops = diff_items(old, new)
+        if ops is not None:
+            assert _apply(old, ops) == new
+
+
+def test_diff_items_falls_back_to_full_send():
+    old = _menu(3)
+    # duplicate keys can't be patched
+    assert diff_items(old, old + [{"text": "dup", "href": "#i0"}]) is None
+    # a patch larger than the list itself is not worth it
+    assert diff_items(old, [old[2]]) is None
+
+
+def test_sidebar_updates_send_patches():
+    s = DummySession()
+    enable_shadow_state(s)
+    menu = _menu(50)
+    update_sidebar(s, menu)
+    assert s.calls[-1][0] == "bs4dash_update_sidebar"
+
+    changed = [dict(it) for it in menu]
+    changed[3]["text"] = "Three"
+    assert update_sidebar(s, changed) is True
+    name, payload = s.calls[-1]
+    assert name == "bs4dash_patch_sidebar"
+    assert payload["ops"] == [{"op": "update", "key": "#i3", "item": changed[3]}]
+
+    # unchanged: nothing is sent
+    count = len(s.calls)
+    assert update_sidebar(s, changed) is True
+    assert len(s.calls) == count
+
+
+def test_navbar_items_are_tracked_per_nav():
+    s = DummySession()
+    enable_shadow_state(s)
+    items = [{"title": "One", "href": "#one"}, {"title": "Two", "href": "#two"}]
+    update_navbar_items(s, "a", items)
+    update_navbar_items(s, "b", items)
+    assert [c[0] for c in s.calls] == ["bs4dash_update_nav_items"] * 2
+
+    update_navbar_items(s, "a", items + [{"title": "Three", "href": "#three"}])
+    name, payload = s.calls[-1]
+    assert name == "bs4dash_patch_nav_items"
+    assert payload["nav_id"] == "a"
+    assert [op["op"] for op in payload["ops"]] == ["insert"]
+
+
+def test_badges_and_active_skip_unchanged_values():
+    s = DummySession()
+    enable_shadow_state(s)
+    update_sidebar_badges(
+        s, [{"href": "#a", "badge": "1"}, {"href": "#b", "badge": "2"}]
+    )
+    update_sidebar_badges(
+        s, [{"href": "#a", "badge": "1"}, {"href": "#b", "badge": "3"}]
+    )
+    assert s.calls[-1] == (
+        "bs4dash_update_sidebar_badges",
+        {"badges": [{"href": "#b", "badge": "3"}]},
+    )
+    count = len(s.calls)
+    update_sidebar_badges(s, [{"href": "#a", "badge": "1"}])
+    update_sidebar_active(s, "#a")
+    update_sidebar_active(s, "#a")
+    assert len(s.calls) == count + 1
+
+
+def test_full_sidebar_rebuild_forgets_badges_and_active():
+    s = DummySession()
+    enable_shadow_state(s)
+    update_sidebar_active(s, "#a")
+    update_sidebar_badges(s, [{"href": "#a", "badge": "1"}])
+    update_sidebar(s, _menu(2))
+    update_sidebar_active(s, "#a")
+    update_sidebar_badges(s, [{"href": "#a", "badge": "1"}])
+    assert [c[0] for c in s.calls[-2:]] == [
+        "bs4dash_update_sidebar_active",
+        "bs4dash_update_sidebar_badges",
+    ]
+
+
+def test_reset_and_disable_send_in_full():
+    s = DummySession()
+    enable_shadow_state(s)
+    update_sidebar(s, _menu(5))
+    reset_shadow_state(s)
+    update_sidebar(s, _menu(5))
+    assert s.calls[-1][0] == "bs4dash_update_sidebar"
+    disable_shadow_state(s)
+    update_sidebar_active(s, "#x")
+    update_sidebar_active(s, "#x")
+    assert [c[0] for c in s.calls[-2:]] == ["bs4dash_update_sidebar_active"] * 2
+
+
+def test_failed_send_resets_shadow():
+    class Flaky(DummySession):
+        fail = False
+
+        def send_custom_message(self, name, payload):
+            if self.fail:
+                raise ConnectionError("closed")
+            super().send_custom_message(name, payload)
+
+    s = Flaky()
+    enable_shadow_state(s)
+    update_sidebar_active(s, "#a")
+    s.fail = True
+    assert update_sidebar_active(s, "#b") is False
+    s.fail = False
+    update_sidebar_active(s, "#b")
+    assert s.calls[-1] == ("bs4dash_update_sidebar_active", {"target": "#b"})
+
+
+def test_batched_messages_are_reduced():
+    s = DummySession()
+    enable_shadow_state(s)
+    update_sidebar_active(s, "#a")
+    with batch(s):
+        update_sidebar_active(s, "#a")
+        update_sidebar_badges(s, [{"href": "#a", "badge": "1"}])
+    # the unchanged active update is dropped and the batch unwrapped
+    assert s.calls[-1] == (
+        "bs4dash_update_sidebar_badges",
+        {"badges": [{"href": "#a", "badge": "1"}]},
+    )
@@ -0,0 +1,83 @@
+import asyncio
+import json
+import re
+
+import pytest
+
+pytest.importorskip("shiny")
+
+from shiny import ui  # noqa: E402
+
+from bs4dash_py import shiny_layout  # noqa: E402
+from bs4dash_py.shell import export_shell, shell_app  # noqa: E402
+
+
+def _page():
+    return shiny_layout.dashboard_page_shiny(
+        header=shiny_layout.navbar_shiny("Shell"),
+        sidebar=shiny_layout.sidebar_shiny(menu=[("Home", "#home")]),
+        body=ui.output_ui("main"),
+    )
+
+
+def _get(app, path, headers=()):
+    sent, requests = [], [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": list(headers),
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "http_version": "1.1",
+    }
+    asyncio.run(app(scope, receive, send))
+    body = b"".join(m.get("body", b"") for m in sent[1:])
+    return sent[0]["status"], dict(sent[0]["headers"]), body
+
+
+def test_export_writes_page_and_hashed_assets(tmp_path):
+    manifest = export_shell(_page(), tmp_path)
+    html = (tmp_path / "index.html").read_text()
+    assert json.loads((tmp_path / "shell.json").read_text()) == manifest
+    [assets] = manifest["assets"]
+    assert re.fullmatch(r"bs4dash-py-[0-9a-f]{12}", assets)
+    assert (tmp_path / "assets" / assets / "bs4dash_controlbar.js").exists()
+    # Shiny's own scripts are left to the server, ahead of the page's
+    assert html.index("shiny-dependency-placeholder") < html.index(assets)
+    assert '"lib/' not in html and 'id="main"' in html
+
+    # a re-export replaces what the previous one wrote
+    stale = tmp_path / "assets" / "bs4dash-py-000000000000"
+    stale.mkdir()
+    (tmp_path / "shell.json").write_text(json.dumps({"assets": [stale.name]}))
+    assert export_shell(_page(), tmp_path) == manifest
+    assert not stale.exists()
+
+
+def test_shell_app_serves_the_export(tmp_path):
+    manifest = export_shell(_page(), tmp_path)
+    app = shell_app(tmp_path)
+
+    status, headers, body = _get(app, "/")
+    assert status == 200 and headers[b"cache-control"] == b"no-cache"
+    page = body.decode()
+    assert "shiny.js" in page and "Shell" in page
+    assert _get(app, "/", [(b"if-none-match", headers[b"etag"])])[0] == 304
+
+    asset = f"/assets/{manifest['assets'][0]}/bs4dash_controlbar.js"
+    status, headers, body = _get(app, asset)
+    assert status == 200 and b"bs4dash" in body
+    assert headers[b"cache-control"] == b"public, max-age=31536000, immutable"
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from bs4dash_py import dependencies
+from scripts.vendor_assets import UsedClasses, build, subset_css
+
+CSS = (
+    "@import url(https://fonts.example.com/css?family=Sans);"
+    "/* c */body{margin:0}.card,.unused-widget{color:red}"
+    ".card-primary:not(.zzz) .card-header{color:blue}"
+    "@media (min-width:576px){.col-sm-6{flex:0 0 50%}.nope{x:y}}"
+    "@media print{.nope{x:y}}"
+    '.a[data-x=".b"]{x:y}'
+)
+
+
+def test_used_classes_include_formatted_prefixes():
+    used = UsedClasses(keep=["fa-*"])
+    used.scan('cls = f"bg-{color}"; li.className = "nav-item " + \'text-\' + x')
+    assert "nav-item" in used and "bg-danger" in used and "text-muted" in used
+    assert "fa-home" in used and "unused-widget" not in used
+
+
+def test_subset_css_keeps_rules_for_used_classes():
+    used = UsedClasses()
+    used.scan("card card-primary card-header col-sm-6 a")
+    assert subset_css(CSS, used) == (
+        "body{margin:0}.card{color:red}"
+        ".card-primary:not(.zzz) .card-header{color:blue}"
+        "@media (min-width:576px){.col-sm-6{flex:0 0 50%}}"
+        '.a[data-x=".b"]{x:y}'
+    )
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    sources = {
+        "admin-lte": {
+            "version": "3.2.0",
+            "url": "https://example.invalid/",
+            "stylesheets": ["dist/css/adminlte.min.css"],
+            "scripts": ["dist/js/adminlte.min.js"],
+        },
+        "fa": {
+            "version": "5.15.4",
+            "url": "https://example.invalid/",
+            "stylesheets": ["css/all.min.css"],
+            "files": ["webfonts/fa-solid-900.woff2"],
+        },
+    }
+    files = {
+        "admin-lte/dist/css/adminlte.min.css": CSS,
+        "admin-lte/dist/js/adminlte.min.js": "$('.sidebar-mini').addClass('x')",
+        "fa/css/all.min.css": (
+            '@font-face{font-family:"FA";src:url(../webfonts/fa-solid-900.eot);'
+            'src:url(../webfonts/fa-solid-900.eot?#iefix) format("embedded-opentype"),'
+            'url(../webfonts/fa-solid-900.woff2) format("woff2")}'
+            '.fa-home:before{content:"\\f015"}.fa-car:before{content:"\\f1b9"}'
+        ),
+        "fa/webfonts/fa-solid-900.woff2": "not really a font",
+    }
+    for name, text in files.items():
+        path = tmp_path / "in" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    (tmp_path / "app.py").write_text('menu_item_shiny("Home", icon="fas fa-home")')
+    (tmp_path / "sources.json").write_text(json.dumps(sources))
+    return tmp_path
+
+
+def test_build_subsets_hashes_and_is_served(upstream, monkeypatch):
+    pytest.importorskip("shiny")
+    out = upstream / "vendor"
+    manifest = build(
+        upstream / "sources.json",
+        upstream / "in",
+        out,
+        scan=[upstream / "app.py"],
+        lock=True,
+    )
+    assert manifest["packages"] == {"admin-lte": "3.2.0", "fa": "5.15.4"}
+    [admin_css, fa_css] = manifest["stylesheets"]
+    assert admin_css.startswith("adminlte.min.") and admin_css.endswith(".css")
+    assert manifest["scripts"][0].startswith("adminlte.min.")
+
+    admin = (out / admin_css).read_text()
+    assert "fonts.example.com" not in admin and "unused-widget" not in admin
+    fa = (out / fa_css).read_text()
+    assert ".fa-home:before" in fa and "fa-car" not in fa
+    # only the available font format is kept, under its hashed name
+    [font] = [n for n in manifest["files"] if n.startswith("fa-solid-900.")]
+    assert f'src:url({font}) format("woff2")' in fa and ".eot" not in fa
+    assert json.loads((upstream / "sources.json").read_text())["fa"]["sha256"]
+
+    monkeypatch.setattr(dependencies, "VENDOR_DIR", out)
+    dependencies.vendor_dependency.cache_clear()
+    try:
+        from bs4dash_py import dashboard_page_shiny
+
+        page = dashboard_page_shiny(vendored=True)
+        [dep] = [d for d in page.get_dependencies() if d.name == "bs4dash-vendor"]
+        assert [s["href"] for s in dep.stylesheet] == [admin_css, fa_css]
+    finally:
+        dependencies.vendor_dependency.cache_clear()
+
+
+def test_vendored_page_requires_a_build(tmp_path, monkeypatch):
+    pytest.importorskip("shiny")
+    from bs4dash_py import dashboard_page_shiny
+
+    monkeypatch.setattr(dependencies, "VENDOR_DIR", tmp_path)
+    dependencies.vendor_dependency.cache_clear()
+    try:
+        with pytest.raises(FileNotFoundError):
+            dashboard_page_shiny(vendored=True)
+    finally:
+        dependencies.vendor_dependency.cache_clear()
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from bs4dash_py.server import batch, update_virtual_sidebar
+from bs4dash_py.sidebar_data import compact_menu, menu_json
+
+
+class DummySession:
+    def __init__(self):
+        self.calls = []
+
+    def send_custom_message(self, name, payload):
+        self.calls.append((name, payload))
+
+
+MENU = [
+    ("Home", "#home"),
+    ("About", "#about", "1", "fas fa-info"),
+    ("Documentation",),
+    ("Reports", [("One", "#one"), {"text": "Two", "href": "#two", "badge": "3"}]),
+    "DIVIDE",
+    {"text": "Help", "href": "#help", "badge": {"text": "!", "color": "danger"}},
+    {"text": "Active", "href": "#active", "active": True},
+]
+
+
+def test_compact_menu_shapes():
+    data = compact_menu(MENU)
+    assert data == {
+        "menu": [
+            ["Home", "#home"],
+            ["About", "#about", "1", "fas fa-info"],
+            ["Documentation"],
+            ["Reports", [["One", "#one"], ["Two", "#two", "3"]]],
+            "-",
+            ["Help", "#help", ["!", "badge badge-danger"]],
+            ["Active", "#active"],
+        ],
+        "active": "#active",
+    }
+
+
+def test_menu_json_is_safe_inside_script():
+    text = menu_json(compact_menu([("</script><!--", "#x")]))
+    assert "<" not in text
+    assert json.loads(text)["menu"] == [["</script><!--", "#x"]]
+
+
+def test_update_virtual_sidebar_sends_compact_data_and_coalesces():
+    s = DummySession()
+    update_virtual_sidebar(s, MENU)
+    assert s.calls[0] == ("bs4dash_update_sidebar_virtual", compact_menu(MENU))
+    with batch(s):
+        update_virtual_sidebar(s, [("A", "#a")])
+        update_virtual_sidebar(s, [("B", "#b")])
+    # the earlier menu was superseded: one message ships
+    assert len(s.calls) == 2
+    assert s.calls[-1][1]["menu"] == [["B", "#b"]]
+
+
+def test_virtual_sidebar_embeds_data_instead_of_items():
+    pytest.importorskip("shiny")
+    from bs4dash_py import sidebar_shiny
+
+    html = str(sidebar_shiny("App", menu=MENU, virtual=True, row_height=32))
+    assert 'data-bs4dash-virtual="true"' in html
+    assert 'data-row-height="32"' in html
+    assert "nav-item" not in html
+    start = html.index('class="bs4dash-sidebar-data">') + len(
+        'class="bs4dash-sidebar-data">'
+    )
+    data = json.loads(html[start : html.index("</script>", start)])
+    assert data == compact_menu(MENU)
+
+
+def test_active_child_of_a_group_is_reported():
+    menu = [
+        ("Home", "#home"),
+        ("Reports", [("One", "#one"), {"text": "Two", "href": "#two", "active": True}]),
+        {"text": "Later", "href": "#later", "active": True},
+    ]
+    data = compact_menu(menu)
+    assert data["active"] == "#two"
+    assert data["menu"][1] == ["Reports", [["One", "#one"], ["Two", "#two"]]]
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from bs4dash_py.visibility import (
+    hidden_containers,
+    is_visible,
+    suspend_when_hidden,
+    visibility,
+)
+
+
+class DummySession:
+    def __init__(self, visible=None):
+        self.input = {}
+        if visible is not None:
+            self.input["bs4dash_visible"] = lambda: visible
+
+
+def test_visibility_defaults_until_reported():
+    s = DummySession()
+    assert visibility(s) == {}
+    assert is_visible("sales", s) is True
+    assert is_visible("sales", s, default=False) is False
+
+    s = DummySession({"sales": False, "tab1": True})
+    assert is_visible("sales", s) is False
+    assert is_visible("tab1", s) is True
+    assert hidden_containers(s) == ["sales"]
+
+
+def test_suspended_render_cancels_while_hidden():
+    pytest.importorskip("shiny")
+    from shiny.types import SilentCancelOutputException
+
+    state = {"sales": False}
+    s = DummySession(state)
+    calls = []
+
+    @suspend_when_hidden("sales", session=s)
+    def render():
+        calls.append(1)
+        return "plot"
+
+    with pytest.raises(SilentCancelOutputException):
+        render()
+    assert calls == []
+    state["sales"] = True
+    assert render() == "plot"
+    assert render.__name__ == "render"
+
+
+def test_suspended_async_render():
+    pytest.importorskip("shiny")
+    from shiny.types import SilentCancelOutputException
+
+    state = {"controlbar": False}
+    s = DummySession(state)
+
+    @suspend_when_hidden("controlbar", session=s)
+    async def render():
+        return "ok"
+
+    with pytest.raises(SilentCancelOutputException):
+        asyncio.run(render())
+    state["controlbar"] = True
+    assert asyncio.run(render()) == "ok"
+
+
+def test_suspended_render_depends_on_its_own_container_only():
+    pytest.importorskip("shiny")
+    from shiny import reactive
+    from shiny.types import SilentCancelOutputException
+
+    report = reactive.Value({"sales": True, "costs": True})
+    s = DummySession()
+    s.input["bs4dash_visible"] = report
+    runs = []
+
+    @suspend_when_hidden("sales", session=s)
+    def render():
+        runs.append(1)
+
+    async def main():
+        # as Shiny runs an output
+        @reactive.effect
+        def _output():
+            try:
+                render()
+            except SilentCancelOutputException:
+                pass
+
+        await reactive.flush()
+        assert runs == [1]
+        report.set({"sales": True, "costs": False})
+        await reactive.flush()
+        assert runs == [1]
+        report.set({"sales": False, "costs": False})
+        await reactive.flush()
+        report.set({"sales": True, "costs": True})
+        await reactive.flush()
+        assert runs == [1, 1]
+
+    asyncio.run(main())